@@ -1,13 +1,20 @@
 from typing import List, Dict, Optional, Set
 from datetime import datetime
 from UMD_property import UMDProperty
+from board_spec import get_board
+from decision_engine import DEFAULT_POLICY
 
 class Player:
     """
     Represents a player in UMD-themed Monopoly.
     """
     
-    def __init__(self, name: str, token: str = "@", cash: int = 1500, position: int = 0):
+    # When True every running-total update is checked against a full recount
+    debug_totals = False
+    
+    def __init__(self, name: str, token: str = "@", cash: int = 1500, position: int = 0,
+                 is_cpu: bool = False, verbose: bool = True, policy=None,
+                 groups: Optional[dict] = None):
         """
         Initialize a new player.
         
@@ -16,7 +23,15 @@ class Player:
             token: Board token symbol (default "@")
             cash: Starting cash (default 1500)
             position: Starting board position (default 0)
+            is_cpu: Whether the decision engine plays for this player
+            verbose: Print what happens to this player (False for headless games)
+            policy: CPUPolicy used when the CPU plays this player
+            groups: Property groups of the board being played, for monopoly
+                checks (defaults to UMDProperty.PROPERTY_GROUPS)
         """
+        # Seat index, set by zobrist.GameHasher
+        self.seat = None
+        
         self.name = name
         self.token = token
         self.cash = cash
@@ -26,15 +41,25 @@ class Player:
         self.jail_turns = 0
         self.get_out_of_jail_cards = 0
         self.bankrupt = False
+        self.is_cpu = is_cpu
+        self.policy = policy or DEFAULT_POLICY
+        self.verbose = verbose
+        self.groups = UMDProperty.PROPERTY_GROUPS if groups is None else groups
         
         # Track owned property groups
         self.owned_groups: Dict[str, List[str]] = {}
         self.monopolies: Set[str] = set()
         
+        # Running totals over self.properties, kept up to date on every change
+        self.asset_value = 0         # sum of calculate_value()
+        self.mortgageable_value = 0  # sum of liquidation_value()
+        
         # Player statistics
         self.turns_played = 0
         self.total_moves = 0
         self.properties_bought = 0
+        self.events_drawn = 0
+        self.rent_collected = 0
         
     def __str__(self):
         """String representation of player."""
@@ -48,22 +73,144 @@ class Player:
         """Detailed representation."""
         return f"Player(name='{self.name}', cash={self.cash}, position={self.position})"
     
-    def move(self, spaces: int, board_size: int = 40):
+    def log(self, *args):
+        """Print a message unless the player is in a headless game."""
+        if self.verbose:
+            print(*args)
+    
+    @property
+    def liquid_cash(self):
+        """Cash on hand."""
+        return self.cash
+    
+    @property
+    def net_worth(self):
+        """Cash plus the current value of every owned property."""
+        return self.cash + self.asset_value
+    
+    @property
+    def liquidation_value(self):
+        """Cash the player could have by selling buildings and mortgaging everything."""
+        return self.cash + self.mortgageable_value
+    
+    def property_totals(self, property_obj):
+        """
+        What one property contributes to the running totals.
+        
+        Capture this before changing a property's buildings or mortgage
+        and hand it to update_property_totals afterwards.
+        
+        Returns:
+            tuple: (value, mortgageable value)
+        """
+        return property_obj.calculate_value(), property_obj.liquidation_value()
+    
+    def update_property_totals(self, property_obj, before):
+        """
+        Apply the change in one property's value to the running totals.
+        
+        Args:
+            property_obj: Property that changed
+            before: property_totals(property_obj) from before the change
+        """
+        value, mortgageable = self.property_totals(property_obj)
+        self.asset_value += value - before[0]
+        self.mortgageable_value += mortgageable - before[1]
+        if self.debug_totals:
+            self.check_totals()
+    
+    def recompute_totals(self):
+        """
+        Recount the running totals from scratch.
+        
+        Returns:
+            tuple: (asset value, mortgageable value)
+        """
+        asset_value = sum(prop.calculate_value() for prop in self.properties)
+        mortgageable = sum(prop.liquidation_value() for prop in self.properties)
+        return asset_value, mortgageable
+    
+    def check_totals(self):
+        """
+        Compare the running totals with a full recount.
+        
+        Raises:
+            AssertionError: if they have drifted apart.
+        """
+        expected = self.recompute_totals()
+        actual = (self.asset_value, self.mortgageable_value)
+        assert actual == expected, (
+            f"{self.name} running totals {actual} != recomputed {expected}")
+    
+    def receive_property(self, property_obj):
+        """
+        Take ownership of a property without paying for it
+        (bankruptcy transfers, trades).
+        """
+        property_obj.owner = self
+        self.properties.append(property_obj)
+        self._add_to_group(property_obj)
+        self.update_property_totals(property_obj, (0, 0))
+    
+    def release_property(self, property_obj):
+        """Give up a property so another player can receive it."""
+        before = self.property_totals(property_obj)
+        self.properties.remove(property_obj)
+        self._remove_from_group(property_obj)
+        self.asset_value -= before[0]
+        self.mortgageable_value -= before[1]
+        if self.debug_totals:
+            self.check_totals()
+    
+    def _add_to_group(self, property_obj):
+        """Update group tracking after gaining a property."""
+        if property_obj.group:
+            if property_obj.group not in self.owned_groups:
+                self.owned_groups[property_obj.group] = []
+            self.owned_groups[property_obj.group].append(property_obj.code)
+            
+            # Check for monopoly
+            self._check_monopoly(property_obj.group)
+    
+    def _remove_from_group(self, property_obj):
+        """Update group tracking after losing a property."""
+        codes = self.owned_groups.get(property_obj.group)
+        if codes and property_obj.code in codes:
+            codes.remove(property_obj.code)
+            if not codes:
+                del self.owned_groups[property_obj.group]
+        self.monopolies.discard(property_obj.group)
+    
+    def move(self, spaces: int, board_size: Optional[int] = None, go_salary: Optional[int] = None):
         """
         Move player around the board.
         
+        Games move players through kernel.next_state; this is for using a
+        Player on its own.
+        
+        Args:
+            spaces: Tiles to move forward
+            board_size: Tiles on the board (defaults to the shared board's
+                board_size)
+            go_salary: Cash collected for passing GO (defaults to the
+                shared board's go_salary)
+        
         Primary Author: [Your Name Here]
         Technique: f-strings containing expressions
         """
+        if board_size is None or go_salary is None:
+            board = get_board()
+            board_size = board["board_size"] if board_size is None else board_size
+            go_salary = board["go_salary"] if go_salary is None else go_salary
         old_position = self.position
         self.position = (self.position + spaces) % board_size
         self.total_moves += 1
         
         # Check if player passed GO (position 0)
         if (old_position + spaces) >= board_size:
-            self.cash += 200
+            self.cash += go_salary
             # f-string containing expression here
-            print(f"{self.name} passed GO! Collected $200. Total: ${self.cash}")
+            self.log(f"{self.name} passed GO! Collected ${go_salary}. Total: ${self.cash}")
         
         return self.position
     
@@ -84,11 +231,11 @@ class Player:
         can_afford = True if self.cash >= cost else False
         
         if not can_afford:
-            print(f"{self.name} cannot afford {property_obj.name} (${cost}). Cash: ${self.cash}")
+            self.log(f"{self.name} cannot afford {property_obj.name} (${cost}). Cash: ${self.cash}")
             return False
         
         if property_obj.owner is not None:
-            print(f"{property_obj.name} is already owned by {property_obj.owner}")
+            self.log(f"{property_obj.name} is already owned by {property_obj.owner}")
             return False
         
         # to make purchases
@@ -98,15 +245,10 @@ class Player:
         self.properties_bought += 1
         
         # Update group tracking
-        if property_obj.group:
-            if property_obj.group not in self.owned_groups:
-                self.owned_groups[property_obj.group] = []
-            self.owned_groups[property_obj.group].append(property_obj.code)
-            
-            # Check for monopoly
-            self._check_monopoly(property_obj.group)
+        self._add_to_group(property_obj)
+        self.update_property_totals(property_obj, (0, 0))
         
-        print(f"{self.name} bought {property_obj.name} for ${cost}. Cash remaining: ${self.cash}")
+        self.log(f"{self.name} bought {property_obj.name} for ${cost}. Cash remaining: ${self.cash}")
         return True
     
     def _check_monopoly(self, group_name):
@@ -121,12 +263,12 @@ class Player:
             return False
     
         owned_count = len(self.owned_groups[group_name])
-        group_info = UMDProperty.PROPERTY_GROUPS.get(group_name, {})
+        group_info = self.groups.get(group_name, {})
         required_count = group_info.get("full_set_count", 3)
     
         if owned_count >= required_count:
             self.monopolies.add(group_name)
-            print(f" {self.name} achieved MONOPOLY on {group_name}!")
+            self.log(f" {self.name} achieved MONOPOLY on {group_name}!")
             return True
     
         return False
@@ -145,7 +287,8 @@ class Player:
         if self.cash >= amount:
             self.cash -= amount
             to_player.cash += amount
-            print(f"{self.name} paid ${amount} rent to {to_player.name}. Cash remaining for {self.name}: ${self.cash}")
+            to_player.rent_collected += amount
+            self.log(f"{self.name} paid ${amount} rent to {to_player.name}. Cash remaining for {self.name}: ${self.cash}")
             return True
         else:
             # Player goes bankrupt!
@@ -153,12 +296,11 @@ class Player:
             self.cash = 0
             
             # Transfer properties to the player receiving rent
-            for prop in self.properties:
-                prop.owner = to_player
-                to_player.properties.append(prop)
+            for prop in list(self.properties):
+                self.release_property(prop)
+                to_player.receive_property(prop)
             
-            self.properties.clear()
-            print(f"{self.name} cannot pay ${amount} rent and goes bankrupt!")
+            self.log(f"{self.name} cannot pay ${amount} rent and goes bankrupt!")
             return False
         
     
@@ -195,6 +337,10 @@ class Player:
             "turns_played": self.turns_played,
             "total_moves": self.total_moves,
             "properties_bought": self.properties_bought,
+            "net_worth": self.net_worth,
+            "mortgageable_value": self.mortgageable_value,
+            "events_drawn": self.events_drawn,
+            "rent_collected": self.rent_collected,
             "timestamp": datetime.now().isoformat()
         }
     
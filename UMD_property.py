@@ -1,6 +1,9 @@
+import copy
 from typing import Optional
 from datetime import datetime
 
+from board_spec import get_board
+
 
 class PropertyType:
     """Types of properties on UMD campus."""
@@ -24,99 +27,45 @@ class UMDProperty:
     4. Optional parameters
     """
     
-    # UMD campus property groups with realistic data
-    PROPERTY_GROUPS = {
-        "North Campus": {
-            "type": PropertyType.HOUSING,
-            "color": "Red", 
-            "properties": {
-                "C": "Cambridge Community",
-                "C2": "Cambridge Hall",
-                "C3": "Cambridge Commons"
-            },
-            "full_set_count": 3,
-            "base_rent": 20,
-            "house_rents": [50, 150, 450, 625, 750],
-            "house_cost": 100
-        },
-        "South Campus": {
-            "type": PropertyType.HOUSING,
-            "color": "Teal",
-            "properties": {
-                "T": "T-Row Apartments",
-                "T2": "Terrapin Row",
-                "T3": "Towers"
-            },
-            "full_set_count": 3,
-            "base_rent": 25,
-            "house_rents": [60, 180, 500, 700, 900],
-            "house_cost": 120
-        },
-        "Academic Core": {
-            "type": PropertyType.ACADEMIC,
-            "color": "Blue",
-            "properties": {
-                "M": "McKeldin Library",
-                "H": "Hornbake Library",
-                "U": "Stamp Student Union"
-            },
-            "full_set_count": 3,
-            "base_rent": 30,
-            "house_rents": [70, 200, 550, 750, 950],
-            "house_cost": 150
-        },
-        "Dining Halls": {
-            "type": PropertyType.DINING,
-            "color": "Green",  
-            "properties": {
-                "D1": "South Campus Dining",
-                "D2": "251 North",
-                "D3": "The Diner"
-            },
-            "full_set_count": 3,
-            "base_rent": 15,
-            "house_rents": [40, 100, 300, 450, 600],
-            "house_cost": 80
-        },
-        "Athletics": {
-            "type": PropertyType.RECREATION,
-            "color": "Yellow", 
-            "properties": {
-                "V": "Varsity Team House",
-                "X": "Xfinity Center",
-                "S": "SECU Stadium"
-            },
-            "full_set_count": 3,
-            "base_rent": 35,
-            "house_rents": [80, 220, 600, 800, 1000],
-            "house_cost": 180
-        }
-    }
+    # UMD campus property groups and special tiles, from board_spec.json
+    PROPERTY_GROUPS = copy.deepcopy(get_board()["groups"])
+    SPECIAL_PROPERTIES = copy.deepcopy(get_board()["specials"])
     
-    # Special Unuiversity of Maryland properties
-    SPECIAL_PROPERTIES = {
-        "GO": {"name": "START / GO", "action": "Collect $200 when passing"},
-        "J": {"name": "Jail / Just Visiting", "action": "Lose turn or pay $50"},
-        "E": {"name": "Event Space", "action": "Draw event card"},
-        "P": {"name": "Free Parking", "action": "Collect accumulated fees"},
-        "R": {"name": "Rent-A-Scooter", "action": "Variable rent based on dice roll"}
-    }
+    # Bumped by update_group_config so cached rent tables know to rebuild
+    rent_config_version = 0
+    
+    # Pristine properties per board, copied by new_board():
+    # id(board) -> (board, rent_config_version, properties). Only the most
+    # recently built TEMPLATE_CACHE_SIZE boards are kept.
+    _templates = {}
+    TEMPLATE_CACHE_SIZE = 16
     
     def __init__(self, code: str, name: str, position: int, 
                  cost: Optional[int] = None, group: Optional[str] = None,
-                 base_rent: Optional[int] = None):
+                 base_rent: Optional[int] = None, groups: Optional[dict] = None,
+                 specials: Optional[dict] = None):
         """
         Initialize a UMD property.
         
         Args:
             code: Board code (C1, T2, M, etc.)
             name: Full property name
-            position: Board position (0-39)
+            position: Board position (0-39, -1 if not on the board)
             cost: Optional purchase cost (uses group default if None)
             group: Optional property group (auto-detected from code if None)
             base_rent: Optional base rent (uses group default if None)
+            groups: Group settings of the property's board (defaults to
+                PROPERTY_GROUPS, the default board's)
+            specials: Special tiles of the property's board (defaults to
+                SPECIAL_PROPERTIES)
         """
         
+        # Index into the game's Zobrist keys, set by zobrist.GameHasher
+        self.zobrist_index = None
+        
+        self.groups = self.PROPERTY_GROUPS if groups is None else groups
+        self.specials = self.SPECIAL_PROPERTIES if specials is None else specials
+        
         self.code = code
         self.name = name
         self.position = position
@@ -126,29 +75,36 @@ class UMDProperty:
         self.houses = 0  # 0-4 houses
         self.hotels = 0 # 5 is hotel
         
-        # Set costs based on group or provided values
+        # Set costs based on group or provided values; a group default
+        # base_rent follows later update_group_config() changes
         self._initialize_costs(cost, base_rent)
+        self._group_base_rent = base_rent is None and self.group in self.groups
         
-        # Track transaction history
-        self.purchase_history = []
-        self.rent_history = []
+        # Track transaction history (the lists are made on first use)
+        self._purchase_history = None
+        self._rent_history = None
+        self.rent_collected = 0
+
+        # Filled in by build_rent_table
+        self.rent_table = None
+        self._rent_table_version = -1
     
     def _detect_group_from_code(self, code: str):
         """Detect which group this property belongs to based on code."""
-        for group_name, group_info in self.PROPERTY_GROUPS.items():
+        for group_name, group_info in self.groups.items():
             if code in group_info["properties"]:
                 return group_name
         
         # Check for special properties
-        if code in self.SPECIAL_PROPERTIES:
+        if code in self.specials:
             return "Special"
         
         return "Unknown"
     
     def _initialize_costs(self, cost: Optional[int], base_rent: Optional[int]):
         """Initialize cost and rent based on group defaults or provided values."""
-        if self.group in self.PROPERTY_GROUPS:
-            group_info = self.PROPERTY_GROUPS[self.group]
+        if self.group in self.groups:
+            group_info = self.groups[self.group]
             
             # Set cost
             if cost is not None:
@@ -173,6 +129,32 @@ class UMDProperty:
             self.cost = 0
             self.base_rent = 0
     
+    @property
+    def purchase_history(self):
+        """Purchases of this property, oldest first."""
+        if self._purchase_history is None:
+            self._purchase_history = []
+        return self._purchase_history
+    
+    @purchase_history.setter
+    def purchase_history(self, value):
+        self._purchase_history = value
+    
+    @property
+    def rent_history(self):
+        """Rent payments on this property, oldest first."""
+        if self._rent_history is None:
+            self._rent_history = []
+        return self._rent_history
+    
+    @rent_history.setter
+    def rent_history(self, value):
+        self._rent_history = value
+    
+    def improvement_level(self):
+        """0-4 for houses, 5 for a hotel."""
+        return 5 if self.hotels else min(self.houses, 4)
+    
     # Magic methods
     def __str__(self):
         """String representation."""
@@ -222,6 +204,8 @@ class UMDProperty:
         """
         if self.mortgaged or not self.owner:
             return 0
+        if self._rent_table_version != self.rent_config_version:
+            self.build_rent_table()
         
         # Special property: Rent-A-Scooter
         if self.code == "R":
@@ -231,13 +215,13 @@ class UMDProperty:
         
         # Apply house/hotel multipliers
         if self.houses > 0:
-            group_info = self.PROPERTY_GROUPS.get(self.group, {})
+            group_info = self.groups.get(self.group, {})
             house_rents = group_info.get("house_rents", [])
             if self.houses <= len(house_rents):
                 rent = house_rents[self.houses - 1]
         
         if self.hotels > 0:
-            group_info = self.PROPERTY_GROUPS.get(self.group, {})
+            group_info = self.groups.get(self.group, {})
             house_rents = group_info.get("house_rents", [])
             if len(house_rents) >= 5:
                 rent = house_rents[4]  # Hotel rent
@@ -255,6 +239,77 @@ class UMDProperty:
         
         return rent
     
+    @staticmethod
+    def rent_index(houses: int, hotels: int, monopoly: bool, mortgaged: bool):
+        """Position of a (houses, hotel, monopoly, mortgaged) state in a rent table."""
+        return houses * 8 + (hotels > 0) * 4 + monopoly * 2 + mortgaged
+    
+    def build_rent_table(self):
+        """
+        Precompute the rent for every improvement level and monopoly state.
+        
+        The table holds what calculate_rent would return for an owned property,
+        indexed by rent_index(houses, hotels, monopoly, mortgaged) for 0-4
+        houses. Rent-A-Scooter depends on the dice, so it gets no table.
+        A base_rent taken from the group default is refreshed first.
+        """
+        self._rent_table_version = self.rent_config_version
+        if self._group_base_rent:
+            self.base_rent = self.groups.get(self.group, {}).get("base_rent", self.base_rent)
+        if self.code == "R":
+            self.rent_table = None
+            return
+        
+        group_info = self.groups.get(self.group, {})
+        house_rents = group_info.get("house_rents", [])
+        
+        table = []
+        for houses in range(5):
+            for hotel in (0, 1):
+                rent = self.base_rent
+                if houses > 0 and houses <= len(house_rents):
+                    rent = house_rents[houses - 1]
+                if hotel and len(house_rents) >= 5:
+                    rent = house_rents[4]
+                for monopoly in (0, 1):
+                    monopoly_rent = rent * 2 if monopoly and not houses and not hotel else rent
+                    table.append(monopoly_rent)  # not mortgaged
+                    table.append(0)              # mortgaged
+        self.rent_table = tuple(table)
+    
+    def lookup_rent(self, owner_has_monopoly: bool = False, dice_roll: int = 0):
+        """
+        Fast rent path: one lookup in the precomputed rent table.
+        
+        Returns the same amount as calculate_rent without appending to
+        rent_history. The rent_collected totals are kept where rent is
+        paid (Game).
+        """
+        if self._rent_table_version != self.rent_config_version:
+            self.build_rent_table()
+        if self.rent_table is None:
+            return self.calculate_rent(dice_roll, owner_has_monopoly)
+        if not self.owner:
+            return 0
+        
+        return self.rent_table[self.rent_index(self.houses, self.hotels,
+                                               owner_has_monopoly, self.mortgaged)]
+    
+    @classmethod
+    def update_group_config(cls, group_name: str, **changes):
+        """
+        Change a default-board property group's settings (base_rent,
+        house_rents, ...). Boards from other specs keep their own groups.
+        
+        Existing properties pick up the new base_rent and rebuild their
+        rent table on their next rent lookup; templates and kernel rules
+        are rebuilt on their next use.
+        """
+        if group_name not in cls.PROPERTY_GROUPS:
+            raise KeyError(f"Unknown property group: {group_name}")
+        cls.PROPERTY_GROUPS[group_name].update(changes)
+        UMDProperty.rent_config_version += 1
+    
     def calculate_value(self):
         """Calculate current property value."""
         value = self.cost // 2 if self.mortgaged else self.cost
@@ -265,10 +320,25 @@ class UMDProperty:
         
         return value
     
+    def mortgage_value(self):
+        """Cash a player gets for mortgaging this property."""
+        return self.cost // 2
+    
+    def liquidation_value(self):
+        """
+        Cash the owner could raise from this property right now by selling
+        its buildings back at half price and then mortgaging it.
+        """
+        half_house = self._get_house_cost() // 2
+        value = self.houses * half_house + self.hotels * 5 * half_house
+        if not self.mortgaged:
+            value += self.mortgage_value()
+        return value
+    
     def _get_house_cost(self):
         """Get cost to build a house on this property."""
-        if self.group in self.PROPERTY_GROUPS:
-            return self.PROPERTY_GROUPS[self.group].get("house_cost", 100)
+        if self.group in self.groups:
+            return self.groups[self.group].get("house_cost", 100)
         return 100
     
     def to_dict(self):
@@ -292,40 +362,101 @@ class UMDProperty:
             "houses": self.houses,
             "hotels": self.hotels,
             "current_value": self.calculate_value(),
-            "total_rent_collected": sum(entry["amount"] for entry in self.rent_history)
+            "total_rent_collected": self.rent_collected
         }
     
     @classmethod
-    def create_UMD_board(cls) :
-        """Create all properties for UMD Monopoly board."""
+    def board_groups(cls, board=None):
+        """
+        Group settings used by a board's properties and players.
+        
+        The default board uses the runtime PROPERTY_GROUPS, so
+        update_group_config() applies to it. Any other board uses the
+        groups compiled from its own spec.
+        """
+        board = board or get_board()
+        return cls.PROPERTY_GROUPS if board is get_board() else board["groups"]
+    
+    @classmethod
+    def create_UMD_board(cls, board=None):
+        """
+        Create all properties for UMD Monopoly board.
+        
+        Args:
+            board: Optional compiled board from board_spec (defaults to the
+                shared board). Properties sit on the first tile showing their
+                code; codes that are not on the board get position -1.
+        """
+        board = board or get_board()
+        positions = board["positions"]
+        groups = cls.board_groups(board)
         properties = []
         
         # Create properties from groups
-        position = 0
-        
-        for group_name, group_info in cls.PROPERTY_GROUPS.items():
+        for group_name, group_info in groups.items():
             for code, name in group_info["properties"].items():
                 prop = cls(
                     code=code,
                     name=name,
-                    position=position,
-                    group=group_name
+                    position=positions.get(code, (-1,))[0],
+                    cost=board["costs"][code],
+                    group=group_name,
+                    groups=groups,
+                    specials=board["specials"]
                 )
                 properties.append(prop)
-                position += 3  # Space them out on board
         
         # Add special properties
-        special_positions = [0, 10, 20, 30, 5, 15, 25, 35]
-        for i, (code, info) in enumerate(cls.SPECIAL_PROPERTIES.items()):
-            pos = special_positions[i] if i < len(special_positions) else 38
+        for code, info in board["specials"].items():
+            pos = board["go_position"] if code == "GO" else positions.get(code, (-1,))[0]
             prop = cls(
                 code=code,
                 name=info["name"],
                 position=pos,
-                group="Special"
+                group="Special",
+                groups=groups,
+                specials=board["specials"]
             )
             properties.append(prop)
         
+        for prop in properties:
+            prop.build_rent_table()
+        
         # Sort by position
         properties.sort(key=lambda p: p.position)
-        return properties
\ No newline at end of file
+        return properties
+    
+    @classmethod
+    def new_board(cls, board=None):
+        """
+        Fresh properties for one game, copied from a per-process template.
+        
+        The template is built by create_UMD_board() the first time a board
+        is used (and again after update_group_config()). Past
+        TEMPLATE_CACHE_SIZE boards, the oldest template is dropped. Each
+        copy shares the template's immutable rent tables and gets its own
+        mutable state.
+        
+        Args:
+            board: Optional compiled board from board_spec.
+        
+        Returns:
+            list: the same properties create_UMD_board() would return.
+        """
+        board = board or get_board()
+        cached = cls._templates.get(id(board))
+        if cached is None or cached[0] is not board or cached[1] != cls.rent_config_version:
+            cls._templates.pop(id(board), None)
+            if len(cls._templates) >= cls.TEMPLATE_CACHE_SIZE:
+                del cls._templates[next(iter(cls._templates))]
+            cached = (board, cls.rent_config_version, tuple(cls.create_UMD_board(board)))
+            cls._templates[id(board)] = cached
+        return [prop.fresh_copy() for prop in cached[2]]
+    
+    def fresh_copy(self):
+        """Copy of this property with its own ownership and history."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._purchase_history = None
+        clone._rent_history = None
+        return clone
@@ -0,0 +1,145 @@
+"""
+Early termination for decided games.
+
+An Adjudicator looks at the game after every turn. Once one player has
+held a large enough lead for long enough, it ends the game and names that
+player the winner. Game records that the result was adjudicated.
+"""
+import time
+
+
+class Adjudicator:
+    """
+    Declares a game decided when one player's net worth stays at least
+    `ratio` times the other's for `hold_turns` turns in a row.
+    """
+
+    def __init__(self, ratio: float = 3.0, hold_turns: int = 10, min_turn: int = 10,
+                 require_monopoly: bool = False, condition=None):
+        """
+        Args:
+            ratio(float): leader net worth / trailing net worth needed.
+            hold_turns(int): consecutive turns the lead has to last (K).
+            min_turn(int): never adjudicate before this turn.
+            require_monopoly(bool): the leader must also hold a monopoly.
+            condition: optional function taking the game and returning the
+                leading Player when the game looks decided, or None. It
+                replaces the net worth ratio test, e.g. for a lookup in a
+                precomputed win probability table.
+        """
+        if ratio <= 1:
+            raise ValueError(f"ratio must be above 1, got {ratio}")
+        self.ratio = ratio
+        self.hold_turns = hold_turns
+        self.min_turn = min_turn
+        self.require_monopoly = require_monopoly
+        self.condition = condition
+        self.leader = None
+        self.streak = 0
+
+    def __repr__(self):
+        """Detailed representation."""
+        return (f"Adjudicator(ratio={self.ratio}, hold_turns={self.hold_turns}, "
+                f"min_turn={self.min_turn})")
+
+    def reset(self):
+        """Forget the current streak (call between games)."""
+        self.leader = None
+        self.streak = 0
+
+    def leading_player(self, game):
+        """
+        The player who currently looks decisively ahead, if any.
+
+        Returns:
+            Player or None
+        """
+        if self.condition is not None:
+            return self.condition(game)
+
+        first, second = game.player, game.cpu
+        leader, trailer = (first, second) if first.net_worth >= second.net_worth else (second, first)
+        if self.require_monopoly and not leader.monopolies:
+            return None
+        if trailer.net_worth <= 0 or leader.net_worth >= self.ratio * trailer.net_worth:
+            return leader
+        return None
+
+    def check(self, game):
+        """
+        Update the streak after a turn.
+
+        Returns:
+            Player or None: the adjudicated winner once the lead has held
+                for hold_turns turns.
+        """
+        leader = self.leading_player(game)
+        if leader is None or leader is not self.leader:
+            self.leader = leader
+            self.streak = 1 if leader is not None else 0
+        else:
+            self.streak += 1
+
+        if leader is not None and game.turn_count >= self.min_turn and self.streak >= self.hold_turns:
+            return leader
+        return None
+
+
+def adjudication_report(seeds, adjudicator_options=None, **game_options):
+    """
+    Compare adjudicated games with the same games played to the end.
+
+    Every seed is played twice: once to the end and once with an
+    Adjudicator. The same seed gives the same dice, so the adjudicated
+    game is a prefix of the full one.
+
+    Args:
+        seeds: iterable of seeds.
+        adjudicator_options(dict): keyword arguments for Adjudicator.
+        **game_options: extra keyword arguments for Game.
+
+    Returns:
+        dict: games, adjudicated games, disagreements, disagreement rate
+            among adjudicated games, wall time for both runs, and the share
+            of wall time saved.
+    """
+    from game import Game
+
+    options = adjudicator_options or {}
+    report = {"games": 0, "adjudicated": 0, "disagreements": 0,
+              "full_seconds": 0.0, "adjudicated_seconds": 0.0,
+              "full_turns": 0, "adjudicated_turns": 0}
+
+    for seed in seeds:
+        start = time.perf_counter()
+        full = Game("cpu_vs_cpu", seed=seed, verbose=False, **game_options).play()
+        middle = time.perf_counter()
+        short = Game("cpu_vs_cpu", seed=seed, verbose=False,
+                     adjudicator=Adjudicator(**options), **game_options).play()
+        end = time.perf_counter()
+
+        report["games"] += 1
+        report["full_seconds"] += middle - start
+        report["adjudicated_seconds"] += end - middle
+        report["full_turns"] += full["turns"]
+        report["adjudicated_turns"] += short["turns"]
+        if short["adjudicated"]:
+            report["adjudicated"] += 1
+            if short["winner"] != full["winner"]:
+                report["disagreements"] += 1
+
+    report["disagreement_rate"] = (report["disagreements"] / report["adjudicated"]
+                                   if report["adjudicated"] else 0.0)
+    report["time_saved"] = (1 - report["adjudicated_seconds"] / report["full_seconds"]
+                            if report["full_seconds"] else 0.0)
+    return report
+
+
+if __name__ == "__main__":
+    for ratio, hold_turns in ((2.0, 6), (3.0, 6), (3.0, 10), (4.0, 10)):
+        result = adjudication_report(range(500), {"ratio": ratio, "hold_turns": hold_turns})
+        print(f"ratio {ratio} for {hold_turns:2} turns: "
+              f"{result['adjudicated']:3}/{result['games']} adjudicated, "
+              f"{result['disagreement_rate']:6.1%} disagree, "
+              f"turns {result['full_turns']} -> {result['adjudicated_turns']}, "
+              f"{result['time_saved']:6.1%} wall time saved")
@@ -1,5 +1,7 @@
 from typing import List, Dict
 
+from board_spec import get_board
+
 """
 T=T-row
 V=Varsity
@@ -17,45 +19,51 @@ class MakeBoard:
     """
     Represents the UMD Monopoly game board.
     
-    Manages an 11x11 board layout where players move around the perimeter 
-    in a clockwise direction starting from the bottom-right corner.
+    Manages a square board layout (11x11 for the UMD campus) where players
+    move around the perimeter in a clockwise direction starting from the
+    bottom-right corner.
     """
     
-    def __init__(self):
+    def __init__(self, board=None):
         """
-        Initializes a new game board with the default UMD campus layout.
+        Initializes a new game board from the compiled board spec.
         
         Args:
-            None.
+            board(dict): compiled board from board_spec. Defaults to the
+                shared UMD campus board built from board_spec.json.
         
         Returns:
             None.
         
         Side Effects:
-            Sets instance attributes: board_layout, players, and size.
+            Sets instance attributes: tiles, board_size, cells, grid, players,
+            and size. board_layout is made on first use.
         """
-        self.board_layout = [
-            "C V M U U H D1 V X M E",
-            "T                   M",
-            "T3                   U",
-            "U                   T2",
-            "H                   J",
-            "S                   V",
-            "E                   E",
-            "C                   V",
-            "C                   V",
-            "M                   M",
-            "J D3 C E T H R R D2 H E",
-        ]
+        board = board or get_board()
+        self.spec = board
+        self.tiles = board["tiles"]
+        self._board_layout = None
+        
+        # Precomputed geometry: board position -> (row, col), and the grid
+        self.board_size = board["board_size"]
+        self.cells = board["cells"]
+        self.grid = board["grid"]
         
         
         self.players = {
-            "@": 0,  # Player 1 starts at bottom right
-            "#": 20  # Player 2 starts top left
+            "@": 0,                     # Player 1 starts at bottom right
+            "#": self.board_size // 2   # Player 2 starts top left
         }
         
-        self.size = 11  # Board is 11x11
+        self.size = board["side"]  # Board is 11x11 for the UMD campus
     
+    @property
+    def board_layout(self):
+        """ASCII rows of the board, made when first needed."""
+        if self._board_layout is None:
+            self._board_layout = list(self.spec["board_layout"])
+        return self._board_layout
+
     def display_board(self):
         """
         Displays the current game board with player positions in the terminal.
@@ -69,38 +77,10 @@ class MakeBoard:
         Side Effects:
             Prints the ASCII board representation to stdout.
         """
-        #build grid
-        grid = []
-        for i in range(self.size):
-            if i == 0:
-                grid.append(self.board_layout[0].split())
-            elif i == self.size - 1:
-                grid.append(self.board_layout[-1].split())
-            else:
-                row = [""] * self.size
-                parts = self.board_layout[i].split()
-                row[0] = parts[0]
-                row[-1] = parts[-1]
-                grid.append(row)
-        
         #find where each player is
         player_cells = {}
         for player_char, pos in self.players.items():
-            #calculate grid position from the position number
-            if pos < self.size: 
-                row = self.size - 1
-                col = self.size - 1 - pos
-            elif pos < self.size + (self.size - 2): 
-                row = self.size - 2 - (pos - self.size)
-                col = 0
-            elif pos < 2 * self.size + (self.size - 2):
-                row = 0
-                col = pos - (self.size + (self.size - 2))
-            else: 
-                row = pos - (2 * self.size + (self.size - 2)) + 1
-                col = self.size - 1
-            
-            player_cells[(row, col)] = player_char
+            player_cells[self.cells[pos % self.board_size]] = player_char
         
         #make board
         border = "+" + ("---+" * self.size)
@@ -109,7 +89,7 @@ class MakeBoard:
         for row in range(self.size):
             line = "|"
             for col in range(self.size):
-                cell = grid[row][col] if grid[row][col] else " "
+                cell = self.grid[row][col] or " "
                 
                 #add player if at this cell
                 if (row, col) in player_cells:
@@ -124,8 +104,8 @@ class MakeBoard:
         Gets the tile symbol at a specific board position.
         
         Args:
-            position(int): the board position (0-39). Values outside this
-                range are wrapped using modulo 40.
+            position(int): the board position (0 to board_size - 1). Values
+                outside this range are wrapped around the board.
         
         Returns:
             str: the tile symbol at the given position (e.g., 'M', 'V', 'E').
@@ -133,15 +113,39 @@ class MakeBoard:
         Side Effects:
             None. This is a pure function that does not modify any external state.
         """
-        bottom = self.board_layout[-1].split()
-        top = self.board_layout[0].split()
-        left = [self.board_layout[i].split()[0] for i in range(9, 0, -1)]
-        right = [self.board_layout[i].split()[-1] for i in range(1, 10)]
-        
-        all_tiles = bottom[::-1] + left + top + right
-        return all_tiles[position % 40]
+        return self.tiles[position % self.board_size]
+
+    def find_tile(self, symbol):
+        """
+        Finds the first board position holding a tile symbol.
+
+        Args:
+            symbol(str): the tile symbol to look for (e.g., 'J').
+
+        Returns:
+            int: the first position (0-39) with that symbol, or 0 if the
+                symbol is not on the board.
+        """
+        return self.spec["positions"].get(symbol, (0,))[0]
 
 
 if __name__ == "__main__":
+    import time
+    from board_spec import compile_spec, make_campus_spec
+    from game import Game
+
     game = MakeBoard()
     game.display_board()
+
+    # Per-turn cost should not depend on the board size
+    for side in (11, 21, 41):
+        board = compile_spec(make_campus_spec(side))
+        turns = 0
+        start = time.perf_counter()
+        for seed in range(300):
+            headless = Game("cpu_vs_cpu", seed=seed, verbose=False, board=board)
+            headless.play()
+            turns += headless.turn_count
+        elapsed = time.perf_counter() - start
+        print(f"{board['board_size']:4} tiles ({side}x{side}): "
+              f"{elapsed / turns * 1e6:6.1f} us per turn over {turns} turns")
@@ -0,0 +1,338 @@
+"""
+Declarative board definition.
+
+board_spec.json describes the whole board: the tiles in position order,
+the property groups with their costs and rents, and the special tiles.
+It is validated and compiled once into a versioned binary artifact
+(board_spec.bin next to the spec). Later runs load the artifact directly
+while the spec file is unchanged. MakeBoard, UMDProperty and Game are all
+built from the compiled artifact.
+"""
+import copy
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "board_spec.json")
+
+# Bump when the compiled layout changes so old caches are ignored
+FORMAT_VERSION = 2
+MAGIC = b"UMDB"
+HEADER = struct.Struct("<4sH32s")
+
+GROUP_KEYS = ("type", "color", "full_set_count", "base_rent", "house_cost",
+              "house_rents", "properties")
+
+_loaded = {}
+
+
+def load_spec(path=DEFAULT_SPEC_PATH):
+    """
+    Read a board spec file.
+
+    Args:
+        path(str): path to the JSON spec.
+
+    Returns:
+        dict: the raw spec.
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def validate_spec(spec):
+    """
+    Check that a spec describes a playable board.
+
+    Args:
+        spec(dict): raw spec from load_spec.
+
+    Raises:
+        ValueError: listing every problem found.
+    """
+    problems = []
+    tiles = spec.get("tiles", [])
+    groups = spec.get("groups", {})
+    specials = spec.get("specials", {})
+
+    if len(tiles) < 8 or len(tiles) % 4:
+        problems.append(f"tiles must go around a square board (a multiple of 4, at least 8), got {len(tiles)}")
+
+    codes = set()
+    for group_name, group in groups.items():
+        missing = [key for key in GROUP_KEYS if key not in group]
+        if missing:
+            problems.append(f"group '{group_name}' is missing {missing}")
+            continue
+        if len(group["house_rents"]) != 5:
+            problems.append(f"group '{group_name}' needs 5 house_rents (4 houses and a hotel)")
+        if group["base_rent"] <= 0 or group["house_cost"] <= 0:
+            problems.append(f"group '{group_name}' needs a positive base_rent and house_cost")
+        if not 0 < group["full_set_count"] <= len(group["properties"]):
+            problems.append(f"group '{group_name}' full_set_count must be between 1 and its property count")
+        for code, prop in group["properties"].items():
+            if code in codes:
+                problems.append(f"property code '{code}' is used more than once")
+            codes.add(code)
+            if prop.get("cost", 0) <= 0:
+                problems.append(f"property '{code}' needs a positive cost")
+            if not prop.get("name"):
+                problems.append(f"property '{code}' needs a name")
+
+    for code in specials:
+        if code in codes:
+            problems.append(f"special code '{code}' clashes with a property code")
+
+    for position, symbol in enumerate(tiles):
+        if symbol not in codes and symbol not in specials:
+            problems.append(f"tile {position} has unknown symbol '{symbol}'")
+
+    if not 0 <= spec.get("go_position", 0) < max(len(tiles), 1):
+        problems.append("go_position must be on the board")
+
+    if problems:
+        raise ValueError("Invalid board spec:\n  " + "\n  ".join(problems))
+
+
+def board_side(tile_count):
+    """Cells along one edge of a square board with `tile_count` perimeter tiles."""
+    return tile_count // 4 + 1
+
+
+def perimeter_cells(side):
+    """
+    Grid cell of every board position on a side x side board.
+
+    Position 0 is the bottom-right corner and positions run clockwise:
+    along the bottom to the left, up the left side, along the top, and
+    down the right side.
+
+    Returns:
+        tuple: (row, col) for positions 0 .. 4 * (side - 1) - 1.
+    """
+    last = side - 1
+    cells = [(last, last - i) for i in range(side)]            # bottom, right to left
+    cells += [(last - i, 0) for i in range(1, side - 1)]       # left, bottom to top
+    cells += [(0, i) for i in range(side)]                     # top, left to right
+    cells += [(i, last) for i in range(1, side - 1)]           # right, top to bottom
+    return tuple(cells)
+
+
+def render_layout(tiles):
+    """
+    Draw the tiles as the ASCII rows MakeBoard.board_layout uses.
+
+    Returns:
+        list: one string per board row, tile symbols separated by spaces.
+    """
+    grid = tile_grid(tiles)
+    gap = " " * (4 * len(grid) - 3)
+    rows = [" ".join(grid[0])]
+    for row in grid[1:-1]:
+        rows.append(f"{row[0]}{gap}{row[-1]}")
+    rows.append(" ".join(grid[-1]))
+    return rows
+
+
+def tile_grid(tiles):
+    """
+    Lay the tiles out on the square grid.
+
+    Returns:
+        tuple: one tuple per row holding the tile symbol of each cell,
+            or "" for cells inside the board.
+    """
+    side = board_side(len(tiles))
+    grid = [[""] * side for _ in range(side)]
+    for symbol, (row, col) in zip(tiles, perimeter_cells(side)):
+        grid[row][col] = symbol
+    return tuple(tuple(row) for row in grid)
+
+
+def make_campus_spec(side, spec=None):
+    """
+    Build a bigger (or smaller) campus board from an existing spec.
+
+    The spec's tiles are repeated in order until the side x side
+    perimeter is full. The first lap is the spec's own board. Every later
+    lap gets its own copy of each group it shows, named "<group> <lap>"
+    (e.g. "North Campus 2"), whose property codes carry the lap's letter
+    ("C" becomes "Cb" on lap 2, "Cc" on lap 3). So each lap has
+    properties and monopolies of its own. Special tiles repeat as they
+    are.
+
+    Args:
+        side(int): cells along one edge, e.g. 21 for an 80 tile board.
+        spec(dict): spec to grow. Defaults to board_spec.json.
+
+    Returns:
+        dict: a new raw spec, ready for compile_spec.
+    """
+    if side < 3:
+        raise ValueError(f"A board needs at least 3 cells per side, got {side}")
+    spec = copy.deepcopy(spec or load_spec())
+    tiles = spec["tiles"]
+    groups = spec["groups"]
+    group_of = {code: name for name, group in groups.items() for code in group["properties"]}
+
+    count = 4 * (side - 1)
+    grown = []
+    for position in range(count):
+        lap, offset = divmod(position, len(tiles))
+        symbol = tiles[offset]
+        if lap and symbol in group_of:
+            suffix = chr(ord("a") + lap)
+            name = f"{group_of[symbol]} {lap + 1}"
+            if name not in groups:
+                group = copy.deepcopy(groups[group_of[symbol]])
+                group["properties"] = {f"{code}{suffix}": dict(prop, name=f"{prop['name']} {lap + 1}")
+                                       for code, prop in group["properties"].items()}
+                groups[name] = group
+            symbol += suffix
+        grown.append(symbol)
+    spec["tiles"] = grown
+    spec["name"] = f"{spec.get('name', 'Campus')} {side}x{side}"
+    return spec
+
+
+def compile_spec(spec, spec_hash=""):
+    """
+    Validate a spec and turn it into the lookup structures the game uses.
+
+    Args:
+        spec(dict): raw spec from load_spec.
+        spec_hash(str): sha256 of the spec file, recorded in the artifact.
+
+    Returns:
+        dict: the compiled board (see the keys below).
+    """
+    validate_spec(spec)
+    tiles = tuple(spec["tiles"])
+
+    positions = {}
+    for position, symbol in enumerate(tiles):
+        positions.setdefault(symbol, []).append(position)
+
+    groups = {}
+    costs = {}
+    for group_name, group in spec["groups"].items():
+        groups[group_name] = {
+            "type": group["type"],
+            "color": group["color"],
+            "properties": {code: prop["name"] for code, prop in group["properties"].items()},
+            "full_set_count": group["full_set_count"],
+            "base_rent": group["base_rent"],
+            "house_rents": list(group["house_rents"]),
+            "house_cost": group["house_cost"],
+        }
+        for code, prop in group["properties"].items():
+            costs[code] = prop["cost"]
+
+    return {
+        "format": FORMAT_VERSION,
+        "name": spec.get("name", ""),
+        "spec_version": spec.get("version", 1),
+        "spec_hash": spec_hash,
+        "tiles": tiles,
+        "board_size": len(tiles),
+        "side": board_side(len(tiles)),
+        "cells": perimeter_cells(board_side(len(tiles))),
+        "grid": tile_grid(tiles),
+        "board_layout": tuple(render_layout(tiles)),
+        "go_position": spec.get("go_position", 0),
+        "go_salary": spec.get("go_salary", 200),
+        "groups": groups,
+        "costs": costs,
+        "specials": {code: dict(info) for code, info in spec["specials"].items()},
+        "positions": {symbol: tuple(found) for symbol, found in positions.items()},
+    }
+
+
+def _cache_path_for(spec_path):
+    """Default artifact path: the spec path with a .bin extension."""
+    return os.path.splitext(spec_path)[0] + ".bin"
+
+
+def _read_cache(cache_path, digest):
+    """Return the cached artifact if it matches the format and spec hash."""
+    try:
+        with open(cache_path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, cached_digest = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or cached_digest != digest:
+        return None
+    try:
+        return pickle.loads(data[HEADER.size:])
+    except Exception:
+        return None
+
+
+def _write_cache(cache_path, digest, board):
+    """Write the artifact atomically. A read-only location is not an error."""
+    payload = HEADER.pack(MAGIC, FORMAT_VERSION, digest) + pickle.dumps(board, protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    import tempfile  # only needed on a cache miss; keeps startup imports small
+    try:
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(payload)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_board(spec_path=DEFAULT_SPEC_PATH, cache_path=None):
+    """
+    Load the compiled board, compiling and caching it if needed.
+
+    Args:
+        spec_path(str): path to the JSON spec.
+        cache_path(str): artifact path (defaults to the spec path with .bin).
+
+    Returns:
+        dict: the compiled board from compile_spec.
+    """
+    with open(spec_path, "rb") as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).digest()
+    cache_path = cache_path or _cache_path_for(spec_path)
+
+    board = _read_cache(cache_path, digest)
+    if board is None:
+        board = compile_spec(json.loads(raw.decode("utf-8")), digest.hex())
+        _write_cache(cache_path, digest, board)
+    return board
+
+
+def get_board(spec_path=DEFAULT_SPEC_PATH):
+    """
+    Compiled board shared by everything in this process.
+
+    Returns:
+        dict: the compiled board for spec_path, loaded once.
+    """
+    if spec_path not in _loaded:
+        _loaded[spec_path] = load_board(spec_path)
+    return _loaded[spec_path]
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    board = load_board()
+    elapsed = time.perf_counter() - start
+    print(f"Loaded '{board['name']}' ({len(board['tiles'])} tiles) in {elapsed * 1000:.2f} ms")
+    print("\n".join(board["board_layout"]))
@@ -0,0 +1,164 @@
+"""
+Houses, hotels and mortgages for a game's players and properties.
+
+The rules live in kernel.py, which applies them to the compact game state:
+inside a group, a property can only be improved while it is at the
+group's lowest level (a property's level is its house count, or 5 once it
+has a hotel), the bank's supply is finite, and built-up groups cannot be
+mortgaged. BuildEngine asks the same questions about Player and
+UMDProperty objects: it turns them into seats and property indexes, runs
+the kernel on the game's state and loads the result back into the game.
+"""
+import kernel
+from kernel import HOTEL_LEVEL
+
+
+class BuildingBank:
+    """The limited supply of houses and hotels shared by all players."""
+
+    def __init__(self, houses: int = kernel.BANK_HOUSES, hotels: int = kernel.BANK_HOTELS):
+        """
+        Args:
+            houses(int): houses in the bank.
+            hotels(int): hotels in the bank.
+        """
+        self.houses = houses
+        self.hotels = hotels
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"BuildingBank(houses={self.houses}, hotels={self.hotels})"
+
+
+class BuildEngine:
+    """
+    Build, sell and mortgage actions for one game.
+    """
+
+    def __init__(self, game):
+        """
+        Index the game's properties by group.
+
+        Args:
+            game(Game): the game whose state the actions change.
+        """
+        self.game = game
+        self.group_properties = {}
+        for prop in game.kernel_properties:
+            self.group_properties.setdefault(prop.group, []).append(prop)
+
+    def _seat(self, player):
+        return 0 if player is self.game.player else 1
+
+    def _index(self, prop):
+        return self.game.rules.index[prop.code]
+
+    @property
+    def bank(self):
+        """What the bank has left, as a BuildingBank."""
+        houses, hotels = kernel.buildings_in_use(self.game.state[kernel.PROPERTIES])
+        rules = self.game.rules
+        return BuildingBank(rules.bank_houses - houses, rules.bank_hotels - hotels)
+
+    @staticmethod
+    def level(prop):
+        """Improvement level of a property: 0-4 houses, 5 for a hotel."""
+        return HOTEL_LEVEL if prop.hotels else prop.houses
+
+    @staticmethod
+    def house_cost(prop):
+        """Cost of one building on this property."""
+        return prop._get_house_cost()
+
+    def group_has_buildings(self, group_name):
+        """True if any property in the group has a house or hotel."""
+        return any(prop.houses or prop.hotels for prop in self.group_properties.get(group_name, ()))
+
+    def can_build(self, player, prop):
+        """
+        Check if a player may put one more building on a property.
+
+        Rules: the player owns the whole group, nothing in the group is
+        mortgaged, the property is at the group's lowest level and below a
+        hotel, the bank has the building, and the player can pay for it.
+
+        Returns:
+            bool: True if build() would succeed.
+        """
+        return kernel.can_build(self.game.state, self._seat(player), self._index(prop), self.game.rules)
+
+    def build(self, player, prop):
+        """
+        Buy one house (or the hotel, after four houses) for a property.
+
+        Returns:
+            bool: True if something was built.
+        """
+        return self.game.act(kernel.build, self._seat(player), self._index(prop))
+
+    def can_sell(self, player, prop):
+        """
+        Check if a player may sell one building back from a property.
+
+        Selling must also stay even: only properties at the group's highest
+        level can lose a building, and breaking a hotel needs four houses
+        in the bank.
+        """
+        return kernel.can_sell(self.game.state, self._seat(player), self._index(prop), self.game.rules)
+
+    def sell(self, player, prop):
+        """
+        Sell one building back to the bank for half its cost.
+
+        Returns:
+            bool: True if something was sold.
+        """
+        return self.game.act(kernel.sell, self._seat(player), self._index(prop))
+
+    def buildable(self, player):
+        """
+        Properties the player could build on right now.
+
+        Returns:
+            list: UMDProperty objects, cheapest buildings first.
+        """
+        return [self.game.kernel_properties[p]
+                for p in kernel.buildable(self.game.state, self._seat(player), self.game.rules)]
+
+    def can_mortgage(self, player, prop):
+        """A property can be mortgaged when nothing in its group has buildings."""
+        return kernel.can_mortgage(self.game.state, self._seat(player), self._index(prop), self.game.rules)
+
+    def mortgage(self, player, prop):
+        """
+        Mortgage a property for half its cost. It collects no rent until
+        the mortgage is lifted.
+
+        Returns:
+            bool: True if the property was mortgaged.
+        """
+        return self.game.act(kernel.mortgage, self._seat(player), self._index(prop))
+
+    def unmortgage_cost(self, prop):
+        """Cash needed to lift the mortgage on a property."""
+        return self.game.rules.unmortgage_cost[self._index(prop)]
+
+    def unmortgage(self, player, prop):
+        """
+        Pay off a mortgage.
+
+        Returns:
+            bool: True if the mortgage was lifted.
+        """
+        return self.game.act(kernel.unmortgage, self._seat(player), self._index(prop))
+
+    def raise_cash(self, player, amount):
+        """
+        Sell buildings and then mortgage properties until the player has
+        at least `amount` cash, or nothing is left to sell.
+
+        Returns:
+            bool: True if the player now has `amount` cash.
+        """
+        self.game.act(kernel.raise_cash, self._seat(player), amount)
+        return player.cash >= amount
@@ -1,4 +1,4 @@
-def decision_engine(player_cash, property_cost, property_type, game_stage):
+def decision_engine(player_cash, property_cost, property_type, game_stage, safe_reserves=None):
     """
     Evaluates whether a player should purchase a property when they land on it.
     
@@ -7,6 +7,8 @@ def decision_engine(player_cash, property_cost, property_type, game_stage):
         property_cost(int): the cost of the property being considered.
         property_type(str): the name of the property.
         game_stage(str): current game stage - "early", "mid", or "late". 
+        safe_reserves(dict): optional cash to keep per game stage, e.g.
+            {"early": 200, "mid": 400, "late": 600} (the default).
     
     Returns:
         dict: A dictionary containing:
@@ -20,7 +22,7 @@ def decision_engine(player_cash, property_cost, property_type, game_stage):
     Side Effects:
         None. This is a pure function that does not modify any external state.
     """
-    affordability = property_cost /  player_cash
+    affordability = property_cost /  player_cash if player_cash > 0 else float("inf")
     remaining_cash =  player_cash - property_cost
         
     if player_cash == 0 or property_cost > player_cash:
@@ -28,7 +30,9 @@ def decision_engine(player_cash, property_cost, property_type, game_stage):
         confidence = 100
         reason = f"""No cash or too expensive, property cost: {property_cost}, player cash: {player_cash}"""
         
-    if game_stage == "early":
+    if safe_reserves is not None:
+        safe_reserve = safe_reserves.get(game_stage, safe_reserves.get("late", 600))
+    elif game_stage == "early":
         safe_reserve = 200
     elif game_stage == "mid":
         safe_reserve = 400
@@ -83,6 +87,56 @@ def decision_engine(player_cash, property_cost, property_type, game_stage):
         "risk_score": risk_score
     }
 
+class CPUPolicy:
+    """
+    Settings for a CPU player: how it uses decision_engine when buying and
+    how much cash it keeps when building.
+    """
+
+    def __init__(self, name="default", safe_reserves=None, buy_risky=False, build_reserve=200):
+        """
+        Args:
+            name(str): label used in reports and league tables.
+            safe_reserves(dict): cash to keep per game stage (see decision_engine).
+            buy_risky(bool): also buy when decision_engine says "risky".
+            build_reserve(int): cash kept on hand after building.
+        """
+        self.name = name
+        self.safe_reserves = dict(safe_reserves) if safe_reserves else None
+        self.buy_risky = buy_risky
+        self.build_reserve = build_reserve
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"CPUPolicy({self.params()})"
+
+    def params(self):
+        """All settings as a plain dict, e.g. for cache keys."""
+        return {
+            "name": self.name,
+            "safe_reserves": self.safe_reserves,
+            "buy_risky": self.buy_risky,
+            "build_reserve": self.build_reserve
+        }
+
+    def decide(self, player_cash, property_cost, property_type, game_stage):
+        """
+        Run decision_engine with this policy's reserves.
+
+        Returns:
+            dict: decision_engine's result, with "decision" turned into "buy"
+                for risky purchases when buy_risky is set.
+        """
+        result = decision_engine(player_cash, property_cost, property_type, game_stage,
+                                 self.safe_reserves)
+        if self.buy_risky and result["decision"] == "risky":
+            result["decision"] = "buy"
+        return result
+
+
+DEFAULT_POLICY = CPUPolicy()
+
+
 if __name__ == "__main__":
     print("Test 1: Affordable purchase")
     result1 = decision_engine(1000, 200, "McKeldin", "mid")
@@ -0,0 +1,228 @@
+"""
+Sequential win-rate estimation for comparing two CPU policies.
+
+Matches are played in batches of seeded headless games. Every seed is
+played twice with the seats swapped, so both policies see the same dice
+from both seats. After each batch the estimator updates a Wilson
+confidence interval on policy A's win rate and a normal interval on the
+mean game length. It stops as soon as the win-rate interval is narrow
+enough, or a sequential probability ratio test (SPRT) decides which
+policy is stronger, or the game cap is reached.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from decision_engine import CPUPolicy
+
+
+def play_pair(seed, policy_a, policy_b, game_options=None):
+    """
+    Play one seed with A in each seat.
+
+    Returns:
+        list: two (score for A, turns) tuples. A win scores 1, a tie 0.5.
+    """
+    from game import Game
+
+    results = []
+    for seats, a_seat in (((policy_a, policy_b), 0), ((policy_b, policy_a), 1)):
+        summary = Game("cpu_vs_cpu", seed=seed, verbose=False, policies=seats,
+                       **(game_options or {})).play()
+        if summary["winner"] == -1:
+            score = 0.5
+        else:
+            score = 1.0 if summary["winner"] == a_seat else 0.0
+        results.append((score, summary["turns"]))
+    return results
+
+
+def _play_pairs(seeds, policy_a, policy_b, game_options):
+    """Worker entry point for a chunk of seeds."""
+    results = []
+    for seed in seeds:
+        results.extend(play_pair(seed, policy_a, policy_b, game_options))
+    return results
+
+
+def wilson_interval(successes, trials, z):
+    """
+    Wilson score interval for a proportion.
+
+    Returns:
+        tuple: (low, high), or (0.0, 1.0) with no trials.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+class WinRateEstimator:
+    """
+    Runs A vs B until the win rate is known well enough.
+    """
+
+    def __init__(self, policy_a, policy_b, target_width=0.05, confidence=0.95,
+                 batch_seeds=50, max_games=20000, min_games=100, sprt_delta=0.05,
+                 sprt_alpha=0.05, sprt_beta=0.05, first_seed=0, workers=1, game_options=None):
+        """
+        Args:
+            policy_a(CPUPolicy): policy whose win rate is estimated.
+            policy_b(CPUPolicy): opponent policy.
+            target_width(float): stop once the win-rate interval is this narrow.
+            confidence(float): confidence level of both intervals.
+            batch_seeds(int): seeds per batch (two games each).
+            max_games(int): hard cap on games played.
+            min_games(int): games played before any stopping rule applies.
+            sprt_delta(float): the SPRT tests win rate 0.5 + delta against
+                0.5 - delta. Set to 0 to turn the test off.
+            sprt_alpha(float): SPRT error rate for wrongly picking A.
+            sprt_beta(float): SPRT error rate for wrongly picking B.
+            first_seed(int): seeds used are first_seed, first_seed + 1, ...
+            workers(int): worker processes per batch.
+            game_options(dict): extra keyword arguments for Game.
+        """
+        self.policy_a = policy_a
+        self.policy_b = policy_b
+        self.target_width = target_width
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.batch_seeds = batch_seeds
+        self.max_games = max_games
+        self.min_games = min_games
+        self.sprt_delta = sprt_delta
+        self.upper_bound = math.log((1 - sprt_beta) / sprt_alpha)
+        self.lower_bound = math.log(sprt_beta / (1 - sprt_alpha))
+        self.next_seed = first_seed
+        self.workers = workers
+        self.game_options = game_options or {}
+
+        self.games = 0
+        self.score = 0.0
+        self.llr = 0.0
+        self.turn_mean = 0.0
+        self._turn_m2 = 0.0
+
+    def add_result(self, score, turns):
+        """
+        Fold one finished game into the running statistics.
+
+        Args:
+            score(float): 1 if A won, 0 if B won, 0.5 for a tie.
+            turns(int): game length.
+        """
+        self.games += 1
+        self.score += score
+
+        # Welford's running mean and variance of the game length
+        delta = turns - self.turn_mean
+        self.turn_mean += delta / self.games
+        self._turn_m2 += delta * (turns - self.turn_mean)
+
+        if self.sprt_delta and score != 0.5:
+            high, low = 0.5 + self.sprt_delta, 0.5 - self.sprt_delta
+            self.llr += math.log(high / low) if score else math.log((1 - high) / (1 - low))
+
+    def win_rate_interval(self):
+        """Wilson interval on A's win rate (ties count as half a win)."""
+        return wilson_interval(self.score, self.games, self.z)
+
+    def turn_interval(self):
+        """Normal interval on the mean game length."""
+        if self.games < 2:
+            return 0.0, float("inf")
+        margin = self.z * math.sqrt(self._turn_m2 / (self.games - 1) / self.games)
+        return self.turn_mean - margin, self.turn_mean + margin
+
+    def stop_reason(self):
+        """
+        Which stopping rule fires right now, if any.
+
+        Returns:
+            str or None: "precision", "sprt_a", "sprt_b", "max_games" or None.
+        """
+        if self.games >= self.max_games:
+            return "max_games"
+        if self.games < self.min_games:
+            return None
+        low, high = self.win_rate_interval()
+        if high - low <= self.target_width:
+            return "precision"
+        if self.sprt_delta and self.llr >= self.upper_bound:
+            return "sprt_a"
+        if self.sprt_delta and self.llr <= self.lower_bound:
+            return "sprt_b"
+        return None
+
+    def _batch_seeds(self):
+        """Seeds for the next batch, never going past max_games."""
+        count = min(self.batch_seeds, max(1, (self.max_games - self.games) // 2))
+        seeds = list(range(self.next_seed, self.next_seed + count))
+        self.next_seed += count
+        return seeds
+
+    def run(self):
+        """
+        Play batches until a stopping rule fires.
+
+        Returns:
+            dict: games played, stop reason, A's win rate and interval, the
+                mean turns and interval, and the SPRT log-likelihood ratio.
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            reason = None
+            while reason is None:
+                seeds = self._batch_seeds()
+                if pool is None:
+                    results = _play_pairs(seeds, self.policy_a, self.policy_b, self.game_options)
+                else:
+                    chunk = max(1, len(seeds) // self.workers)
+                    futures = [pool.submit(_play_pairs, seeds[i:i + chunk], self.policy_a,
+                                           self.policy_b, self.game_options)
+                               for i in range(0, len(seeds), chunk)]
+                    results = [result for future in futures for result in future.result()]
+                for score, turns in results:
+                    self.add_result(score, turns)
+                reason = self.stop_reason()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return {
+            "games": self.games,
+            "stop_reason": reason,
+            "win_rate": self.score / self.games if self.games else 0.0,
+            "win_rate_interval": self.win_rate_interval(),
+            "mean_turns": self.turn_mean,
+            "turn_interval": self.turn_interval(),
+            "llr": self.llr,
+        }
+
+    def fixed_games_needed(self):
+        """
+        Games a fixed-N run would need for the target width at the worst
+        case win rate of 0.5.
+        """
+        half_width = self.target_width / 2
+        return math.ceil(self.z * self.z * 0.25 / (half_width * half_width))
+
+
+if __name__ == "__main__":
+    import time
+
+    cautious = CPUPolicy("cautious", safe_reserves={"early": 400, "mid": 700, "late": 900})
+    aggressive = CPUPolicy("aggressive", buy_risky=True, build_reserve=50)
+
+    for a, b in ((aggressive, cautious), (CPUPolicy("default"), CPUPolicy("default copy"))):
+        estimator = WinRateEstimator(a, b, target_width=0.04)
+        start = time.perf_counter()
+        result = estimator.run()
+        low, high = result["win_rate_interval"]
+        print(f"{a.name} vs {b.name}: {result['win_rate']:.3f} [{low:.3f}, {high:.3f}] "
+              f"after {result['games']} games ({result['stop_reason']}, "
+              f"{time.perf_counter() - start:.1f}s); fixed-N would need "
+              f"{estimator.fixed_games_needed()}; mean turns {result['mean_turns']:.1f}")
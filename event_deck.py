@@ -0,0 +1,188 @@
+"""
+Data-driven event deck for the Event tiles.
+
+Every card has a weight and an effect that changes the game state:
+    cash = add `amount` to the player's cash (negative to pay)
+    move = move the player `amount` spaces (negative to go back)
+    jail = send the player to jail
+"""
+import random
+
+EVENT_EFFECTS = ("cash", "move", "jail")
+
+EVENT_CARDS = [
+    {"name": "car", "message": "you get a car", "good": True,
+     "weight": 2, "effect": "cash", "amount": 150},
+    {"name": "dorm", "message": "you get a new dorm", "good": True,
+     "weight": 3, "effect": "cash", "amount": 100},
+    {"name": "scooter", "message": "you get a scooter", "good": True,
+     "weight": 3, "effect": "move", "amount": 3},
+    {"name": "parking_ticket", "message": "you get a parking ticket", "good": False,
+     "weight": 4, "effect": "cash", "amount": -50},
+    {"name": "flood", "message": "you have your dorm flooded", "good": False,
+     "weight": 2, "effect": "cash", "amount": -150},
+    {"name": "flat_tire", "message": "you get a flat on your scooter wheel", "good": False,
+     "weight": 3, "effect": "move", "amount": -2},
+    {"name": "campus_police", "message": "campus police caught you scootering on the Mall", "good": False,
+     "weight": 1, "effect": "jail", "amount": 0},
+]
+
+
+class EventCard:
+    """
+    A single event card.
+
+    Args:
+        name(str): short identifier used in stats and saves.
+        message(str): text shown to the player.
+        weight(float): relative chance of drawing this card.
+        effect(str): one of EVENT_EFFECTS.
+        amount(int): cash delta or number of spaces, depending on effect.
+        good(bool): whether this is a good event for the player.
+    """
+
+    def __init__(self, name, message, weight, effect, amount=0, good=True):
+        if effect not in EVENT_EFFECTS:
+            raise ValueError(f"Unknown event effect '{effect}' for card '{name}'")
+        if weight <= 0:
+            raise ValueError(f"Event card '{name}' needs a positive weight, got {weight}")
+
+        self.name = name
+        self.message = message
+        self.weight = weight
+        self.effect = effect
+        self.amount = amount
+        self.good = good
+
+    def __str__(self):
+        """Message in the same form event_generator used to print."""
+        kind = "good" if self.good else "bad"
+        return f"Your {kind} event is {self.message}"
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"EventCard(name='{self.name}', effect='{self.effect}', amount={self.amount})"
+
+
+class EventDeck:
+    """
+    Weighted event deck compiled once into an alias table.
+
+    Drawing a card costs one uniform random number and two list lookups
+    no matter how many cards are in the deck (Vose's alias method).
+    """
+
+    def __init__(self, cards=None):
+        """
+        Compile the deck.
+
+        Args:
+            cards(list): EventCard objects or dicts shaped like EVENT_CARDS.
+                Defaults to EVENT_CARDS.
+        """
+        if cards is None:
+            cards = EVENT_CARDS
+        self.cards = [card if isinstance(card, EventCard) else EventCard(**card)
+                      for card in cards]
+        if not self.cards:
+            raise ValueError("An event deck needs at least one card")
+
+        self._size = len(self.cards)
+        self._probability, self._alias = self._build_alias_table(
+            [card.weight for card in self.cards])
+
+    @staticmethod
+    def _build_alias_table(weights):
+        """
+        Build the probability and alias columns for Vose's alias method.
+
+        Returns:
+            tuple: (probability list, alias index list), one entry per card.
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        scaled = [w * count / total for w in weights]
+
+        probability = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Anything left over is 1.0 up to rounding error
+        return probability, alias
+
+    def draw_index(self, rng=None):
+        """
+        Draw the index of one card.
+
+        Args:
+            rng: object with a random() method returning floats in [0, 1).
+                Defaults to the random module.
+
+        Returns:
+            int: index into self.cards.
+        """
+        u = (rng or random).random() * self._size
+        i = int(u)
+        return i if u - i < self._probability[i] else self._alias[i]
+
+    def draw(self, rng=None):
+        """Draw one card. See draw_index for the rng argument."""
+        return self.cards[self.draw_index(rng)]
+
+    def draw_batch(self, count, rng=None):
+        """
+        Draw many cards at once for simulators.
+
+        Args:
+            count(int): number of cards to draw.
+            rng: object with a random() method (defaults to the random module).
+
+        Returns:
+            list: `count` EventCard objects, drawn with replacement.
+        """
+        rand = (rng or random).random
+        cards = self.cards
+        probability = self._probability
+        alias = self._alias
+        size = self._size
+
+        drawn = []
+        for _ in range(count):
+            u = rand() * size
+            i = int(u)
+            drawn.append(cards[i] if u - i < probability[i] else cards[alias[i]])
+        return drawn
+
+    def probabilities(self):
+        """
+        Exact draw probability of every card, from the weights.
+
+        Returns:
+            dict: card name -> probability.
+        """
+        total = float(sum(card.weight for card in self.cards))
+        return {card.name: card.weight / total for card in self.cards}
+
+
+# Compiled once per process and shared by every game
+DEFAULT_DECK = EventDeck()
+
+
+if __name__ == "__main__":
+    from collections import Counter
+
+    draws = Counter(card.name for card in DEFAULT_DECK.draw_batch(100000))
+    for name, expected in DEFAULT_DECK.probabilities().items():
+        print(f"{name:15} expected {expected:.3f}  drawn {draws[name] / 100000:.3f}")
@@ -1,26 +1,75 @@
-from random import randint
+from collections import deque
+
 from UMD_player import Player
 from UMD_property import UMDProperty
 from board import MakeBoard
-from decision_engine import decision_engine
-from event_generator import event_generator
+from board_spec import get_board
+from buildings import BuildEngine
+from trading import TradeEngine
+from event_deck import DEFAULT_DECK
+from kernel import (BUY, JAIL_0, MOVER, NONE, PENDING, RUNNING, SKIP, STATUS, TIE, cpu_phase,
+                    draw_roll, next_state, rules_for)
+from rng import GameRNG
 from save import save_game
+from zobrist import GameHasher
 
 
 class Game:
-        """
-        Main controller for the game. Handles the turns, players, board state,
-        property,game termination, and saving the game.
-        """
-
-    def __init__(self, mode="player_vs_cpu", p1="Player 1", p2="Player 2"):
+    """
+    Main controller for the game. Handles the turns, players, board state,
+    property,game termination, and saving the game.
+
+    The rules are applied by kernel.py to the compact state in self.state.
+    Game draws the rolls, asks the players for their decisions, and keeps
+    the Player and UMDProperty objects in step with the state as views.
+    """
+
+    # Rent is multiplied to speed up the game
+    RENT_MULTIPLIER = 7
+    # Entries kept in endurance mode
+    EVENT_LOG_LIMIT = 256
+    HISTORY_LIMIT = 16
+    # A game uses about a hundred draws, so small RNG blocks keep setup cheap
+    RNG_BLOCK = 64
+
+    def __init__(self, mode="player_vs_cpu", p1="Player 1", p2="Player 2",
+                 event_deck=None, rng=None, seed=None, verbose=True, board=None,
+                 adjudicator=None, policies=None, zobrist=False, observers=None,
+                 profile_memory=False, max_turns=150, endurance=False):
         """
         Initialize the game, board, players, and property mappings.
 
         Args:
-            mode: Game mode ("player_vs_cpu" or "pvp").
+            mode: Game mode ("player_vs_cpu", "pvp" or "cpu_vs_cpu").
             p1: Name of player 1.
-            p2: Name of player 2 (only in PvP).
+            p2: Name of player 2 (PvP and CPU vs CPU).
+            event_deck: Optional EventDeck for the Event tiles
+                (defaults to the shared deck from event_deck.py).
+            rng: Optional GameRNG (or anything with roll() and random())
+                used for every dice roll and event draw.
+            seed: Seed for a new GameRNG when rng is not given.
+            verbose: Print the board and turn output. Headless simulations
+                pass False.
+            board: Optional compiled board from board_spec (defaults to
+                the shared board built from board_spec.json).
+            adjudicator: Optional Adjudicator that may end a decided game
+                early.
+            policies: Optional (player 1, player 2) CPUPolicy pair for the
+                CPU-controlled seats.
+            zobrist: Keep an incrementally updated state hash (see
+                state_hash()).
+            observers: Optional objects told about game events. Each may
+                define on_game_start(game), on_turn(game),
+                on_rent(game, owner, prop, amount) and on_game_end(game).
+                on_game_end fires once, from the turn() that ends the game.
+            profile_memory: Attach a memprof.MemoryProfiler (as
+                self.memory_profiler) that snapshots memory at turn and
+                game boundaries.
+            max_turns: Turn limit.
+            endurance: For very long games: keep only the latest events
+                and property history entries, and skip the per-turn
+                property listing, so each turn costs the same time and
+                memory however long the game runs.
 
         Side Effects:
             - Instantiates Player objects
@@ -28,26 +77,45 @@ class Game:
             - Creates property mappings
         """
 
-        self.board = MakeBoard()
+        self.verbose = verbose
+        board = board or get_board()
+        self.board = MakeBoard(board)
 
-        # player setup
+        # player setup; monopolies are judged by this board's groups
+        groups = UMDProperty.board_groups(board)
         if mode == "player_vs_cpu":
-            self.player = Player(p1, "@")   # Use actual name for player 1
-            self.cpu = Player("CPU", "#")
+            self.player = Player(p1, "@", verbose=verbose, groups=groups)   # Use actual name for player 1
+            self.cpu = Player("CPU", "#", is_cpu=True, verbose=verbose, groups=groups)
+            self.cpu_enabled = True
+        elif mode == "cpu_vs_cpu":
+            # Both seats are played by the decision engine (simulations)
+            self.player = Player(p1, "@", is_cpu=True, verbose=verbose, groups=groups)
+            self.cpu = Player(p2, "#", is_cpu=True, verbose=verbose, groups=groups)
             self.cpu_enabled = True
         else:
-            self.player = Player(p1, "@")
-            self.cpu = Player(p2, "#")      # if pvp add player 2 instead of cpu
+            self.player = Player(p1, "@", verbose=verbose, groups=groups)
+            self.cpu = Player(p2, "#", verbose=verbose, groups=groups)      # if pvp add player 2 instead of cpu
             self.cpu_enabled = False
 
+        if policies is not None:
+            self.player.policy, self.cpu.policy = policies
+
         # Register both tokens on board which will then give them their position
         self.board.players = {
             self.player.token: self.player.position,
             self.cpu.token: self.cpu.position
         }
 
-        # Property list from UMD_property.py
-        self.all_properties = UMDProperty.create_UMD_board()
+        # Property list from UMD_property.py, copied from the shared template
+        self.all_properties = UMDProperty.new_board(board)
+
+        self.event_deck = event_deck or DEFAULT_DECK
+        self.rules = rules_for(board, self.event_deck, max_turns)
+        self.state = self.rules.initial_state()
+        self.seats = (self.player, self.cpu)
+        # The property behind each byte of the state's property record
+        by_code = {prop.code: prop for prop in self.all_properties}
+        self.kernel_properties = [by_code[code] for code in self.rules.codes]
 
         # Create mapping from board symbols to properties
         self.board.prop_mapping = {}
@@ -57,10 +125,243 @@ class Game:
                 self.board.prop_mapping[symbol] = []
             self.board.prop_mapping[symbol].append(prop)
 
+        self.buildings = BuildEngine(self)
+        self.trader = TradeEngine(self)
+
+        self.rng = rng or GameRNG(seed, self.RNG_BLOCK)
+        self.event_log = deque(maxlen=self.EVENT_LOG_LIMIT) if endurance else []
+        self.jail_position = self.board.find_tile("J")
+
+        self.adjudicator = adjudicator
+        self.adjudicated_winner = None
+
         self.turn_count = 0
-        self.max_turns = 150
+        self.max_turns = max_turns
+        self.endurance = endurance
+        if endurance:
+            for prop in self.all_properties:
+                prop.purchase_history = deque(prop.purchase_history, maxlen=self.HISTORY_LIMIT)
+                prop.rent_history = deque(prop.rent_history, maxlen=self.HISTORY_LIMIT)
         self.current_player = "player"
 
+        # Created last so the hash starts from the finished setup
+        self.hasher = GameHasher(self) if zobrist else None
+
+        self.observers = list(observers or ())
+        self.ended = False
+        self.memory_profiler = None
+        if profile_memory:
+            from memprof import MemoryProfiler
+            self.memory_profiler = MemoryProfiler()
+            self.observers.append(self.memory_profiler)
+        self._notify("on_game_start")
+
+    def _notify(self, event, *args):
+        """Call `event` on every observer that defines it."""
+        for observer in self.observers:
+            handler = getattr(observer, event, None)
+            if handler is not None:
+                handler(self, *args)
+
+    def _finish(self):
+        """Tell the observers the game has ended, once."""
+        if not self.ended:
+            self.ended = True
+            self._notify("on_game_end")
+
+    def state_hash(self):
+        """
+        64-bit Zobrist hash of positions, ownership, improvements, mortgages,
+        bucketed cash and whose turn it is.
+
+        Returns:
+            int: the incrementally kept hash when the game was created with
+                zobrist=True, otherwise one computed from scratch.
+        """
+        if self.hasher is not None:
+            return self.hasher.value
+        return GameHasher(self).value
+
+    def to_state(self):
+        """
+        Compact immutable snapshot for the kernel (see kernel.py).
+
+        Returns:
+            tuple: the current kernel state, in self.rules.
+        """
+        return self.state
+
+    def load_state(self, state):
+        """
+        Make a kernel state this game's current state.
+
+        Args:
+            state(tuple): kernel state in self.rules, e.g. from to_state()
+                or kernel.next_state().
+
+        Side Effects:
+            Brings turn, mover, positions, cash, jail flags, ownership,
+            buildings and mortgages of the Player and UMDProperty objects
+            in line with the state. Only properties whose byte changed are
+            touched, and the players' running value totals move by those
+            changes alone. The Zobrist hash, when the game keeps one, is
+            updated for each change.
+        """
+        old, self.state = self.state, state
+        (turn, mover, _, _, pos_0, pos_1, cash_0, cash_1, jail_0, jail_1, props) = state
+        hasher = self.hasher
+        self.turn_count = turn
+        current_player = "player" if mover == 0 else "cpu"
+        if current_player != self.current_player:
+            self.current_player = current_player
+            if hasher is not None:
+                hasher.turn_changed()
+        for player, position, cash, jailed in ((self.player, pos_0, cash_0, jail_0),
+                                               (self.cpu, pos_1, cash_1, jail_1)):
+            if player.position != position:
+                if hasher is not None:
+                    hasher.position_changed(player, player.position, position)
+                player.position = position
+                self.board.players[player.token] = position
+            if player.cash != cash:
+                if hasher is not None:
+                    hasher.cash_changed(player, player.cash, cash)
+                player.cash = cash
+            player.in_jail = bool(jailed)
+
+        old_props = old[-1]
+        if props == old_props:
+            return
+        seats = (None, self.player, self.cpu)
+        for index, byte in enumerate(props):
+            if byte == old_props[index]:
+                continue
+            prop = self.kernel_properties[index]
+            previous, owner = prop.owner, seats[byte & 3]
+            # Running totals move by this property's change only
+            if previous is not owner:
+                if hasher is not None:
+                    hasher.owner_changed(prop, previous, owner)
+                if previous is not None:
+                    previous.release_property(prop)
+                prop.owner = None
+            elif owner is not None:
+                before = owner.property_totals(prop)
+            level = byte >> 3
+            houses, hotels = (0, 1) if level == 5 else (level, 0)
+            if prop.houses != houses or prop.hotels != hotels:
+                if hasher is not None:
+                    hasher.level_changed(prop, prop.improvement_level(), level)
+                prop.houses, prop.hotels = houses, hotels
+            if prop.mortgaged != bool(byte & 4):
+                if hasher is not None:
+                    hasher.mortgage_changed(prop)
+                prop.mortgaged = bool(byte & 4)
+            if owner is None:
+                continue
+            if previous is not owner:
+                owner.receive_property(prop)
+            else:
+                owner.update_property_totals(prop, before)
+
+    def act(self, action, *args, **kwargs):
+        """
+        Apply a kernel action to this game.
+
+        Args:
+            action: kernel function taking (state, *args, rules=, trace=)
+                and returning the new state, e.g. kernel.build.
+
+        Returns:
+            bool: True if the state changed.
+
+        Side Effects:
+            Loads the new state and reports what happened (see _report).
+        """
+        trace = []
+        state = action(self.state, *args, rules=self.rules, trace=trace, **kwargs)
+        changed = state is not self.state
+        self.load_state(state)
+        for event in trace:
+            self._report(event)
+        return changed
+
+    def _report(self, event):
+        """
+        Record one kernel trace event in the player stats, the property
+        history, the event log, the game output and the observers.
+        """
+        name = event[0]
+        if name in ("trade", "declined"):
+            offer = self.trader.from_kernel(event[1])
+            self.log(f"Trade done: {offer}" if name == "trade" else f"{offer.receiver.name} declined: {offer}")
+            return
+        if name == "limit":
+            return
+        player = self.seats[event[1]]
+
+        if name == "move":
+            position, passed = event[3], event[4]
+            player.total_moves += 1
+            if passed:
+                self.log(f"{player.name} passed GO! Collected ${self.rules.go_salary}.")
+            if self.verbose:
+                self.board.display_board()
+            self.log(f"{player.name} landed on: {self.board.get_tile(position)}")
+        elif name == "jailed":
+            player.jail_turns += 1
+            self.log(f"{player.name} spends this turn in jail.")
+        elif name == "card":
+            card = self.event_deck.cards[event[2]]
+            self.log(player.name, "triggered an Event!")
+            self.log(card)
+            player.events_drawn += 1
+            self.event_log.append({
+                "turn": self.turn_count,
+                "player": player.name,
+                "event": card.name
+            })
+            if card.effect == "cash":
+                self.log(f"{player.name}'s cash is now ${player.cash}")
+        elif name == "jail":
+            player.jail_turns = 0
+            self.log(f"{player.name} was sent to jail!")
+        elif name == "scooter":
+            self.log(player.name, "paid scooter rent:", event[2])
+        elif name == "rent":
+            prop, rent, paid = self.kernel_properties[event[2]], event[3], event[4]
+            owner = self.opponent(player)
+            prop.rent_collected += rent
+            owner.rent_collected += paid
+            self.log(f"{prop.name} is owned by {owner.name}.")
+            self.log(f"{player.name} owes ${rent} to {owner.name}")
+            if paid:
+                self.log(f"{player.name} paid ${paid} rent to {owner.name}. "
+                         f"Cash remaining for {player.name}: ${player.cash}")
+            if self.observers:
+                self._notify("on_rent", owner, prop, paid)
+        elif name == "bankrupt":
+            player.bankrupt = True
+            self.log(f"{player.name} cannot pay rent and goes bankrupt!")
+        elif name == "buy":
+            prop = self.kernel_properties[event[2]]
+            player.properties_bought += 1
+            prop.set_owner(player)
+            self.log(f"{player.name} bought {prop.name} for ${prop.cost}. Cash remaining: ${player.cash}")
+        elif name == "skip":
+            self.log(f"{player.name} skipped buying.")
+        else:
+            # build, sell, mortgage, unmortgage
+            verbs = {"build": "built on", "sell": "sold a building on", "mortgage": "mortgaged",
+                     "unmortgage": "lifted the mortgage on"}
+            self.log(f"{player.name} {verbs[name]} {self.kernel_properties[event[2]].name}. "
+                     f"Cash: ${player.cash}")
+
+    def log(self, *args):
+        """Print game output unless the game is headless."""
+        if self.verbose:
+            print(*args)
+
     def get_property_from_symbol(self, symbol):
         """
             Map a board symbol to its corresponding property.
@@ -105,29 +406,11 @@ class Game:
         """
 
         current = self.player
-        print("\nTurn:", self.turn_count + 1)
-
-        roll = randint(1, 6)
-        print(f"{current.name} rolled a {roll}")
-        
-
-        # Move player and update board
-        current.move(roll, 40)
-        self.board.players[current.token] = current.position
-        self.board.display_board()
+        self.log("\nTurn:", self.turn_count + 1)
 
-        # Tile symbol
-        tile_symbol = self.board.get_tile(current.position)
-        print(f"{current.name} landed on: {tile_symbol}")
-
-        # Handle tile
-        self.handle_tile(current, tile_symbol)
-
-        # Player loses
-        if current.cash <= 0:
-            print(f"{current.name} is out of money. Game over.")
+        if not self.play_turn(current):
+            self.log(f"{current.name} is out of money. Game over.")
             return False
-
         return True
 
     def cpu_take_turn(self):
@@ -142,83 +425,107 @@ class Game:
                 - Prints turn output
         """
 
-        roll = randint(1, 6)
         current = self.cpu  # Could be CPU or Player 2 depending on what user selected
+        if not current.in_jail:
+            self.log("\nCPU TURN:" if self.cpu_enabled else f"\n{current.name}'s TURN:")
 
-        if self.cpu_enabled:
-            print("\nCPU TURN:")
-            print("CPU rolled:", roll)
-        else:
-            print(f"\n{current.name}'s TURN:")
-            print(f"{current.name} rolled: {roll}")
+        if not self.play_turn(current):
+            if self.cpu_enabled:
+                self.log("CPU is out of money. YOU WIN!")
+            else:
+                self.log(f"{current.name} is out of money. GAME OVER!")
+            return False
+        return True
 
-        current.move(roll, 40)
-        self.board.players[current.token] = current.position
-        self.board.display_board()
+    def play_turn(self, player):
+        """
+            Play the mover's turn on the kernel: roll (unless the turn is
+            spent in jail), move and handle the tile, settle a purchase,
+            then the build phase. kernel.play_turn is the same sequence for
+            two CPU seats.
 
-        tile_symbol = self.board.get_tile(current.position)
+            Args:
+                player: Player whose turn it is.
 
-        if self.cpu_enabled:
-            print("CPU landed on:", tile_symbol)
-        else:
-            print(f"{current.name} landed on:", tile_symbol)
+            Returns:
+                bool: False if the player lost the game this turn.
+        """
 
-        self.handle_tile(current, tile_symbol)
+        jailed = self.state[JAIL_0 + self.state[MOVER]]
+        roll = None
+        if not jailed:
+            roll = draw_roll(self.rng, self.rules.deck)
+            self.log(f"{player.name} rolled a {roll[0]}")
+        self.act(next_state, roll, SKIP)
 
-        if current.cash <= 0:
-            if self.cpu_enabled:
-                print("CPU is out of money. YOU WIN!")
-            else:
-                print(f"{current.name} is out of money. GAME OVER!")
-            return False
+        pending = self.state[PENDING]
+        if pending != NONE:
+            self.act(next_state, None, self.buy_logic(player, self.kernel_properties[pending]))
 
+        if self.state[STATUS] != RUNNING:
+            return False
+        if not jailed:
+            self.build_phase(player)
         return True
 
-    def handle_tile(self, player, tile_symbol):
+    def build_phase(self, player):
         """
-            Deals with landing on a tile.
+            Let the player put houses and hotels on their monopolies.
 
             Args:
-                player: Current player.
-                tile_symbol: Symbol of the tile landed on.
+                player: Player who just finished moving.
 
             Side Effects:
-                - trigger events
-                -  modify player cash
-                - include buy or rent logic
+                - Buys buildings from the bank and charges the player
         """
 
-
-        # Event tile
-        if tile_symbol == "E":
-            print(player.name, "triggered an Event!")   
-            event_generator()
+        if player.is_cpu:
+            other = self.opponent(player)
+            accept = None
+            if not other.is_cpu:
+                def accept(offer):
+                    return self.accept_trade(other, self.trader.from_kernel(offer))
+            self.act(cpu_phase, self.seats.index(player), player.policy.build_reserve, accept=accept)
             return
 
-        # Jail tile
-        if tile_symbol == "J":
-            print(player.name, "is in jail.")
+        if not player.monopolies:
             return
 
-        # Scooter rental
-        if tile_symbol == "R":
-            rent = randint(1, 6) * 20
-            print(player.name, "paid scooter rent:", rent)
-            player.cash -= rent
-            return
+        while True:
+            options = self.buildings.buildable(player)
+            if not options:
+                return
+            prop = options[0]
+            cost = self.buildings.house_cost(prop)
+            choice = input(f"Build on {prop.name} for ${cost}? (y/n): ").strip().lower()
+            if choice != "y":
+                return
+            self.buildings.build(player, prop)
+
+    def opponent(self, player):
+        """Return the other player."""
+        return self.cpu if player is self.player else self.player
+
+    def accept_trade(self, player, offer):
+        """
+            Ask the receiving player whether to take a trade.
 
-        # Property tile
-        prop = self.get_property_from_symbol(tile_symbol)
-        if prop is None:
-            print("Blank or unsupported tile.")
-            return
+            Args:
+                player: Player receiving the offer.
+                offer: TradeOffer to answer.
 
-        print(player.name, "landed on property:", prop.name)
+            Returns:
+                bool: True if the offer is accepted.
+        """
 
-        if prop.owner is None:
-            self.buy_logic(player, prop)
-        else:
-            self.rent_logic(player, prop)
+        if player.is_cpu:
+            return self.trader.evaluate(offer)[1] >= 0
+
+        while True:
+            choice = input(f"{offer}. Accept? (y/n): ").strip().lower()
+            if choice in ("y", "n"):
+                return choice == "y"
+            self.log("Invalid input. Please enter 'y' or 'n'.")
 
     def buy_logic(self, player, prop):
         """
@@ -228,73 +535,30 @@ class Game:
                 player: Player attempting to buy.
                 prop: Property being chosen for buying.
 
-            Side Effects:
-                - Reduces cash
-                - Assigns property ownership
+            Returns:
+                int: kernel.BUY or kernel.SKIP.
         """
 
-        
-
         cost = prop.cost
-        player_properties = []
         # CPU logic
-        if player.name == "CPU":
-            result = decision_engine(player.cash, cost, prop.code, "mid")
-            print("CPU decision:", result["decision"])
-
-            if result["decision"] == "buy":
-                player.buy_property(prop)
-                player_properties.append(prop.name)
-            else:
-                print("CPU skipped buying.")
-            return
+        if player.is_cpu:
+            result = player.policy.decide(player.cash, cost, prop.code, "mid")
+            self.log("CPU decision:", result["decision"])
+            return BUY if result["decision"] == "buy" else SKIP
 
         # Human player logic
-        print("Property cost:", cost)
+        self.log(player.name, "landed on property:", prop.name)
+        self.log("Property cost:", cost)
 
         while True:
             choice = input("Buy it? (y/n): ").strip().lower()
 
             if choice == "y":
-                player.buy_property(prop)
-                player_properties.append(prop.name)
-                break
+                return BUY
             elif choice == "n":
-                print(f"{player.name} skipped buying.")
-                break
+                return SKIP
             else:
-                print("Invalid input. Please enter 'y' or 'n'.")
-        print(f"{player.name} now owns: {', '.join(player_properties)}")
-        
-    def rent_logic(self, player, prop):
-        """
-            Handles rent payment.
-
-            Args:
-                player: Player paying rent.
-                prop: Property landed on.
-
-            Side Effects:
-                - Transfers cash between players/cpu
-        """
-
-        owner = prop.owner
-
-        if owner == player:
-            print(f"{player.name} already owns this property.")
-            
-            return
-        elif owner !=player and owner:
-            print(f"{prop.name} is owned by {owner.name}.")
-
-        # Monopoly logic
-        monopoly = owner.has_monopoly(prop.group)
-
-        rent = prop.calculate_rent(owner_has_monopoly=monopoly)
-        rent *= 7 # Speed up game
-        print(f"{player.name} owes ${rent} to {owner.name}")
-
-        player.pay_rent(rent, owner)
+                self.log("Invalid input. Please enter 'y' or 'n'.")
 
     def turn(self):
         """
@@ -306,54 +570,173 @@ class Game:
             Side Effects:
                 - Increases turn count
                 - Swaps active player
+                - Notifies on_game_end when the game ends
         """
 
-        # Game ends at turn limit
-        if self.turn_count >= self.max_turns:
-            print("\nReached turn limit. Ending game...")
+        if self.state[STATUS] != RUNNING:
+            self._finish()
             return False
 
-        self.turn_count += 1
+        # Game ends at turn limit, decided by net worth
+        if self.turn_count >= self.max_turns:
+            self.log("\nReached turn limit. Ending game...")
+            self.act(next_state, None, SKIP)
+            self._finish()
+            return False
 
         if self.current_player == "player":
+            self.player.turns_played += 1
             alive = self.take_turn()
-            self.current_player = "cpu"
         else:
+            self.cpu.turns_played += 1
             alive = self.cpu_take_turn()
-            self.current_player = "player"
-        print(self)
+        if not self.endurance:
+            self.log(self)
+        self._notify("on_turn")
+
+        if alive and self.adjudicator is not None:
+            decided = self.adjudicator.check(self)
+            if decided is not None:
+                self.adjudicated_winner = decided
+                self.log(f"\nThe game is decided: {decided.name} wins on adjudication.")
+                self._finish()
+                return False
+        if not alive:
+            self._finish()
         return alive
 
-    def end_game(self):
+    def winner(self):
         """
-            End the game and save final state.
+            Decide who won.
 
-            Side Effects:
-                - Writes save data to disk
+            Returns:
+                Player or None: The adjudicated winner, the player still
+                solvent, or at the turn limit the player with the higher net
+                worth. None on a tie.
         """
 
-        print("\nGame over!")
+        if self.adjudicated_winner is not None:
+            return self.adjudicated_winner
+        status = self.state[STATUS]
+        if status != RUNNING:
+            return None if status == TIE else self.seats[status]
+        if self.player.cash <= 0 or self.player.bankrupt:
+            return self.cpu
+        if self.cpu.cash <= 0 or self.cpu.bankrupt:
+            return self.player
+        if self.player.net_worth > self.cpu.net_worth:
+            return self.player
+        if self.cpu.net_worth > self.player.net_worth:
+            return self.cpu
+        return None
+
+    def summary(self):
+        """
+            Per-game facts for simulation results.
+
+            Returns:
+                dict: seed, winner seat (0, 1 or -1 for a tie), turns, whether
+                the game was adjudicated, and per seat lists of final cash, rent collected and properties held
+                per group.
+        """
+
+        seats = (self.player, self.cpu)
+        winner = self.winner()
+        return {
+            "seed": self.rng.seed,
+            "winner": seats.index(winner) if winner is not None else -1,
+            "turns": self.turn_count,
+            "adjudicated": self.adjudicated_winner is not None,
+            "cash": [p.cash for p in seats],
+            "rent_collected": [p.rent_collected for p in seats],
+            "properties": [{group: len(codes) for group, codes in p.owned_groups.items()}
+                           for p in seats]
+        }
+
+    def play(self):
+        """
+            Play the game to the end without saving, for headless simulations.
+
+            Returns:
+                dict: summary() of the finished game.
+        """
+
+        while self.turn():
+            pass
+        return self.summary()
+
+    def snapshot(self, final=False):
+        """
+            Build the save data for the game as plain values.
+
+            Args:
+                final: True once the game is over; the winner is only
+                    recorded then.
+
+            Returns:
+                dict: Turns, winner (name and seat), players, events, the
+                state hash, and for resuming: the packed kernel state (see
+                kernel.py) with the digest of its board's property order,
+                the players' statistics, the adjudicated seat, the turn
+                limit and endurance setting, the CPU policies and the
+                GameRNG position (None for another kind of rng).
+        """
+
+        from kernel import pack
 
         # this will give the data for not just player 1 but also player 2. before we only had player 1 save data
         player1_data = {
         "name": self.player.name,
         "cash": self.player.cash,
+        "events_drawn": self.player.events_drawn,
+        "turns_played": self.player.turns_played,
+        "rent_collected": self.player.rent_collected,
+        "properties_bought": self.player.properties_bought,
         "properties": [prop.to_dict() for prop in self.player.properties]
         }
 
         player2_data = {
         "name": self.cpu.name,
         "cash": self.cpu.cash,
+        "events_drawn": self.cpu.events_drawn,
+        "turns_played": self.cpu.turns_played,
+        "rent_collected": self.cpu.rent_collected,
+        "properties_bought": self.cpu.properties_bought,
         "properties": [prop.to_dict() for prop in self.cpu.properties]
         }
 
         # Full saved game state
-        game_state = {
+        winner = self.winner() if final else None
+        return {
         "turns_played": self.turn_count,
-        "players": [player1_data, player2_data]
+        "winner": winner.name if winner is not None else None,
+        "winner_seat": None if winner is None else 0 if winner is self.player else 1,
+        "adjudicated": self.adjudicated_winner is not None,
+        "adjudicated_seat": None if self.adjudicated_winner is None
+            else self.seats.index(self.adjudicated_winner),
+        "max_turns": self.max_turns,
+        "endurance": self.endurance,
+        "state_hash": f"{self.state_hash():016x}",
+        "board_digest": self.rules.board_digest,
+        "state": pack(self.to_state()).hex(),
+        "policies": [self.player.policy.params(), self.cpu.policy.params()],
+        "rng": self.rng.getstate() if isinstance(self.rng, GameRNG) else None,
+        "players": [player1_data, player2_data],
+        "events": list(self.event_log)
         }
 
-        save_game(game_state)
+    def end_game(self):
+        """
+            End the game and save final state.
+
+            Side Effects:
+                - Writes save data to disk
+        """
+
+        self.log("\nGame over!")
+        self._finish()
+
+        save_game(self.snapshot(final=True))
 
 
     def __str__(self):
@@ -380,7 +763,7 @@ class Game:
             Run the main game loop until termination.
         """
 
-        print("Game Started!")
+        self.log("Game Started!")
 
         while True:
             alive = self.turn()
@@ -0,0 +1,1057 @@
+"""
+Pure state-transition kernel.
+
+A game state is a flat tuple of small integers plus one bytes record:
+
+    (turn, mover, pending, status, position_0, position_1, cash_0, cash_1,
+     jail_0, jail_1, properties)
+
+`properties` holds one byte per ownable property (in KernelRules order):
+bits 0-1 are the owner (0 nobody, 1 seat 0, 2 seat 1), bit 2 the mortgage
+flag and bits 3-5 the improvement level (0-4 houses, 5 for a hotel).
+`pending` is the property the mover may buy, or NONE. `status` is RUNNING,
+the winning seat, or TIE.
+
+next_state(state, roll, decision) plays one step and returns a new state.
+It never mutates anything, so states can be hashed, cached and sent to
+worker processes cheaply. All randomness comes in through `roll`.
+
+The kernel holds every rule of the game: dice, GO salary, buying, rent
+with monopolies, event cards, scooter rent, jail, selling buildings and
+mortgaging to raise cash, bankruptcy, the cash <= 0 loss and the turn
+limit, plus the choices made between turns (build(), sell(), mortgage(),
+unmortgage(), trade()) and the CPU's between-turn play (cpu_phase()).
+Game is a shell around it: it draws the rolls, asks players for their
+decisions and keeps its Player and UMDProperty objects as views of the
+current state. play() runs the same turn sequence without the objects.
+"""
+import hashlib
+import struct
+
+from board_spec import get_board
+from event_deck import DEFAULT_DECK
+from UMD_property import UMDProperty
+
+TURN, MOVER, PENDING, STATUS, POSITION_0, POSITION_1, CASH_0, CASH_1, JAIL_0, JAIL_1, PROPERTIES = range(11)
+
+NONE = -1
+RUNNING, TIE = -1, 2
+SKIP, BUY = 0, 1
+
+HOTEL_LEVEL = 5
+# Special tiles in KernelRules.tile_kind
+EVENT, SCOOTER, BLANK = -1, -2, -3
+
+# Building supply shared by both players
+BANK_HOUSES, BANK_HOTELS = 32, 12
+# Lifting a mortgage costs the mortgage value plus 10% interest
+UNMORTGAGE_RATE = 1.1
+
+# Trade search (see best_offer): price points tried for each candidate, as
+# multiples of the property cost, how many opponent turns of extra rent a
+# trade is valued over, and the share of the other side's rent gain
+# counted as a loss
+PRICE_STEPS = (0.75, 1.0, 1.25, 1.5, 2.0, 3.0)
+HORIZON_TURNS = 20
+OPPONENT_WEIGHT = 0.5
+# A CPU proposes a trade on one in every TRADE_EVERY of its own turns
+TRADE_EVERY = 3
+
+PACKED = struct.Struct("<HbbbBBqqBB")
+
+
+class KernelRules:
+    """
+    Static tables for one board: everything the kernel looks up.
+    """
+
+    def __init__(self, board=None, event_deck=None, rent_multiplier=None, max_turns=150,
+                 starting_cash=1500):
+        """
+        Args:
+            board(dict): compiled board (defaults to board_spec.json).
+            event_deck(EventDeck): deck for Event tiles.
+            rent_multiplier(int): defaults to Game.RENT_MULTIPLIER.
+            max_turns(int): turn limit, as in Game.
+            starting_cash(int): cash each seat starts with.
+        """
+        if rent_multiplier is None:
+            from game import Game
+            rent_multiplier = Game.RENT_MULTIPLIER
+
+        board = board or get_board()
+        self.board_size = board["board_size"]
+        self.go_salary = board["go_salary"]
+        self.max_turns = max_turns
+        self.starting_cash = starting_cash
+        self.rent_multiplier = rent_multiplier
+        self.deck = event_deck or DEFAULT_DECK
+        self.card_effects = tuple((card.effect, card.amount) for card in self.deck.cards)
+        self.bank_houses = BANK_HOUSES
+        self.bank_hotels = BANK_HOTELS
+
+        properties = [prop for prop in UMDProperty.create_UMD_board(board)
+                      if prop.group in prop.groups]
+        self.codes = tuple(prop.code for prop in properties)
+        # Names the property order of packed states, so saves can be
+        # decoded with the codes they were written with
+        self.board_digest = hashlib.sha256("\n".join(self.codes).encode()).hexdigest()[:16]
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.cost = tuple(prop.cost for prop in properties)
+        self.house_cost = tuple(prop._get_house_cost() for prop in properties)
+        self.unmortgage_cost = tuple(int(prop.mortgage_value() * UNMORTGAGE_RATE) for prop in properties)
+
+        # rent[p][(level * 2 + mortgaged) * 2 + monopoly], from the rent tables
+        rent, value = [], []
+        for prop in properties:
+            prop.build_rent_table()
+            rents, values = [], []
+            for level in range(HOTEL_LEVEL + 1):
+                houses, hotels = (0, 1) if level == HOTEL_LEVEL else (level, 0)
+                for mortgaged in (False, True):
+                    for monopoly in (False, True):
+                        rents.append(prop.rent_table[UMDProperty.rent_index(houses, hotels, monopoly, mortgaged)])
+                    # Same formula as UMDProperty.calculate_value
+                    house_cost = prop._get_house_cost()
+                    values.append((prop.cost // 2 if mortgaged else prop.cost)
+                                  + houses * (house_cost // 2) + hotels * house_cost * 2)
+            rent.append(tuple(rents))
+            value.append(tuple(values))
+        self.rent = tuple(rent)
+        self.value = tuple(value)  # value[p][level * 2 + mortgaged]
+
+        # Groups by index: members[g], full_set[g]; group_of[p] per property
+        group_index = {}
+        for prop in properties:
+            group_index.setdefault(prop.group, len(group_index))
+        self.group_names = tuple(group_index)
+        self.group_of = tuple(group_index[prop.group] for prop in properties)
+        self.members = tuple(tuple(i for i, prop in enumerate(properties) if prop.group == name)
+                             for name in self.group_names)
+        self.full_set = tuple(properties[members[0]].groups[name]["full_set_count"]
+                              for name, members in zip(self.group_names, self.members))
+        self.group_members = tuple(self.members[g] for g in self.group_of)
+        self.group_size = tuple(self.full_set[g] for g in self.group_of)
+
+        specials = {"E": EVENT, "R": SCOOTER}
+        self.tile_kind = tuple(self.index.get(symbol, specials.get(symbol, BLANK))
+                               for symbol in board["tiles"])
+        self.jail_position = board["tiles"].index("J") if "J" in board["tiles"] else 0
+        # Rough landing chance per opponent turn (tiles showing the code /
+        # board size), used to value trades
+        self.land_chance = tuple(board["tiles"].count(code) / self.board_size for code in self.codes)
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"KernelRules(properties={len(self.codes)}, board_size={self.board_size})"
+
+    def initial_state(self):
+        """State before the first turn."""
+        cash = self.starting_cash
+        return (0, 0, NONE, RUNNING, 0, 0, cash, cash, 0, 0, bytes(len(self.codes)))
+
+
+# (board id, deck id, max_turns, rent multiplier, rent config version) -> (board, deck, rules)
+_rules_cache = {}
+RULES_CACHE_SIZE = 16
+
+
+def rules_for(board=None, event_deck=None, max_turns=150):
+    """
+    KernelRules for a board, deck and turn limit, built once and reused.
+
+    Rebuilt after UMDProperty.update_group_config() or a change to
+    Game.RENT_MULTIPLIER. Only the most recent RULES_CACHE_SIZE
+    combinations are kept.
+
+    Args:
+        board(dict): compiled board (defaults to board_spec.json).
+        event_deck(EventDeck): defaults to the shared deck.
+        max_turns(int): turn limit.
+
+    Returns:
+        KernelRules: shared, read-only tables.
+    """
+    from game import Game
+
+    board = board or get_board()
+    deck = event_deck or DEFAULT_DECK
+    key = (id(board), id(deck), max_turns, Game.RENT_MULTIPLIER, UMDProperty.rent_config_version)
+    cached = _rules_cache.get(key)
+    # The objects are kept with the rules, so a recycled id() cannot match
+    if cached is None or cached[0] is not board or cached[1] is not deck:
+        if len(_rules_cache) >= RULES_CACHE_SIZE:
+            del _rules_cache[next(iter(_rules_cache))]
+        cached = (board, deck, KernelRules(board, deck, Game.RENT_MULTIPLIER, max_turns))
+        _rules_cache[key] = cached
+    return cached[2]
+
+
+def default_rules():
+    """KernelRules for the default board and deck (see rules_for)."""
+    return rules_for()
+
+
+def draw_roll(rng, deck=DEFAULT_DECK):
+    """
+    Everything one turn might need from the dice.
+
+    Args:
+        rng: GameRNG (or anything with roll() and random()).
+
+    Returns:
+        tuple: (die, event card index, scooter die).
+    """
+    return rng.roll(), deck.draw_index(rng), rng.roll()
+
+
+def _monopoly(props, p, owner, rules):
+    """True if `owner` (a byte owner code) holds p's whole group."""
+    held = 0
+    for member in rules.group_members[p]:
+        if props[member] & 3 == owner:
+            held += 1
+    return held >= rules.group_size[p]
+
+
+def net_worth(state, seat, rules=None):
+    """Cash plus property value for one seat (as Player.net_worth)."""
+    rules = rules or default_rules()
+    worth = state[CASH_0 + seat]
+    for p, byte in enumerate(state[PROPERTIES]):
+        if byte & 3 == seat + 1:
+            worth += rules.value[p][byte >> 2]
+    return worth
+
+
+def _finished(state, rules):
+    """The state with STATUS set by net worth at the turn limit."""
+    worth_0, worth_1 = net_worth(state, 0, rules), net_worth(state, 1, rules)
+    status = 0 if worth_0 > worth_1 else 1 if worth_1 > worth_0 else TIE
+    return state[:STATUS] + (status,) + state[STATUS + 1:]
+
+
+def buildings_in_use(props):
+    """
+    Houses and hotels standing on the board.
+
+    Args:
+        props(bytes): the state's property record.
+
+    Returns:
+        tuple: (houses, hotels). The bank holds the rest of
+            KernelRules.bank_houses and bank_hotels.
+    """
+    houses = hotels = 0
+    for byte in props:
+        level = byte >> 3
+        if level == HOTEL_LEVEL:
+            hotels += 1
+        else:
+            houses += level
+    return houses, hotels
+
+
+class _Counts:
+    """
+    Bank stock and per-group state for the building rules: buildings in
+    use, how many members of each group stand at each level, mortgaged
+    members and members held by each owner code. Counted once from a
+    property record and kept up to date by the actions below, so each
+    check is a few lookups instead of a pass over the board.
+    """
+
+    __slots__ = ("houses", "hotels", "levels", "mortgaged", "held")
+
+    def __init__(self, props, rules):
+        self.levels, self.mortgaged, self.held = [], [], []
+        for members in rules.members:
+            levels, held = [0] * (HOTEL_LEVEL + 1), [0, 0, 0]
+            mortgaged = 0
+            for p in members:
+                byte = props[p]
+                levels[byte >> 3] += 1
+                held[byte & 3] += 1
+                mortgaged += byte & 4
+            self.levels.append(levels)
+            self.held.append(held)
+            self.mortgaged.append(mortgaged >> 2)
+        self.houses = sum(level * count for levels in self.levels
+                          for level, count in enumerate(levels[:HOTEL_LEVEL]))
+        self.hotels = sum(levels[HOTEL_LEVEL] for levels in self.levels)
+
+    def lowest(self, g):
+        """Lowest level in group g."""
+        levels = self.levels[g]
+        level = 0
+        while not levels[level]:
+            level += 1
+        return level
+
+    def highest(self, g):
+        """Highest level in group g."""
+        levels = self.levels[g]
+        level = HOTEL_LEVEL
+        while not levels[level]:
+            level -= 1
+        return level
+
+    def level_changed(self, g, old, new):
+        """One member of group g went from level `old` to `new`."""
+        self.levels[g][old] -= 1
+        self.levels[g][new] += 1
+        if old == HOTEL_LEVEL:
+            self.hotels -= 1
+            self.houses += new
+        elif new == HOTEL_LEVEL:
+            self.hotels += 1
+            self.houses -= old
+        else:
+            self.houses += new - old
+
+
+# Between-turn actions. Each works in place on a bytearray of properties
+# and a [cash_0, cash_1] list, and returns a true value if anything changed.
+# `counts` is the _Counts of the same properties when the caller keeps one
+# across several actions; without it the action counts for itself.
+
+def _can_build(props, cash, seat, p, rules, counts=None):
+    """
+    One more building is allowed when the seat owns the whole group,
+    nothing in the group is mortgaged, the property is at the group's
+    lowest level and below a hotel, the bank has the building, and the
+    seat can pay for it.
+    """
+    owner = seat + 1
+    byte = props[p]
+    level = byte >> 3
+    if byte & 3 != owner or level >= HOTEL_LEVEL or cash[seat] < rules.house_cost[p]:
+        return False
+    counts = counts or _Counts(props, rules)
+    g = rules.group_of[p]
+    if counts.held[g][owner] < rules.full_set[g] or counts.mortgaged[g] or counts.lowest(g) < level:
+        return False
+    if level == HOTEL_LEVEL - 1:
+        return counts.hotels < rules.bank_hotels
+    return counts.houses < rules.bank_houses
+
+
+def _build(props, cash, seat, p, rules, trace=None, counts=None):
+    """One house, or the hotel after four houses (which go back to the bank)."""
+    counts = counts or _Counts(props, rules)
+    if not _can_build(props, cash, seat, p, rules, counts):
+        return False
+    level = props[p] >> 3
+    props[p] += 8
+    cash[seat] -= rules.house_cost[p]
+    counts.level_changed(rules.group_of[p], level, level + 1)
+    if trace is not None:
+        trace.append(("build", seat, p))
+    return True
+
+
+def _can_sell(props, seat, p, rules, counts=None):
+    """
+    Selling stays even too: only a property at its group's highest level
+    can lose a building, and breaking a hotel needs four houses in the bank.
+    """
+    byte = props[p]
+    level = byte >> 3
+    if byte & 3 != seat + 1 or not level:
+        return False
+    counts = counts or _Counts(props, rules)
+    if counts.highest(rules.group_of[p]) > level:
+        return False
+    return level != HOTEL_LEVEL or rules.bank_houses - counts.houses >= HOTEL_LEVEL - 1
+
+
+def _sell(props, cash, seat, p, rules, trace=None, counts=None):
+    """One building back to the bank for half its cost."""
+    counts = counts or _Counts(props, rules)
+    if not _can_sell(props, seat, p, rules, counts):
+        return False
+    level = props[p] >> 3
+    props[p] -= 8
+    cash[seat] += rules.house_cost[p] // 2
+    counts.level_changed(rules.group_of[p], level, level - 1)
+    if trace is not None:
+        trace.append(("sell", seat, p))
+    return True
+
+
+def _can_mortgage(props, seat, p, rules, counts=None):
+    """An unmortgaged property can be mortgaged when its group has no buildings."""
+    if props[p] & 7 != seat + 1:
+        return False
+    if counts is not None:
+        g = rules.group_of[p]
+        return counts.levels[g][0] == len(rules.members[g])
+    for member in rules.group_members[p]:
+        if props[member] >> 3:
+            return False
+    return True
+
+
+def _mortgage(props, cash, seat, p, rules, trace=None, counts=None):
+    """Mortgage a property for half its cost."""
+    if not _can_mortgage(props, seat, p, rules, counts):
+        return False
+    props[p] |= 4
+    cash[seat] += rules.cost[p] // 2
+    if counts is not None:
+        counts.mortgaged[rules.group_of[p]] += 1
+    if trace is not None:
+        trace.append(("mortgage", seat, p))
+    return True
+
+
+def _unmortgage(props, cash, seat, p, rules, trace=None, counts=None):
+    """Pay off a mortgage with interest."""
+    cost = rules.unmortgage_cost[p]
+    if props[p] & 7 != (seat + 1) | 4 or cash[seat] < cost:
+        return False
+    props[p] &= ~4
+    cash[seat] -= cost
+    if counts is not None:
+        counts.mortgaged[rules.group_of[p]] -= 1
+    if trace is not None:
+        trace.append(("unmortgage", seat, p))
+    return True
+
+
+def _raise_cash(props, cash, seat, amount, rules, trace=None):
+    """
+    Sell buildings, then mortgage, until the seat has `amount` cash or
+    nothing is left. Buildings go first (highest level first, keeping
+    groups even), then the cheapest mortgages. Returns the number of
+    buildings sold and properties mortgaged.
+    """
+    owner = seat + 1
+    owned = [p for p, byte in enumerate(props) if byte & 3 == owner]
+    counts = _Counts(props, rules)
+    actions = 0
+    while cash[seat] < amount:
+        actions += 1
+        best, best_level = NONE, 0
+        for p in owned:
+            level = props[p] >> 3
+            if level > best_level and _can_sell(props, seat, p, rules, counts):
+                best, best_level = p, level
+        if best != NONE:
+            _sell(props, cash, seat, best, rules, trace, counts)
+            continue
+        cheapest = NONE
+        for p in owned:
+            if (not props[p] & 4 and (cheapest == NONE or rules.cost[p] < rules.cost[cheapest])
+                    and _can_mortgage(props, seat, p, rules, counts)):
+                cheapest = p
+        if cheapest == NONE:
+            return actions - 1
+        _mortgage(props, cash, seat, cheapest, rules, trace, counts)
+    return actions
+
+
+def _build_options(props, cash, seat, rules, counts, groups):
+    """Properties in `groups` the seat could build on now."""
+    options = []
+    for g in groups:
+        lowest = counts.lowest(g)
+        options += [p for p in rules.members[g]
+                    if props[p] >> 3 == lowest and _can_build(props, cash, seat, p, rules, counts)]
+    return options
+
+
+def _monopoly_groups(counts, seat, rules):
+    """Groups the seat holds in full."""
+    owner = seat + 1
+    return [g for g, held in enumerate(counts.held) if held[owner] >= rules.full_set[g]]
+
+
+def _buildable(props, cash, seat, rules):
+    """Properties the seat could build on now, cheapest buildings first."""
+    counts = _Counts(props, rules)
+    options = _build_options(props, cash, seat, rules, counts, _monopoly_groups(counts, seat, rules))
+    return sorted(options, key=rules.house_cost.__getitem__)
+
+
+def _cpu_build(props, cash, seat, reserve, rules, trace=None, counts=None):
+    """Keep building, best monopoly rent increase per dollar first, above the reserve."""
+    counts = counts or _Counts(props, rules)
+    # Ownership does not change while building, so the candidate groups are found once
+    groups = _monopoly_groups(counts, seat, rules)
+    built = 0
+    while groups:
+        best, best_gain, best_cost = NONE, 0, 0
+        for p in _build_options(props, cash, seat, rules, counts, groups):
+            cost = rules.house_cost[p]
+            if cash[seat] - cost < reserve:
+                continue
+            level = props[p] >> 3
+            gain = (rules.rent[p][level * 4 + 5] - rules.rent[p][level * 4 + 1]) / cost
+            # Ties go to the cheaper building, as in the sorted _buildable() order
+            if gain > best_gain or (gain == best_gain and best != NONE and cost < best_cost):
+                best, best_gain, best_cost = p, gain, cost
+        if best == NONE:
+            break
+        _build(props, cash, seat, best, rules, trace, counts)
+        built += 1
+    return built
+
+
+def _cpu_unmortgage(props, cash, seat, reserve, rules, trace=None, counts=None):
+    """Lift mortgages, monopoly groups first then cheapest, above the reserve."""
+    owner = seat + 1
+    mortgaged = [p for p, byte in enumerate(props) if byte & 7 == owner | 4]
+    mortgaged.sort(key=lambda p: (not _monopoly(props, p, owner, rules), rules.cost[p]))
+    lifted = 0
+    for p in mortgaged:
+        if (cash[seat] - rules.unmortgage_cost[p] >= reserve
+                and _unmortgage(props, cash, seat, p, rules, trace, counts)):
+            lifted += 1
+    return lifted
+
+
+def _act(state, action, *args):
+    """Run one in-place action on a copy of the state's cash and properties."""
+    props = bytearray(state[PROPERTIES])
+    cash = [state[CASH_0], state[CASH_1]]
+    if not action(props, cash, *args):
+        return state
+    return state[:CASH_0] + (cash[0], cash[1]) + state[JAIL_0:PROPERTIES] + (bytes(props),)
+
+
+def can_build(state, seat, p, rules=None):
+    """True if build() would put a building on property p."""
+    return _can_build(state[PROPERTIES], state[CASH_0:JAIL_0], seat, p, rules or default_rules())
+
+
+def buildable(state, seat, rules=None):
+    """
+    Properties the seat could build on right now.
+
+    Returns:
+        list: property indexes, cheapest buildings first.
+    """
+    return _buildable(state[PROPERTIES], state[CASH_0:JAIL_0], seat, rules or default_rules())
+
+
+def can_sell(state, seat, p, rules=None):
+    """True if sell() would take a building off property p."""
+    return _can_sell(state[PROPERTIES], seat, p, rules or default_rules())
+
+
+def can_mortgage(state, seat, p, rules=None):
+    """True if mortgage() would mortgage property p."""
+    return _can_mortgage(state[PROPERTIES], seat, p, rules or default_rules())
+
+
+def build(state, seat, p, rules=None, trace=None):
+    """
+    Buy one house (or the hotel, after four houses) for property p.
+
+    Returns:
+        tuple: the new state, or `state` itself if building is not allowed.
+    """
+    return _act(state, _build, seat, p, rules or default_rules(), trace)
+
+
+def sell(state, seat, p, rules=None, trace=None):
+    """Sell one building on p back to the bank for half its cost (see build)."""
+    return _act(state, _sell, seat, p, rules or default_rules(), trace)
+
+
+def mortgage(state, seat, p, rules=None, trace=None):
+    """Mortgage p for half its cost; it collects no rent until lifted (see build)."""
+    return _act(state, _mortgage, seat, p, rules or default_rules(), trace)
+
+
+def unmortgage(state, seat, p, rules=None, trace=None):
+    """Lift the mortgage on p for its mortgage value plus interest (see build)."""
+    return _act(state, _unmortgage, seat, p, rules or default_rules(), trace)
+
+
+def raise_cash(state, seat, amount, rules=None, trace=None):
+    """
+    Sell buildings and then mortgage until the seat has `amount` cash, or
+    nothing is left to sell (see build).
+    """
+    return _act(state, _raise_cash, seat, amount, rules or default_rules(), trace)
+
+
+# Trades. An offer is (proposer seat, properties given, properties taken,
+# cash the proposer pays); a negative amount is paid by the receiver.
+
+def _rent_rate(props, held, full_set, rules):
+    """Expected rent per opponent turn from the properties `held` in one group."""
+    monopoly = len(held) >= full_set
+    rate = 0.0
+    for p in held:
+        byte = props[p]
+        if not byte & 4:
+            rate += rules.land_chance[p] * rules.rent[p][(byte >> 3) * 4 + monopoly]
+    return rate * rules.rent_multiplier
+
+
+def _side_delta(props, seat, gained, lost, rules):
+    """Change in a seat's expected rent over the horizon from a trade."""
+    owner = seat + 1
+    delta = 0.0
+    for g in {rules.group_of[p] for p in gained + lost}:
+        before = [p for p in rules.members[g] if props[p] & 3 == owner]
+        after = [p for p in before if p not in lost] + [p for p in gained if rules.group_of[p] == g]
+        full_set = rules.full_set[g]
+        delta += _rent_rate(props, after, full_set, rules) - _rent_rate(props, before, full_set, rules)
+    return delta * HORIZON_TURNS
+
+
+def evaluate_offer(state, offer, rules=None):
+    """
+    Score an offer for both sides.
+
+    Returns:
+        tuple: (proposer gain, receiver gain) in dollars, counting the cash
+            and the property values that change hands, and part of the
+            other side's rent gain as a loss.
+    """
+    rules = rules or default_rules()
+    seat, give, take, amount = offer
+    props = state[PROPERTIES]
+    give_value = sum(rules.value[p][props[p] >> 2] for p in give)
+    take_value = sum(rules.value[p][props[p] >> 2] for p in take)
+    proposer_rent = _side_delta(props, seat, take, give, rules)
+    receiver_rent = _side_delta(props, 1 - seat, give, take, rules)
+    return (proposer_rent - OPPONENT_WEIGHT * receiver_rent + take_value - give_value - amount,
+            receiver_rent - OPPONENT_WEIGHT * proposer_rent + give_value - take_value + amount)
+
+
+def _group_built(props, p, rules):
+    for member in rules.group_members[p]:
+        if props[member] >> 3:
+            return True
+    return False
+
+
+def _trade(props, cash, offer, rules, trace=None):
+    """Carry out an offer if ownership, cash and unbuilt groups allow it."""
+    seat, give, take, amount = offer
+    proposer, receiver = seat + 1, 2 - seat
+    for p in give:
+        if props[p] & 3 != proposer or _group_built(props, p, rules):
+            return False
+    for p in take:
+        if props[p] & 3 != receiver or _group_built(props, p, rules):
+            return False
+    if (cash[seat] if amount >= 0 else cash[1 - seat]) < abs(amount):
+        return False
+    for p in give:
+        props[p] = props[p] & ~3 | receiver
+    for p in take:
+        props[p] = props[p] & ~3 | proposer
+    cash[seat] -= amount
+    cash[1 - seat] += amount
+    if trace is not None:
+        trace.append(("trade", offer))
+    return True
+
+
+def trade(state, offer, rules=None, trace=None):
+    """
+    Carry out a trade.
+
+    Returns:
+        tuple: the new state, or `state` itself if the offer is not legal.
+    """
+    return _act(state, _trade, offer, rules or default_rules(), trace)
+
+
+def _scored_offers(props, seat, rules):
+    """
+    Candidate offers for a seat with their scores: the number evaluated,
+    and those the proposer gains from, best first (ties in candidate
+    order).
+
+    Returns:
+        tuple: (number of candidates, list of (proposer gain, receiver
+            gain, offer) with a positive proposer gain).
+    """
+    other = 1 - seat
+    held = ([[] for _ in rules.members], [[] for _ in rules.members])
+    built = [False] * len(rules.members)
+    for p, byte in enumerate(props):
+        g = rules.group_of[p]
+        if byte & 3:
+            held[(byte & 3) - 1][g].append(p)
+        if byte >> 3:
+            built[g] = True
+
+    def rent_delta(side, g, gained=(), lost=()):
+        # Same sum as _side_delta, for one seat and one group
+        before = held[side][g]
+        after = [p for p in before if p not in lost] + list(gained)
+        full_set = rules.full_set[g]
+        return (_rent_rate(props, after, full_set, rules)
+                - _rent_rate(props, before, full_set, rules)) * HORIZON_TURNS
+
+    def swap_deltas():
+        # Rent changes from handing over each tradeable property, shared by
+        # every group the proposer could finish with it
+        swaps = []
+        for g, mine in enumerate(held[seat]):
+            if built[g] or len(held[other][g]) + 1 >= rules.full_set[g]:
+                continue  # built up, or would hand the receiver a monopoly
+            for q in mine:
+                swaps.append((q, g, rent_delta(seat, g, lost=(q,)), rent_delta(other, g, gained=(q,)),
+                              rules.value[q][props[q] >> 2]))
+        swaps.sort()
+        return swaps
+
+    swaps = None
+    candidates = []
+    for g, members in enumerate(rules.members):
+        mine, theirs = len(held[seat][g]), len(held[other][g])
+        missing = rules.full_set[g] - mine
+        if not mine or missing <= 0 or theirs < missing or built[g]:
+            continue
+        take = tuple(held[other][g][:missing])
+        base = sum(rules.cost[p] for p in take)
+        take_value = sum(rules.value[p][props[p] >> 2] for p in take)
+        proposer_rent = rent_delta(seat, g, gained=take)
+        receiver_rent = rent_delta(other, g, lost=take)
+        for step in PRICE_STEPS:
+            amount = int(base * step)
+            candidates.append((proposer_rent - OPPONENT_WEIGHT * receiver_rent + take_value - amount,
+                               receiver_rent - OPPONENT_WEIGHT * proposer_rent - take_value + amount,
+                               (seat, (), take, amount)))
+        if swaps is None:
+            swaps = swap_deltas()
+        for q, q_group, proposer_loss, receiver_gain, give_value in swaps:
+            if q_group == g:
+                continue
+            proposer_total = proposer_rent + proposer_loss
+            receiver_total = receiver_rent + receiver_gain
+            for step in (0.0,) + PRICE_STEPS[:3]:
+                amount = int((base - rules.cost[q]) * step)
+                candidates.append((proposer_total - OPPONENT_WEIGHT * receiver_total
+                                   + take_value - give_value - amount,
+                                   receiver_total - OPPONENT_WEIGHT * proposer_total
+                                   + give_value - take_value + amount,
+                                   (seat, (q,), take, amount)))
+
+    # best_offer never takes an offer the proposer gains nothing from
+    kept = sorted((candidate for candidate in candidates if candidate[0] > 0),
+                  key=lambda candidate: -candidate[0])
+    return len(candidates), kept
+
+
+def best_offer(state, seat, rules=None, min_receiver_gain=0.0):
+    """
+    Best legal offer for a seat that the other seat should accept.
+
+    Candidates only finish one of the proposer's groups: the receiver must
+    hold every missing property, and neither side's group may have
+    buildings. Each missing set is offered for cash at PRICE_STEPS, and
+    also in exchange for each of the proposer's properties that would not
+    finish a group for the receiver. The best offer has the highest
+    proposer gain (above 0) among those the payer can afford and the
+    receiver gains at least `min_receiver_gain` from.
+
+    Returns:
+        tuple: (offer or None, offers evaluated).
+    """
+    rules = rules or default_rules()
+    count, scored = _scored_offers(state[PROPERTIES], seat, rules)
+    cash, other_cash = state[CASH_0 + seat], state[CASH_1 - seat]
+    for gain, receiver_gain, offer in scored:
+        amount = offer[3]
+        if receiver_gain >= min_receiver_gain and (cash if amount >= 0 else other_cash) >= abs(amount):
+            return offer, count
+    return None, count
+
+
+def cpu_phase(state, seat, reserve, rules=None, accept=None, trace=None):
+    """
+    The CPU's play after its turn: propose the best trade (on every
+    TRADE_EVERY-th of its own turns), then lift mortgages and build while
+    cash stays above `reserve`.
+
+    Args:
+        state(tuple): state after the seat's turn.
+        seat(int): the CPU's seat.
+        reserve(int): cash kept on hand (CPUPolicy.build_reserve).
+        rules(KernelRules): defaults to default_rules().
+        accept: optional callable(offer) -> bool for the receiving side;
+            by default the receiver takes every offer best_offer makes
+            (they never lose it value).
+        trace(list): optional list that events are appended to.
+
+    Returns:
+        tuple: the new state.
+    """
+    rules = rules or default_rules()
+    # Seats alternate turns, so (turn - 1) // 2 counts the seat's own turns
+    if (state[TURN] - 1) // 2 % TRADE_EVERY == 0:
+        offer, _ = best_offer(state, seat, rules)
+        if offer is not None:
+            if accept is None or accept(offer):
+                state = trade(state, offer, rules, trace)
+            elif trace is not None:
+                trace.append(("declined", offer))
+    props = bytearray(state[PROPERTIES])
+    cash = [state[CASH_0], state[CASH_1]]
+    counts = _Counts(props, rules)
+    if (_cpu_unmortgage(props, cash, seat, reserve, rules, trace, counts)
+            | _cpu_build(props, cash, seat, reserve, rules, trace, counts)):
+        state = state[:CASH_0] + (cash[0], cash[1]) + state[JAIL_0:PROPERTIES] + (bytes(props),)
+    return state
+
+
+def _raise_to_pay(props, cash, seat, amount, rules, trace=None):
+    """
+    Sell and mortgage (see raise_cash) before a payment the seat's cash
+    does not cover. Whatever is still short is paid anyway and the cash
+    <= 0 loss applies at the end of the turn.
+
+    Returns:
+        bytes: the properties after any sales and mortgages.
+    """
+    if cash[seat] >= amount:
+        return props
+    props = bytearray(props)
+    _raise_cash(props, cash, seat, amount, rules, trace)
+    return bytes(props)
+
+
+def next_state(state, roll=None, decision=SKIP, rules=None, trace=None):
+    """
+    Play one step.
+
+    With a purchase pending, `decision` (BUY or SKIP) settles it and the
+    mover's turn ends; `roll` is ignored. Otherwise the mover takes a turn
+    with `roll` (see draw_roll; None for a turn spent in jail). If the
+    turn lands on an unowned property the mover can afford, the returned
+    state has it pending and the turn ends on the next call.
+
+    Args:
+        state(tuple): current state.
+        roll(tuple): (die, event card index, scooter die).
+        decision(int): BUY or SKIP for a pending purchase.
+        rules(KernelRules): defaults to default_rules().
+        trace(list): optional list that what happens is appended to, as
+            tuples starting with an event name ("move", "rent", ...).
+
+    Returns:
+        tuple: the next state. Finished states are returned unchanged.
+    """
+    rules = rules or default_rules()
+    turn, mover, pending, status, pos_0, pos_1, cash_0, cash_1, jail_0, jail_1, props = state
+    if status != RUNNING:
+        return state
+    positions = [pos_0, pos_1]
+    cash = [cash_0, cash_1]
+    jail = [jail_0, jail_1]
+
+    if pending == NONE:
+        if turn >= rules.max_turns:
+            if trace is not None:
+                trace.append(("limit",))
+            return _finished(state, rules)
+        turn += 1
+        if jail[mover]:
+            jail[mover] = 0
+            if trace is not None:
+                trace.append(("jailed", mover))
+        else:
+            die, card, scooter = roll
+            moves = 0
+            spaces = die
+            while True:
+                position = positions[mover] + spaces
+                passed = position >= rules.board_size
+                if passed:
+                    cash[mover] += rules.go_salary
+                positions[mover] = position % rules.board_size
+                if trace is not None:
+                    trace.append(("move", mover, spaces, positions[mover], passed))
+                kind = rules.tile_kind[positions[mover]]
+
+                if kind >= 0:
+                    owner = props[kind] & 3
+                    if owner == 0:
+                        if cash[mover] >= rules.cost[kind]:
+                            pending = kind
+                    elif owner != mover + 1:
+                        byte = props[kind]
+                        rent = rules.rent[kind][((byte >> 2) << 1) | _monopoly(props, kind, owner, rules)]
+                        rent *= rules.rent_multiplier
+                        props = _raise_to_pay(props, cash, mover, rent, rules, trace)
+                        if cash[mover] >= rent:
+                            cash[mover] -= rent
+                            cash[owner - 1] += rent
+                            if trace is not None:
+                                trace.append(("rent", mover, kind, rent, rent))
+                        else:
+                            # Bankrupt: everything goes to the landlord
+                            cash[mover] = 0
+                            props = bytes((byte & ~3) | owner if byte & 3 == mover + 1 else byte
+                                          for byte in props)
+                            if trace is not None:
+                                trace.append(("rent", mover, kind, rent, 0))
+                                trace.append(("bankrupt", mover, owner - 1))
+                elif kind == EVENT and moves == 0:
+                    effect, amount = rules.card_effects[card]
+                    if trace is not None:
+                        trace.append(("card", mover, card))
+                    if effect == "cash":
+                        if amount < 0:
+                            props = _raise_to_pay(props, cash, mover, -amount, rules, trace)
+                        cash[mover] += amount
+                    elif effect == "move":
+                        # Landing on another Event does not chain
+                        moves, spaces = 1, amount
+                        continue
+                    elif effect == "jail":
+                        positions[mover] = rules.jail_position
+                        jail[mover] = 1
+                        if trace is not None:
+                            trace.append(("jail", mover))
+                elif kind == SCOOTER:
+                    fare = scooter * 20
+                    props = _raise_to_pay(props, cash, mover, fare, rules, trace)
+                    cash[mover] -= fare
+                    if trace is not None:
+                        trace.append(("scooter", mover, fare))
+                break
+
+        if pending != NONE:
+            return (turn, mover, pending, status, positions[0], positions[1],
+                    cash[0], cash[1], jail[0], jail[1], props)
+    else:
+        if decision == BUY and cash[mover] >= rules.cost[pending]:
+            cash[mover] -= rules.cost[pending]
+            props = props[:pending] + bytes((mover + 1,)) + props[pending + 1:]
+            if trace is not None:
+                trace.append(("buy", mover, pending))
+        elif trace is not None:
+            trace.append(("skip", mover, pending))
+        pending = NONE
+
+    # End of the mover's turn; the turn passes even when it lost the game
+    if cash[mover] <= 0:
+        status = 1 - mover
+    mover = 1 - mover
+    return (turn, mover, pending, status, positions[0], positions[1],
+            cash[0], cash[1], jail[0], jail[1], props)
+
+
+def pack(state):
+    """Serialise a state to bytes (about 25 bytes plus one per property)."""
+    return PACKED.pack(*state[:PROPERTIES]) + state[PROPERTIES]
+
+
+def unpack(data):
+    """Inverse of pack()."""
+    return PACKED.unpack_from(data) + (bytes(data[PACKED.size:]),)
+
+
+def play_turn(state, rng, policies, rules=None, trace=None):
+    """
+    One whole turn, as Game.turn plays it for two CPU seats: the roll (none
+    for a turn in jail), the purchase decision, then the mover's
+    cpu_phase unless the turn was spent in jail or ended the game.
+
+    Args:
+        state(tuple): state with no purchase pending.
+        rng: GameRNG the roll is drawn from.
+        policies(tuple): CPUPolicy per seat.
+
+    Returns:
+        tuple: (new state, steps taken).
+    """
+    rules = rules or default_rules()
+    seat = state[MOVER]
+    jailed = state[JAIL_0 + seat]
+    if state[TURN] >= rules.max_turns:
+        return next_state(state, None, SKIP, rules, trace), 1
+    state = next_state(state, None if jailed else draw_roll(rng, rules.deck), SKIP, rules, trace)
+    steps = 1
+    pending = state[PENDING]
+    if pending != NONE:
+        result = policies[seat].decide(state[CASH_0 + seat], rules.cost[pending], rules.codes[pending], "mid")
+        state = next_state(state, None, BUY if result["decision"] == "buy" else SKIP, rules, trace)
+        steps += 1
+    if state[STATUS] == RUNNING and not jailed:
+        state = cpu_phase(state, seat, policies[seat].build_reserve, rules, None, trace)
+    return state, steps
+
+
+def play(seed, policies=None, rules=None):
+    """
+    Play one seeded game on the kernel with CPU policies for both seats.
+
+    Args:
+        seed(int): seed for the GameRNG.
+        policies(tuple): CPUPolicy per seat (defaults to DEFAULT_POLICY).
+        rules(KernelRules): defaults to default_rules().
+
+    Returns:
+        tuple: (final state, steps taken). The final state is the one
+            Game("cpu_vs_cpu", seed=seed, policies=policies).play() ends in.
+    """
+    from decision_engine import DEFAULT_POLICY
+    from rng import GameRNG
+
+    rules = rules or default_rules()
+    policies = policies or (DEFAULT_POLICY, DEFAULT_POLICY)
+    rng = GameRNG(seed, 64)
+    state = rules.initial_state()
+    steps = 0
+    while state[STATUS] == RUNNING:
+        state, taken = play_turn(state, rng, policies, rules)
+        steps += taken
+    return state, steps
+
+
+if __name__ == "__main__":
+    import pickle
+    import timeit
+    from game import Game
+
+    rules = default_rules()
+    game = Game("cpu_vs_cpu", seed=1, verbose=False)
+    for _ in range(20):
+        game.turn()
+    state = game.to_state()
+    assert unpack(pack(state)) == state
+    copy = Game("cpu_vs_cpu", seed=1, verbose=False)
+    copy.load_state(state)
+    assert copy.to_state() == state
+
+    print(f"state after 20 turns: pickle {len(pickle.dumps(state))} bytes, "
+          f"pack() {len(pack(state))} bytes; pickled Game {len(pickle.dumps(game))} bytes")
+
+    # next_state on running mid-game states (a finished state returns at once)
+    from rng import GameRNG
+    samples = []
+    for seed in range(300):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False)
+        for _ in range(5 + seed % 20):
+            if not game.turn():
+                break
+        if game.to_state()[STATUS] == RUNNING:
+            samples.append(game.to_state())
+    assert samples and all(sample[STATUS] == RUNNING for sample in samples)
+    rng = GameRNG(0)
+    cases = [(sample, draw_roll(rng, rules.deck)) for sample in samples]
+    repeats = 200
+    seconds = timeit.timeit(lambda: [next_state(sample, roll, SKIP, rules) for sample, roll in cases],
+                            number=repeats)
+    print(f"next_state: {seconds / (repeats * len(cases)) * 1e6:.2f} us per call "
+          f"over {len(cases)} running mid-game states")
+
+    start = timeit.default_timer()
+    steps = 0
+    for seed in range(2000):
+        steps += play(seed)[1]
+    elapsed = timeit.default_timer() - start
+    print(f"2000 kernel games in {elapsed:.2f}s ({elapsed / 2000 * 1000:.2f} ms per game, "
+          f"{elapsed / steps * 1e6:.2f} us per step with policy decisions and CPU phases)")
@@ -0,0 +1,304 @@
+"""
+Rating league for CPU policies.
+
+Every entrant is a CPUPolicy. A match plays a block of seeds with both
+seat orders (estimator.play_pair), so neither side gets better dice.
+Matches run in a process pool. Ratings are updated game by game as the
+matches finish. Each entrant has an Elo rating and a Glicko rating with a
+rating deviation (RD). The RD measures how unsure the rating still is.
+
+Pairings come from a round robin or a Swiss system (neighbours in the
+standings). They are played in order of combined RD, so new or rarely
+played entrants get games first. The league table is saved to JSON after
+every round. New entrants can join later without replaying old matches.
+"""
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from decision_engine import CPUPolicy
+from estimator import _play_pairs
+
+GLICKO_Q = math.log(10) / 400
+
+
+def _glicko_g(rd):
+    """Glicko's attenuation for an opponent's rating deviation."""
+    return 1 / math.sqrt(1 + 3 * GLICKO_Q * GLICKO_Q * rd * rd / (math.pi * math.pi))
+
+
+class Entrant:
+    """
+    One policy's standing in the league.
+    """
+
+    def __init__(self, policy, elo=1500.0, rating=1500.0, rd=350.0, games=0, score=0.0):
+        """
+        Args:
+            policy(CPUPolicy): the policy; its name is the entrant's name.
+            elo(float): Elo rating.
+            rating(float): Glicko rating.
+            rd(float): Glicko rating deviation.
+            games(int): games played.
+            score(float): points scored (1 per win, 0.5 per tie).
+        """
+        self.policy = policy
+        self.elo = elo
+        self.rating = rating
+        self.rd = rd
+        self.games = games
+        self.score = score
+
+    @property
+    def name(self):
+        return self.policy.name
+
+    def __repr__(self):
+        """Detailed representation."""
+        return (f"Entrant(name='{self.name}', elo={self.elo:.0f}, rating={self.rating:.0f}, "
+                f"rd={self.rd:.0f}, games={self.games})")
+
+    def to_dict(self):
+        """Plain dict for the league file."""
+        params = self.policy.params()
+        return {"policy": params, "elo": self.elo, "rating": self.rating, "rd": self.rd,
+                "games": self.games, "score": self.score}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict()."""
+        entry = dict(data)
+        return cls(CPUPolicy(**entry.pop("policy")), **entry)
+
+
+class League:
+    """
+    Persistent Elo/Glicko league with prioritised parallel scheduling.
+    """
+
+    ELO_K = 16
+    # RD regained per round of inactivity, so old ratings loosen again
+    RD_DRIFT = 15.0
+    MAX_RD = 350.0
+    MIN_RD = 30.0
+
+    def __init__(self, path="umd_league.json", seeds_per_match=10, workers=1, game_options=None):
+        """
+        Open a league file, or start an empty league.
+
+        Args:
+            path(str): JSON file holding the league table.
+            seeds_per_match(int): seeds per match (two games each).
+            workers(int): worker processes.
+            game_options(dict): extra keyword arguments for Game.
+        """
+        self.path = path
+        self.seeds_per_match = seeds_per_match
+        self.workers = workers
+        self.game_options = game_options or {}
+        self.entrants = {}
+        self.next_seed = 0
+        self.rounds = 0
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            self.next_seed = data["next_seed"]
+            self.rounds = data["rounds"]
+            for entry in data["entrants"]:
+                entrant = Entrant.from_dict(entry)
+                self.entrants[entrant.name] = entrant
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"League(path='{self.path}', entrants={len(self.entrants)}, rounds={self.rounds})"
+
+    def add(self, policy):
+        """
+        Enter a new policy.
+
+        Raises:
+            ValueError: if an entrant with that name already exists.
+        """
+        if policy.name in self.entrants:
+            raise ValueError(f"'{policy.name}' is already in the league")
+        self.entrants[policy.name] = Entrant(policy)
+
+    def save(self):
+        """
+        Write the league table atomically.
+
+        Side Effects:
+            Replaces the league file.
+        """
+        data = {"next_seed": self.next_seed, "rounds": self.rounds,
+                "entrants": [entrant.to_dict() for entrant in self.standings()]}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temporary, self.path)
+
+    # Ratings
+
+    def record(self, a, b, score):
+        """
+        Update both entrants after one game.
+
+        Args:
+            a(Entrant): first entrant.
+            b(Entrant): second entrant.
+            score(float): a's result (1 win, 0.5 tie, 0 loss).
+        """
+        expected = 1 / (1 + 10 ** ((b.elo - a.elo) / 400))
+        a.elo += self.ELO_K * (score - expected)
+        b.elo -= self.ELO_K * (score - expected)
+
+        # Glicko-1, one game per update, using the pre-game values of both
+        updates = []
+        for me, other, result in ((a, b, score), (b, a, 1 - score)):
+            g = _glicko_g(other.rd)
+            e = 1 / (1 + 10 ** (-g * (me.rating - other.rating) / 400))
+            d_squared = 1 / (GLICKO_Q * GLICKO_Q * g * g * e * (1 - e))
+            precision = 1 / (me.rd * me.rd) + 1 / d_squared
+            updates.append((me, me.rating + GLICKO_Q / precision * g * (result - e),
+                            max(self.MIN_RD, math.sqrt(1 / precision))))
+        for me, rating, rd in updates:
+            me.rating, me.rd = rating, rd
+
+        a.games += 1
+        b.games += 1
+        a.score += score
+        b.score += 1 - score
+
+    def _drift(self):
+        """Loosen every rating a little at the start of a round."""
+        for entrant in self.entrants.values():
+            entrant.rd = min(self.MAX_RD, math.sqrt(entrant.rd ** 2 + self.RD_DRIFT ** 2))
+
+    # Scheduling
+
+    def standings(self):
+        """Entrants by Glicko rating, best first."""
+        return sorted(self.entrants.values(), key=lambda entrant: -entrant.rating)
+
+    def pairings(self, system="round_robin"):
+        """
+        Candidate matches for one round, most uncertain first.
+
+        Args:
+            system(str): "round_robin" (every pair) or "swiss" (neighbours
+                in the standings).
+
+        Returns:
+            list: (Entrant, Entrant) pairs.
+        """
+        ranked = self.standings()
+        if system == "round_robin":
+            pairs = [(ranked[i], ranked[j]) for i in range(len(ranked))
+                     for j in range(i + 1, len(ranked))]
+        elif system == "swiss":
+            pairs = [(ranked[i], ranked[i + 1]) for i in range(0, len(ranked) - 1, 2)]
+            if len(ranked) % 2:
+                # The odd one out plays the entrant just above it
+                pairs.append((ranked[-2], ranked[-1]))
+        else:
+            raise ValueError(f"Unknown pairing system: {system}")
+        return sorted(pairs, key=lambda pair: -(pair[0].rd ** 2 + pair[1].rd ** 2))
+
+    def play_round(self, system="round_robin", max_matches=None, pool=None):
+        """
+        Play one round, updating ratings as matches finish.
+
+        Args:
+            system(str): see pairings().
+            max_matches(int): play only the most uncertain pairings.
+            pool: an open ProcessPoolExecutor (one is made if needed).
+
+        Returns:
+            int: games played.
+        """
+        self._drift()
+        pairs = self.pairings(system)[:max_matches]
+        jobs = []
+        for a, b in pairs:
+            seeds = list(range(self.next_seed, self.next_seed + self.seeds_per_match))
+            self.next_seed += self.seeds_per_match
+            jobs.append((a, b, seeds))
+
+        played = 0
+        if self.workers <= 1:
+            for a, b, seeds in jobs:
+                for score, _ in _play_pairs(seeds, a.policy, b.policy, self.game_options):
+                    self.record(a, b, score)
+                    played += 1
+        else:
+            own_pool = pool is None
+            pool = pool or ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                futures = {pool.submit(_play_pairs, seeds, a.policy, b.policy, self.game_options): (a, b)
+                           for a, b, seeds in jobs}
+                for future in as_completed(futures):
+                    a, b = futures[future]
+                    for score, _ in future.result():
+                        self.record(a, b, score)
+                        played += 1
+            finally:
+                if own_pool:
+                    pool.shutdown()
+
+        self.rounds += 1
+        self.save()
+        return played
+
+    def run(self, rounds, system="round_robin", max_matches=None):
+        """
+        Play several rounds with one worker pool.
+
+        Returns:
+            int: games played.
+        """
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            return sum(self.play_round(system, max_matches, pool) for _ in range(rounds))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def table(self):
+        """
+        Printable league table.
+
+        Returns:
+            str: one line per entrant, best first.
+        """
+        lines = [f"{'policy':14} {'glicko':>7} {'rd':>5} {'elo':>7} {'games':>6} {'score':>6}"]
+        for entrant in self.standings():
+            share = entrant.score / entrant.games if entrant.games else 0.0
+            lines.append(f"{entrant.name:14} {entrant.rating:7.0f} {entrant.rd:5.0f} "
+                         f"{entrant.elo:7.0f} {entrant.games:6} {share:6.1%}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "league.json")
+        league = League(path, seeds_per_match=20)
+        league.add(CPUPolicy("default"))
+        league.add(CPUPolicy("cautious", safe_reserves={"early": 400, "mid": 700, "late": 900}))
+        league.add(CPUPolicy("aggressive", buy_risky=True, build_reserve=50))
+        league.add(CPUPolicy("reckless", safe_reserves={"early": 0, "mid": 0, "late": 0},
+                             buy_risky=True, build_reserve=0))
+
+        start = time.perf_counter()
+        games = league.run(3)
+        print(f"{games} games in {time.perf_counter() - start:.1f}s\n{league.table()}\n")
+
+        # A newcomer joins the saved league; only its uncertain pairings are prioritised
+        league = League(path, seeds_per_match=20)
+        league.add(CPUPolicy("hoarder", build_reserve=600))
+        games = league.run(2, system="swiss", max_matches=2)
+        print(f"after a newcomer and {games} more games:\n{league.table()}")
@@ -0,0 +1,74 @@
+"""
+Benchmark for marathon games (Game(..., endurance=True)).
+
+Both players start with so much cash that nobody goes bankrupt, and the
+game runs to a very high turn limit. Per-turn latency is reported over
+windows of growing length, and traced memory at the end of each window,
+so any cost that grows with the game's length shows up as a trend.
+"""
+import time
+import tracemalloc
+
+from game import Game
+from kernel import CASH_0, JAIL_0
+
+# Enough that rent never bankrupts anyone within the benchmark
+MARATHON_CASH = 10 ** 10
+
+
+def marathon_game(max_turns, seed=0, endurance=True):
+    """A headless game that will run to max_turns."""
+    game = Game("cpu_vs_cpu", seed=seed, verbose=False, max_turns=max_turns, endurance=endurance)
+    state = game.to_state()
+    game.load_state(state[:CASH_0] + (MARATHON_CASH, MARATHON_CASH) + state[JAIL_0:])
+    return game
+
+
+def marathon_benchmark(checkpoints=(100, 1_000, 10_000, 100_000), seed=0, endurance=True,
+                       trace_memory=False):
+    """
+    Play one marathon game and time each window between checkpoints.
+
+    Args:
+        checkpoints(tuple): turn counts that end each window.
+        seed(int): game seed.
+        endurance(bool): use endurance mode.
+        trace_memory(bool): also record traced memory at each checkpoint
+            (tracemalloc slows turns down, so the latencies are then only
+            comparable with each other).
+
+    Returns:
+        list: (first turn, last turn, microseconds per turn, traced bytes
+            or None) per window.
+    """
+    game = marathon_game(checkpoints[-1], seed, endurance)
+    if trace_memory:
+        tracemalloc.start()
+    rows = []
+    try:
+        first = 0
+        for checkpoint in checkpoints:
+            start = time.perf_counter()
+            while game.turn_count < checkpoint and game.turn():
+                pass
+            elapsed = time.perf_counter() - start
+            turns = max(game.turn_count - first, 1)
+            memory = tracemalloc.get_traced_memory()[0] if trace_memory else None
+            rows.append((first, game.turn_count, elapsed / turns * 1e6, memory))
+            first = game.turn_count
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    print("endurance mode, per-turn latency")
+    for first, last, micros, _ in marathon_benchmark():
+        print(f"  turns {first:>6} - {last:>6}: {micros:6.1f} us/turn")
+
+    for endurance in (True, False):
+        label = "endurance mode" if endurance else "normal mode"
+        print(f"{label}, traced memory")
+        for first, last, _, memory in marathon_benchmark(endurance=endurance, trace_memory=True):
+            print(f"  at turn {last:>6}: {memory / 1024:8.0f} KiB")
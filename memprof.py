@@ -0,0 +1,214 @@
+"""
+Memory instrumentation for long and repeated games.
+
+MemoryProfiler is a Game observer that takes tracemalloc snapshots at
+game and turn boundaries and reports where memory grew, by module and by
+function. Create a game with Game(..., profile_memory=True) to attach one.
+
+soak() plays many headless games in a row and checks that memory kept
+per completed game does not creep upward, which is how leaks between
+games show up in a long-running host.
+"""
+import ast
+import gc
+import linecache
+import os
+import tracemalloc
+
+_function_ranges = {}
+
+
+def _function_at(filename, lineno):
+    """Name of the innermost function (or class) containing a line."""
+    if filename not in _function_ranges:
+        ranges = []
+        source = "".join(linecache.getlines(filename))
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            tree = None
+        if tree is not None:
+            for node in ast.walk(tree):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    ranges.append((node.lineno, node.end_lineno, node.name))
+        # Innermost first: later starts win, so sort by start descending
+        _function_ranges[filename] = sorted(ranges, reverse=True)
+    for start, end, name in _function_ranges[filename]:
+        if start <= lineno <= end:
+            return name
+    return "<module>"
+
+
+def growth_by(before, after, key="function", limit=10):
+    """
+    Allocation growth between two snapshots, summed per module or function.
+
+    Args:
+        before(tracemalloc.Snapshot): earlier snapshot.
+        after(tracemalloc.Snapshot): later snapshot.
+        key(str): "module" or "function".
+        limit(int): rows returned.
+
+    Returns:
+        list: (name, bytes grown, blocks grown) tuples, largest growth first.
+    """
+    totals = {}
+    for stat in after.compare_to(before, "lineno"):
+        frame = stat.traceback[0]
+        module = os.path.basename(frame.filename)
+        name = module if key == "module" else f"{module}:{_function_at(frame.filename, frame.lineno)}"
+        size, count = totals.get(name, (0, 0))
+        totals[name] = (size + stat.size_diff, count + stat.count_diff)
+    rows = sorted(((name, size, count) for name, (size, count) in totals.items() if size or count),
+                  key=lambda row: -row[1])
+    return rows[:limit]
+
+
+class MemoryProfiler:
+    """
+    Game observer that snapshots tracemalloc at game and turn boundaries.
+    """
+
+    # Snapshots of the profiler itself and tracemalloc are left out
+    FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, __file__),
+               tracemalloc.Filter(False, "<frozen importlib._bootstrap>"))
+
+    def __init__(self, every_turns=10):
+        """
+        Args:
+            every_turns(int): take a turn snapshot every this many turns.
+
+        Side Effects:
+            Starts tracemalloc if it is not running already, and then stops
+            it again when the game ends.
+        """
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start()
+        self.every_turns = every_turns
+        self.start = None
+        self.turns = []   # (turn, snapshot)
+        self.end = None
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"MemoryProfiler(every_turns={self.every_turns}, snapshots={len(self.turns)})"
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+
+    # Game observer hooks
+
+    def on_game_start(self, game):
+        self.start = self._snapshot()
+        self.turns = []
+        self.end = None
+
+    def on_turn(self, game):
+        if game.turn_count % self.every_turns == 0:
+            self.turns.append((game.turn_count, self._snapshot()))
+
+    def on_game_end(self, game):
+        self.end = self._snapshot()
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    # Reporting
+
+    def report(self, key="function", limit=10):
+        """
+        Growth from the start of the game to every turn snapshot and to the end.
+
+        Returns:
+            str: one block per snapshot, largest growth first.
+        """
+        if self.start is None:
+            return "No snapshots taken"
+        stages = [(f"turn {turn}", snapshot) for turn, snapshot in self.turns]
+        if self.end is not None:
+            stages.append(("game end", self.end))
+        lines = []
+        for label, snapshot in stages:
+            lines.append(f"{label}:")
+            for name, size, count in growth_by(self.start, snapshot, key, limit):
+                lines.append(f"  {name:40} {size:+9,d} B {count:+6,d} blocks")
+        return "\n".join(lines)
+
+
+def soak(games=10_000, window=1000, max_growth=64, report_every=None, **game_options):
+    """
+    Play headless games back to back and check memory does not creep.
+
+    After each window of games, garbage is collected and the traced memory
+    recorded. The growth per game between the first and last windows must
+    stay under `max_growth` bytes, so at least two windows are played.
+
+    Args:
+        games(int): games to play.
+        window(int): games between measurements.
+        max_growth(int): allowed retained bytes per completed game.
+        report_every(int): print progress every this many games.
+        **game_options: extra keyword arguments for Game.
+
+    Returns:
+        dict: traced bytes per window, growth per game and the top growth
+            by function between the first and last windows.
+
+    Raises:
+        ValueError: if `games` is less than two windows.
+        RuntimeError: if memory grows by more than max_growth per game.
+    """
+    from game import Game
+
+    if window < 1 or games < 2 * window:
+        raise ValueError(f"soak needs at least two windows of games, got {games} games "
+                         f"with a window of {window}")
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        samples = []
+        first = None
+        for seed in range(games):
+            Game("cpu_vs_cpu", seed=seed, verbose=False, **game_options).play()
+            if (seed + 1) % window == 0:
+                gc.collect()
+                if first is None:
+                    # Taken before sampling so every sample includes it
+                    first = tracemalloc.take_snapshot().filter_traces(MemoryProfiler.FILTERS)
+                samples.append(tracemalloc.get_traced_memory()[0])
+            if report_every and (seed + 1) % report_every == 0:
+                print(f"{seed + 1:6} games: {tracemalloc.get_traced_memory()[0]:,} B traced")
+        last = tracemalloc.take_snapshot().filter_traces(MemoryProfiler.FILTERS)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    per_game = (samples[-1] - samples[0]) / (window * (len(samples) - 1))
+    result = {
+        "games": games,
+        "traced": samples,
+        "growth_per_game": per_game,
+        "top_growth": growth_by(first, last, "function"),
+    }
+    if per_game > max_growth:
+        raise RuntimeError(f"memory grew {per_game:.1f} B per game over {games} games; "
+                           f"top growth: {result['top_growth'][:3]}")
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+    from game import Game
+
+    game = Game("cpu_vs_cpu", seed=3, verbose=False, profile_memory=True)
+    game.play()
+    print(game.memory_profiler.report(limit=5))
+
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    result = soak(games, report_every=games // 5)
+    print(f"\nsoak: {result['growth_per_game']:+.2f} B retained per game over {games} games")
+    for name, size, count in result["top_growth"][:5]:
+        print(f"  {name:40} {size:+9,d} B {count:+6,d} blocks")
@@ -0,0 +1,154 @@
+"""
+Per-turn time series of a game.
+
+TurnRecorder is a Game observer that writes every seat's cash, position,
+properties held, monopolies and net worth after each turn into arrays
+allocated once, sized from max_turns. Recording a turn only stores
+integers into those arrays. One recorder can be reused for game after
+game; each new game overwrites the previous one.
+"""
+from array import array
+
+# Values recorded for every seat after every turn
+FIELDS = ("cash", "position", "properties", "monopolies", "net_worth")
+
+
+class TurnRecorder:
+    """
+    Fixed-size per-turn, per-seat recording of one game.
+    """
+
+    def __init__(self, max_turns=150, seats=2):
+        """
+        Args:
+            max_turns(int): turns that fit (Game.max_turns); later turns
+                are not recorded.
+            seats(int): players per game.
+        """
+        self.max_turns = max_turns
+        self.seats = seats
+        size = max_turns * seats
+        self.series = {field: array("q", bytes(8 * size)) for field in FIELDS}
+        self.mover = array("b", bytes(max_turns))  # seat that moved on each turn
+        self.turns = 0
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"TurnRecorder(max_turns={self.max_turns}, turns={self.turns})"
+
+    def __len__(self):
+        return self.turns
+
+    # Game observer hooks
+
+    def on_game_start(self, game):
+        self.turns = 0
+        self._players = (game.player, game.cpu)
+
+    def on_turn(self, game):
+        turn = game.turn_count - 1
+        if turn >= self.max_turns:
+            return
+        series = self.series
+        cash, position = series["cash"], series["position"]
+        properties, monopolies = series["properties"], series["monopolies"]
+        net_worth = series["net_worth"]
+        base = turn * self.seats
+        for seat, player in enumerate(self._players):
+            index = base + seat
+            cash[index] = player.cash
+            position[index] = player.position
+            properties[index] = len(player.properties)
+            monopolies[index] = len(player.monopolies)
+            net_worth[index] = player.net_worth
+        # The turn has already passed to the other player
+        self.mover[turn] = 1 if game.current_player == "player" else 0
+        self.turns = turn + 1
+
+    # Export
+
+    def value(self, field, turn, seat):
+        """One recorded value (turn counts from 1)."""
+        return self.series[field][(turn - 1) * self.seats + seat]
+
+    def rows(self):
+        """
+        Yield one tuple per recorded (turn, seat).
+
+        Yields:
+            tuple: (turn, seat, moved) followed by the FIELDS values.
+        """
+        for turn in range(self.turns):
+            for seat in range(self.seats):
+                index = turn * self.seats + seat
+                yield ((turn + 1, seat, int(self.mover[turn] == seat))
+                       + tuple(self.series[field][index] for field in FIELDS))
+
+    def to_csv(self, filename):
+        """
+        Write the recorded turns to a CSV file.
+
+        Returns:
+            str: the filename.
+        """
+        import csv
+
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(("turn", "seat", "moved") + FIELDS)
+            writer.writerows(self.rows())
+        return filename
+
+    def to_numpy(self):
+        """
+        Copy the recorded turns into NumPy arrays (requires NumPy).
+
+        Returns:
+            dict: field -> int64 array of shape (turns, seats), plus "mover"
+                of shape (turns,).
+        """
+        import numpy
+
+        used = self.turns * self.seats
+        arrays = {field: numpy.frombuffer(values, dtype=numpy.int64, count=used)
+                  .reshape(self.turns, self.seats).copy()
+                  for field, values in self.series.items()}
+        arrays["mover"] = numpy.frombuffer(self.mover, dtype=numpy.int8, count=self.turns).copy()
+        return arrays
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from game import Game
+
+    def timed(seeds, observers):
+        start = time.perf_counter()
+        turns = 0
+        for seed in seeds:
+            game = Game("cpu_vs_cpu", seed=seed, verbose=False, observers=observers)
+            game.play()
+            turns += game.turn_count
+        return (time.perf_counter() - start) / turns
+
+    recorder = TurnRecorder()
+    seeds = range(1000)
+    timed(range(50), ())  # warm up
+    # Interleave the runs so machine noise hits both alike
+    plain = recorded = float("inf")
+    for _ in range(5):
+        plain = min(plain, timed(seeds, ()))
+        recorded = min(recorded, timed(seeds, (recorder,)))
+    print(f"headless turn: {plain * 1e6:.1f} us, with recorder {recorded * 1e6:.1f} us "
+          f"({recorded / plain - 1:+.1%})")
+
+    game = Game("cpu_vs_cpu", seed=7, verbose=False, observers=(recorder,))
+    game.play()
+    assert game.player.turns_played + game.cpu.turns_played == game.turn_count
+    with tempfile.TemporaryDirectory() as directory:
+        path = recorder.to_csv(os.path.join(directory, "seed7.csv"))
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+    print(f"seed 7: {recorder.turns} turns, {len(lines) - 1} CSV rows; last rows:")
+    print("\n".join(lines[-2:]))
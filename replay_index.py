@@ -0,0 +1,510 @@
+"""
+Bulk index of saved games.
+
+save_game() writes one umd_monopoly_*.json file per game. ReplayIndex
+scans a folder of them and records per-game facts in a SQLite index:
+winner, turns, cash, and the properties each seat held. Queries then
+run against the index instead of the files.
+
+Reading is incremental. A save is read in chunks, and its top-level
+members are decoded one at a time until every needed fact has been seen.
+Those facts all sit in the save's header (winner, turns and the packed
+kernel state), so the players' property listings and the event log that
+follow them are neither parsed nor, mostly, read. A packed state is
+decoded with the property codes of the board named by its board_digest;
+saves from boards the scan was not given, and older saves without a
+digest, are read from their players list instead. Rescans only read
+files that are new or changed since the last scan (by size and
+modification time), and they drop entries for files that are gone.
+
+Headers are decoded in batches by a bounded process pool, one worker
+per core by default (at most two batches per worker in flight); the
+inserts stay in this process. With the saves in the page cache a
+single-core scan is still bound by decoding and inserts rather than by
+reading, so it only approaches the disk's speed with several cores.
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+SAVE_PATTERN = "umd_monopoly_"
+# Top-level members read from each save. They come before the players and
+# the event log, so reading stops well before the end of the file
+FACT_KEYS = ("turns_played", "winner", "winner_seat", "adjudicated", "state_hash", "board_digest",
+             "state")
+# Conditions games() accepts
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=", "IS", "IS NOT")
+
+_decoder = json.JSONDecoder()
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+
+
+def read_facts(path, keys=FACT_KEYS, chunk_size=4096):
+    """
+    Decode only some top-level members of a JSON object file.
+
+    The file is read chunk by chunk. Reading stops as soon as every key in
+    `keys` has been decoded, so members after them are never read.
+
+    Args:
+        path(str): JSON file holding one object.
+        keys(tuple): members to return.
+        chunk_size(int): characters read at a time.
+
+    Returns:
+        dict: the members found (missing keys are left out).
+
+    Raises:
+        ValueError: if the file is not a JSON object.
+    """
+    wanted = set(keys)
+    found = {}
+    with open(path, encoding="utf-8") as file:
+        text = file.read(chunk_size)
+        at_end = len(text) < chunk_size
+        pos = _skip_whitespace(text).end()
+        if pos >= len(text) or text[pos] != "{":
+            raise ValueError(f"{path} does not hold a JSON object")
+        pos += 1
+
+        while wanted:
+            try:
+                pos = _skip_whitespace(text, pos).end()
+                if text[pos] == "}":
+                    break
+                key, end = _decoder.raw_decode(text, pos)
+                end = _skip_whitespace(text, end).end()
+                if text[end] != ":":
+                    raise ValueError(f"{path}: expected ':' after {key!r}")
+                value, end = _decoder.raw_decode(text, _skip_whitespace(text, end + 1).end())
+                # A value ending exactly at the buffer end may be cut short (a number)
+                end = _skip_whitespace(text, end).end()
+                separator = text[end]
+            except (IndexError, json.JSONDecodeError):
+                if at_end:
+                    raise ValueError(f"{path} ends inside a JSON object") from None
+                more = file.read(chunk_size)
+                at_end = len(more) < chunk_size
+                text += more
+                continue
+
+            if key in wanted:
+                found[key] = value
+                wanted.discard(key)
+            pos = end + 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise ValueError(f"{path}: expected ',' or '}}' after {key!r}")
+    return found
+
+
+def _players_facts(facts, path):
+    """
+    Cash and holdings from the players list, for older saves. Also fills
+    in facts["winner_seat"] from the players' names when it is missing.
+    """
+    players = read_facts(path, ("players",)).get("players") or []
+    names = [player.get("name") for player in players]
+    winner = facts.get("winner")
+    if facts.get("winner_seat") is None and winner in names:
+        facts["winner_seat"] = names.index(winner)
+    cash = [player.get("cash") for player in players[:2]] + [None] * (2 - len(players[:2]))
+    holdings = []
+    for seat, player in enumerate(players[:2]):
+        for prop in player.get("properties", ()):
+            level = 5 if prop.get("hotels") else prop.get("houses", 0)
+            holdings.append((seat, prop["code"], level, int(bool(prop.get("mortgaged")))))
+    return cash, holdings
+
+
+def board_codes(boards=()):
+    """
+    Property codes of packed states, by board digest.
+
+    Args:
+        boards: compiled boards besides the default one.
+
+    Returns:
+        dict: board_digest -> kernel property codes.
+    """
+    from kernel import KernelRules, default_rules
+
+    rules = [default_rules()] + [KernelRules(board) for board in boards]
+    return {r.board_digest: r.codes for r in rules}
+
+
+def _game_facts(path, codes_by_digest):
+    """
+    Facts for one save.
+
+    Cash and holdings come from the packed kernel state (see kernel.py),
+    decoded with the codes of the board it names. Saves from other boards,
+    and older saves without a board digest, fall back to the players list.
+
+    Args:
+        path(str): save file.
+        codes_by_digest(dict): from board_codes().
+
+    Returns:
+        tuple: (path, size, mtime_ns, game row values or None,
+            [(seat, code, level, mortgaged)], error message or None).
+    """
+    from kernel import CASH_0, CASH_1, PROPERTIES, unpack
+
+    try:
+        stat = os.stat(path)
+    except OSError as error:
+        return path, None, None, None, [], str(error)
+    try:
+        facts = read_facts(path)
+        codes = codes_by_digest.get(facts.get("board_digest"))
+        if "state" in facts and codes is not None:
+            state = unpack(bytes.fromhex(facts["state"]))
+            if len(state[PROPERTIES]) != len(codes):
+                raise ValueError(f"{path}: state does not fit board {facts['board_digest']}")
+            cash = [state[CASH_0], state[CASH_1]]
+            holdings = [((byte & 3) - 1, codes[index], byte >> 3, (byte >> 2) & 1)
+                        for index, byte in enumerate(state[PROPERTIES]) if byte & 3]
+            if facts.get("winner") is not None and facts.get("winner_seat") is None:
+                _players_facts(facts, path)  # only for the winner's seat
+        else:
+            cash, holdings = _players_facts(facts, path)
+    except (OSError, ValueError, KeyError, IndexError) as error:
+        return path, stat.st_size, stat.st_mtime_ns, None, [], str(error)
+
+    held = [0, 0]
+    for seat, *_ in holdings:
+        held[seat] += 1
+    row = (facts.get("turns_played"), facts.get("winner"), facts.get("winner_seat"),
+           int(bool(facts.get("adjudicated"))), facts.get("state_hash"),
+           cash[0], cash[1], held[0], held[1])
+    return path, stat.st_size, stat.st_mtime_ns, row, holdings, None
+
+
+def _batch_facts(paths, codes_by_digest):
+    """Worker task: facts for a batch of saves."""
+    return [_game_facts(path, codes_by_digest) for path in paths]
+
+
+class ReplayIndex:
+    """
+    SQLite index of per-game facts from save files.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            turns INTEGER,
+            winner TEXT,
+            winner_seat INTEGER,
+            adjudicated INTEGER NOT NULL DEFAULT 0,
+            state_hash TEXT,
+            cash_0 INTEGER,
+            cash_1 INTEGER,
+            properties_0 INTEGER NOT NULL DEFAULT 0,
+            properties_1 INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS holdings (
+            game INTEGER NOT NULL,
+            seat INTEGER NOT NULL,
+            code TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            mortgaged INTEGER NOT NULL,
+            won INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS holdings_game ON holdings (game);
+        CREATE TABLE IF NOT EXISTS errors (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            message TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path="umd_replay_index.sqlite"):
+        """
+        Open or create an index.
+
+        Args:
+            path(str): SQLite file.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        # The index can always be rebuilt from the saves, so commits need not wait for the disk
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"ReplayIndex(path='{self.path}', games={self.count()})"
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    def count(self):
+        """Games in the index."""
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    # Scanning
+
+    def _changed(self, directory):
+        """
+        Compare a folder with the index.
+
+        Returns:
+            tuple: (save files that are new or changed, indexed files that
+                changed or are gone and must be dropped first).
+        """
+        known = {path: (size, mtime) for path, size, mtime in self.connection.execute(
+            "SELECT path, size, mtime_ns FROM games UNION ALL SELECT path, size, mtime_ns FROM errors")}
+        present = set()
+        changed = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not (entry.name.startswith(SAVE_PATTERN) and entry.name.endswith(".json")):
+                    continue
+                path = os.path.join(directory, entry.name)
+                present.add(path)
+                stat = entry.stat()
+                if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                    changed.append(path)
+        prefix = os.path.join(directory, "")
+        drop = [path for path in known if path.startswith(prefix)
+                and (path not in present or path in changed)]
+        return sorted(changed), drop
+
+    def _drop(self, paths):
+        """Remove files from the index, with their holdings."""
+        with self.connection:
+            rows = [(path,) for path in paths]
+            self.connection.executemany(
+                "DELETE FROM holdings WHERE game = (SELECT id FROM games WHERE path = ?)", rows)
+            self.connection.executemany("DELETE FROM games WHERE path = ?", rows)
+            self.connection.executemany("DELETE FROM errors WHERE path = ?", rows)
+
+    def _store(self, results):
+        """
+        Write one batch of _game_facts results in a single transaction.
+
+        Game ids come from SQLite as each row is inserted, inside the
+        transaction, so scanners sharing an index never pick the same id.
+        """
+        holdings, errors = [], []
+        indexed = 0
+        with self.connection:
+            cursor = self.connection.cursor()
+            for path, size, mtime_ns, row, held, error in results:
+                if row is None:
+                    if size is not None:
+                        errors.append((path, size, mtime_ns, error))
+                    continue
+                cursor.execute(
+                    "INSERT INTO games (path, size, mtime_ns, turns, winner, winner_seat, adjudicated, "
+                    "state_hash, cash_0, cash_1, properties_0, properties_1) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (path, size, mtime_ns) + row)
+                game_id = cursor.lastrowid
+                # The holder's result is copied in so per-property queries skip the join
+                winner_seat = row[2]
+                holdings.extend((game_id,) + holding + (int(holding[0] == winner_seat),) for holding in held)
+                indexed += 1
+            cursor.executemany("INSERT INTO holdings VALUES (?, ?, ?, ?, ?, ?)", holdings)
+            cursor.executemany("INSERT INTO errors VALUES (?, ?, ?, ?)", errors)
+        return indexed
+
+    def scan(self, directory=".", workers=None, batch_size=256, report_every=None, boards=()):
+        """
+        Bring the index up to date with the saves in a folder.
+
+        Args:
+            directory(str): folder holding umd_monopoly_*.json files.
+            workers(int): worker processes parsing saves (defaults to one
+                per core; 1 parses in this process).
+            batch_size(int): saves per worker task and per transaction.
+            report_every(int): print progress every this many saves.
+            boards: compiled boards, besides the default one, whose saves
+                are decoded from their packed state.
+
+        Returns:
+            dict: files indexed, removed and unreadable, and seconds taken.
+        """
+        start = time.perf_counter()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        codes_by_digest = board_codes(boards)
+        changed, drop = self._changed(directory)
+        self._drop(drop)
+        removed = len(set(drop) - set(changed))
+
+        batches = [changed[i:i + batch_size] for i in range(0, len(changed), batch_size)]
+        done = indexed = 0
+
+        def finish(results):
+            nonlocal done, indexed
+            indexed += self._store(results)
+            before = done
+            done += len(results)
+            if report_every and done // report_every != before // report_every:
+                print(f"{done:,} / {len(changed):,} saves indexed")
+
+        if workers <= 1:
+            for batch in batches:
+                finish(_batch_facts(batch, codes_by_digest))
+        else:
+            # Bounded: at most two batches per worker waiting or running
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for batch in batches:
+                    if len(pending) >= workers * 2:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            finish(future.result())
+                    pending.add(pool.submit(_batch_facts, batch, codes_by_digest))
+                for future in pending:
+                    finish(future.result())
+
+        return {"indexed": indexed, "unreadable": done - indexed, "removed": removed,
+                "seconds": time.perf_counter() - start}
+
+    # Queries
+
+    def summary(self):
+        """
+        Totals over every indexed game.
+
+        Returns:
+            dict: games, wins per seat, undecided games, mean turns and
+                mean final cash per seat.
+        """
+        games, wins_0, wins_1, turns, cash_0, cash_1 = self.connection.execute(
+            "SELECT COUNT(*), SUM(winner_seat = 0), SUM(winner_seat = 1), AVG(turns), "
+            "AVG(cash_0), AVG(cash_1) FROM games").fetchone()
+        wins = (wins_0 or 0, wins_1 or 0)
+        return {"games": games, "wins": wins, "undecided": games - sum(wins),
+                "mean_turns": turns, "mean_cash": (cash_0, cash_1)}
+
+    def win_rate_by_property(self, min_games=1):
+        """
+        How often the holder of each property at the end went on to win.
+
+        Returns:
+            list: (code, games held, wins by the holder, win rate, mean level)
+                tuples, highest win rate first.
+        """
+        rows = self.connection.execute(
+            "SELECT code, COUNT(*), SUM(won), AVG(level) FROM holdings "
+            "GROUP BY code HAVING COUNT(*) >= ?", (min_games,)).fetchall()
+        table = [(code, held, wins, wins / held, level) for code, held, wins, level in rows]
+        return sorted(table, key=lambda row: -row[3])
+
+    def turns_histogram(self, width=10):
+        """
+        Games per turn-count bucket.
+
+        Returns:
+            list: (first turn of the bucket, games) pairs.
+        """
+        return self.connection.execute(
+            "SELECT (turns / ?) * ?, COUNT(*) FROM games WHERE turns IS NOT NULL "
+            "GROUP BY 1 ORDER BY 1", (width, width)).fetchall()
+
+    def games(self, *conditions):
+        """
+        Indexed games matching every condition.
+
+        Args:
+            *conditions: (column, operator, value) tuples on the games
+                table, e.g. ("winner_seat", "=", 1), ("turns", "<", 40).
+                Operators are those in OPERATORS; values are passed as
+                query parameters.
+
+        Returns:
+            list: dicts with the games table columns.
+
+        Raises:
+            ValueError: for an unknown column or operator.
+        """
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(games)")]
+        clauses, parameters = [], []
+        for column, operator, value in conditions:
+            if column not in columns:
+                raise ValueError(f"Unknown games column: {column!r}")
+            if operator.upper() not in OPERATORS:
+                raise ValueError(f"Unsupported operator: {operator!r}")
+            clauses.append(f"{column} {operator.upper()} ?")
+            parameters.append(value)
+        cursor = self.connection.execute(
+            "SELECT * FROM games WHERE " + (" AND ".join(clauses) or "1"), parameters)
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from game import Game
+    from save import save_game
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as directory:
+        # A few hundred real games, each saved under many names
+        snapshots = []
+        for seed in range(200):
+            game = Game("cpu_vs_cpu", seed=seed, verbose=False)
+            while game.turn():
+                pass
+            snapshots.append(json.dumps(game.snapshot(final=True), indent=2))
+        for i in range(count):
+            with open(os.path.join(directory, f"{SAVE_PATTERN}{i:06}.json"), "w", encoding="utf-8") as file:
+                file.write(snapshots[i % len(snapshots)])
+        save_game(json.loads(snapshots[0]), os.path.join(directory, f"{SAVE_PATTERN}via_save_game.json"),
+                  verbose=False)
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+        megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+
+        # Reading every byte alone, to show how little of the scan is I/O
+        start = time.perf_counter()
+        for path in paths:
+            with open(path, "rb") as file:
+                file.read()
+        read_only = time.perf_counter() - start
+        start = time.perf_counter()
+        for path in paths[:2000]:
+            with open(path, encoding="utf-8") as file:
+                json.load(file)
+        full_parse = (time.perf_counter() - start) / min(len(paths), 2000) * len(paths)
+
+        index = ReplayIndex(os.path.join(directory, "index.sqlite"))
+        result = index.scan(directory)
+        print(f"{len(paths):,} saves ({megabytes:.0f} MB): read alone {read_only:.2f}s, "
+              f"full json.load ~{full_parse:.2f}s, indexed in {result['seconds']:.2f}s "
+              f"({len(paths) / result['seconds']:,.0f} saves/s)")
+        print(f"reading is {read_only / result['seconds']:.0%} of the scan with "
+              f"{os.cpu_count()} worker(s); I/O-bound would be close to 100%")
+        print(f"rescan with nothing changed: {index.scan(directory)['seconds']:.2f}s")
+
+        for label, query in (("summary", index.summary),
+                             ("win rate by property", index.win_rate_by_property),
+                             ("turns histogram", index.turns_histogram),
+                             ("quick wins by seat 1",
+                              lambda: index.games(("winner_seat", "=", 1), ("turns", "<", 40)))):
+            start = time.perf_counter()
+            answer = query()
+            elapsed = (time.perf_counter() - start) * 1000
+            shown = answer if isinstance(answer, dict) else f"{len(answer)} rows, first {answer[:2]}"
+            print(f"{label:22} {elapsed:6.1f} ms  {shown}")
+        index.close()
@@ -0,0 +1,393 @@
+"""
+On-disk cache of simulation results.
+
+Results are stored per seed under a configuration key: a SHA-256 of
+everything that decides how a seeded game plays out (the property groups
+as configured at run time, the board layout, both CPU policies, the rent
+multiplier and turn limit, the adjudicator settings, the event deck, and
+the source of the rule modules, found by following simulate.py's
+imports). Asking for a seed range that was partly simulated before only
+plays the missing seeds. Any edit to a rule module changes the key, and
+entries written under an old rules hash are dropped when the cache opens.
+The cache keeps itself under a size limit by evicting the least recently
+used configurations.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from board_spec import get_board
+from decision_engine import DEFAULT_POLICY
+from event_deck import DEFAULT_DECK
+from game import Game
+from simulate import play_game
+from UMD_property import UMDProperty
+
+# A cached result is play_game's: simulate.py and every repository module it
+# imports, the adjudicator callers may pass in, and the data files they read
+RULE_ROOTS = ("simulate.py", "adjudicator.py")
+RULE_DATA = ("board_spec.json",)
+
+_rules_hash = None
+DEFAULT_MAX_TURNS = inspect.signature(Game).parameters["max_turns"].default
+
+
+def _is_main_block(node):
+    """True for an `if __name__ == "__main__":` statement."""
+    test = getattr(node, "test", None)
+    return (isinstance(node, ast.If) and isinstance(test, ast.Compare)
+            and isinstance(test.left, ast.Name) and test.left.id == "__name__")
+
+
+def rule_files(roots=RULE_ROOTS):
+    """
+    Repository files whose contents decide game outcomes.
+
+    Follows imports (top-level and inside functions, but not in
+    `__main__` blocks) from the roots to every module that lives in this
+    directory.
+
+    Args:
+        roots(tuple): file names to start from.
+
+    Returns:
+        tuple: file names, sorted, followed by RULE_DATA.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    found = set()
+    pending = list(roots)
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        with open(os.path.join(here, name), encoding="utf-8") as file:
+            tree = ast.parse(file.read(), name)
+        for statement in tree.body:
+            if _is_main_block(statement):
+                continue
+            for node in ast.walk(statement):
+                if isinstance(node, ast.Import):
+                    modules = [alias.name for alias in node.names]
+                elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                    modules = [node.module]
+                else:
+                    continue
+                for module in modules:
+                    path = module.split(".")[0] + ".py"
+                    if os.path.exists(os.path.join(here, path)):
+                        pending.append(path)
+    return tuple(sorted(found)) + RULE_DATA
+
+
+def rules_hash():
+    """
+    SHA-256 of the rule files' contents (see rule_files), computed once
+    per process.
+
+    Returns:
+        str: hex digest.
+    """
+    global _rules_hash
+    if _rules_hash is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in rule_files():
+            digest.update(name.encode())
+            with open(os.path.join(here, name), "rb") as file:
+                digest.update(file.read())
+        _rules_hash = digest.hexdigest()
+    return _rules_hash
+
+
+def describe_config(game_options=None):
+    """
+    Everything besides the seed that decides a headless game's result.
+
+    Args:
+        game_options(dict): keyword arguments that would be passed to Game.
+
+    Returns:
+        dict: a JSON-serialisable description.
+
+    Raises:
+        ValueError: for options that cannot be described reliably (a shared
+            rng, or an adjudicator with a custom condition function).
+    """
+    options = dict(game_options or {})
+    board = options.pop("board", None) or get_board()
+    policies = options.pop("policies", None) or (DEFAULT_POLICY, DEFAULT_POLICY)
+    deck = options.pop("event_deck", None) or DEFAULT_DECK
+    adjudicator = options.pop("adjudicator", None)
+    max_turns = options.pop("max_turns", DEFAULT_MAX_TURNS)
+    options.pop("zobrist", None)  # bookkeeping only
+    if options.pop("rng", None) is not None:
+        raise ValueError("Games with a shared rng cannot be cached; pass seeds instead")
+    if options:
+        raise ValueError(f"Unsupported game options for caching: {sorted(options)}")
+
+    if adjudicator is not None:
+        if adjudicator.condition is not None:
+            raise ValueError("Adjudicators with a custom condition cannot be cached")
+        adjudicator = {"ratio": adjudicator.ratio, "hold_turns": adjudicator.hold_turns,
+                       "min_turn": adjudicator.min_turn,
+                       "require_monopoly": adjudicator.require_monopoly}
+
+    policy_params = []
+    for policy in policies:
+        params = policy.params()
+        params.pop("name")  # a label, not a setting
+        policy_params.append(params)
+
+    return {
+        "rules": rules_hash(),
+        # The runtime groups, so update_group_config() changes the key
+        "groups": UMDProperty.board_groups(board),
+        "rent_config_version": UMDProperty.rent_config_version,
+        "specials": board["specials"],
+        "tiles": list(board["tiles"]),
+        "board_layout": board["board_layout"],
+        "go_salary": board["go_salary"],
+        "policies": policy_params,
+        "rent_multiplier": Game.RENT_MULTIPLIER,
+        "max_turns": max_turns,
+        "adjudicator": adjudicator,
+        "event_deck": [[card.name, card.weight, card.effect, card.amount] for card in deck.cards],
+    }
+
+
+def config_key(game_options=None):
+    """
+    Cache key for a configuration.
+
+    Returns:
+        str: hex SHA-256 of describe_config(game_options).
+    """
+    return _key(describe_config(game_options))
+
+
+def _key(description):
+    """Hex SHA-256 of a canonical JSON description."""
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed cache of Game.summary() results per (configuration, seed).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS configs (
+            key TEXT PRIMARY KEY,
+            rules TEXT NOT NULL,
+            description TEXT NOT NULL,
+            last_access REAL NOT NULL,
+            bytes INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT NOT NULL,
+            seed INTEGER NOT NULL,
+            summary TEXT NOT NULL,
+            PRIMARY KEY (key, seed)
+        );
+    """
+
+    def __init__(self, path="umd_results_cache.sqlite", max_bytes=256 * 1024 * 1024):
+        """
+        Open or create a cache.
+
+        Args:
+            path(str): SQLite file.
+            max_bytes(int): limit on the stored summaries; least recently
+                used configurations are evicted past it.
+
+        Side Effects:
+            Drops every configuration cached under different rule sources.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+        self.purge_stale()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"ResultCache(path='{self.path}', bytes={self.size()}, max_bytes={self.max_bytes})"
+
+    def close(self):
+        """Close the database."""
+        self.connection.close()
+
+    # Maintenance
+
+    def _drop(self, key):
+        """Delete one configuration and its results."""
+        self.connection.execute("DELETE FROM results WHERE key = ?", (key,))
+        self.connection.execute("DELETE FROM configs WHERE key = ?", (key,))
+
+    def purge_stale(self):
+        """
+        Drop configurations cached with other rule sources.
+
+        Returns:
+            int: configurations dropped.
+        """
+        with self.connection:
+            stale = [key for (key,) in self.connection.execute(
+                "SELECT key FROM configs WHERE rules != ?", (rules_hash(),))]
+            for key in stale:
+                self._drop(key)
+        return len(stale)
+
+    def size(self):
+        """Bytes of stored summaries."""
+        return self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM configs").fetchone()[0]
+
+    def evict(self, keep=None):
+        """
+        Evict least recently used configurations until under max_bytes.
+
+        Args:
+            keep(str): a key that is never evicted (the one in use).
+
+        Returns:
+            int: configurations evicted.
+        """
+        evicted = 0
+        with self.connection:
+            total = self.size()
+            rows = self.connection.execute(
+                "SELECT key, bytes FROM configs ORDER BY last_access").fetchall()
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                self._drop(key)
+                total -= size
+                evicted += 1
+        return evicted
+
+    # Lookups
+
+    def cached_seeds(self, key, seeds):
+        """
+        Summaries already stored for some of `seeds`.
+
+        Returns:
+            dict: seed -> summary.
+        """
+        found = {}
+        seeds = list(seeds)
+        # Stay well under SQLite's bound parameter limit
+        for i in range(0, len(seeds), 500):
+            chunk = seeds[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for seed, summary in self.connection.execute(
+                    f"SELECT seed, summary FROM results WHERE key = ? AND seed IN ({marks})",
+                    [key] + chunk):
+                found[seed] = json.loads(summary)
+        return found
+
+    def store(self, key, description, summaries):
+        """
+        Save new summaries for a configuration.
+
+        Args:
+            key(str): config_key().
+            description(dict): describe_config(), kept for inspection.
+            summaries(dict): seed -> summary.
+        """
+        rows = [(key, seed, json.dumps(summary, separators=(",", ":")))
+                for seed, summary in summaries.items()]
+        added = sum(len(row[2]) for row in rows)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO configs (key, rules, description, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, description["rules"], json.dumps(description, sort_keys=True), time.time()))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results (key, seed, summary) VALUES (?, ?, ?)", rows)
+            self.connection.execute(
+                "UPDATE configs SET bytes = bytes + ?, last_access = ? WHERE key = ?",
+                (added, time.time(), key))
+
+    def run_games(self, seeds, workers=1, **game_options):
+        """
+        Summaries for a seed range, simulating only the seeds not cached.
+
+        Args:
+            seeds: iterable of seeds.
+            workers(int): worker processes for the missing seeds.
+            **game_options: keyword arguments for Game, as for
+                simulate.run_games.
+
+        Returns:
+            list: Game.summary() per seed, in the order given.
+
+        Raises:
+            ValueError: if the options cannot be cached (see describe_config).
+        """
+        seeds = list(seeds)
+        description = describe_config(game_options)
+        key = _key(description)
+
+        found = self.cached_seeds(key, seeds)
+        missing = [seed for seed in dict.fromkeys(seeds) if seed not in found]
+        self.hits += len(seeds) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    played = list(pool.map(partial(play_game, **game_options), missing,
+                                           chunksize=max(1, len(missing) // (workers * 4))))
+            else:
+                played = [play_game(seed, **game_options) for seed in missing]
+            fresh = dict(zip(missing, played))
+            self.store(key, description, fresh)
+            found.update(fresh)
+            self.evict(keep=key)
+        else:
+            with self.connection:
+                self.connection.execute("UPDATE configs SET last_access = ? WHERE key = ?",
+                                        (time.time(), key))
+
+        return [found[seed] for seed in seeds]
+
+
+if __name__ == "__main__":
+    import tempfile
+    from decision_engine import CPUPolicy
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(os.path.join(directory, "cache.sqlite"), max_bytes=2 * 1024 * 1024)
+        aggressive = (CPUPolicy("aggressive", buy_risky=True, build_reserve=50), DEFAULT_POLICY)
+        runs = (("cold 0-999", range(1000), {}),
+                ("repeat 0-999", range(1000), {}),
+                ("overlap 500-1499", range(500, 1500), {}),
+                ("other policy 0-999", range(1000), {"policies": aggressive}),
+                ("repeat 0-999", range(1000), {}))
+        for label, seeds, options in runs:
+            hits, misses = cache.hits, cache.misses
+            start = time.perf_counter()
+            cache.run_games(seeds, **options)
+            print(f"{label:20} {time.perf_counter() - start:7.3f}s  "
+                  f"{cache.hits - hits:5} cached, {cache.misses - misses:5} played, "
+                  f"{cache.size() / 1024:6.0f} KiB stored")
+        cache.close()
@@ -0,0 +1,346 @@
+"""
+Columnar store for simulation results.
+
+Every column lives in its own fixed-width binary file (<column>.bin) inside
+the store directory, so a column can be memory-mapped straight into NumPy
+or read through a memoryview without parsing. Appends take an exclusive
+file lock, which keeps the columns in step when several worker processes
+write to the same store.
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer only
+    fcntl = None
+
+from UMD_property import UMDProperty
+
+# array/struct type codes and the matching NumPy dtypes
+NUMPY_TYPES = {"b": "i1", "i": "i4", "q": "i8"}
+
+SEATS = 2
+
+
+def _slug(group_name):
+    """Column-safe name for a property group ("North Campus" -> "north_campus")."""
+    return group_name.lower().replace(" ", "_")
+
+
+def default_columns(board=None):
+    """
+    Columns for one game summary as (name, type code) pairs.
+
+    Args:
+        board(dict): compiled board the games are played on (defaults to
+            board_spec.json); its groups get the per-group columns.
+
+    Returns:
+        list: the base columns followed by per-seat properties held per group.
+    """
+    columns = [("seed", "q"), ("winner", "b"), ("turns", "i"), ("adjudicated", "b")]
+    for seat in range(SEATS):
+        columns.append((f"cash_{seat}", "q"))
+    for seat in range(SEATS):
+        columns.append((f"rent_{seat}", "q"))
+    for group_name in UMDProperty.board_groups(board):
+        for seat in range(SEATS):
+            columns.append((f"{_slug(group_name)}_{seat}", "b"))
+    return columns
+
+
+def summary_to_row(summary, columns):
+    """
+    Flatten Game.summary() into one value per column.
+
+    Returns:
+        list: values in column order. Missing values become 0.
+
+    Raises:
+        ValueError: if the summary counts a group that has no column
+            (a game on another board than the columns were made for).
+    """
+    flat = {
+        "seed": summary["seed"] if summary["seed"] is not None else -1,
+        "winner": summary["winner"],
+        "turns": summary["turns"],
+        "adjudicated": int(summary.get("adjudicated", False)),
+    }
+    names = {name for name, _ in columns}
+    for seat in range(SEATS):
+        flat[f"cash_{seat}"] = summary["cash"][seat]
+        flat[f"rent_{seat}"] = summary["rent_collected"][seat]
+        for group_name, count in summary["properties"][seat].items():
+            name = f"{_slug(group_name)}_{seat}"
+            if name not in names:
+                raise ValueError(f"No column for group '{group_name}'; "
+                                 f"use default_columns() of the board the game was played on")
+            flat[name] = count
+    return [flat.get(name, 0) for name, _ in columns]
+
+
+class ResultsStore:
+    """
+    Append-only columnar results sink with a small query API.
+
+    Rows are buffered in memory and written on flush(), on close(), or
+    every `flush_every` rows. Use it as a context manager in workers.
+    """
+
+    SCHEMA_FILE = "schema.json"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, directory, columns=None, flush_every=1024):
+        """
+        Open or create a store.
+
+        Args:
+            directory(str): folder holding the column files.
+            columns(list): (name, type code) pairs. Defaults to
+                default_columns(). Must match an existing store's schema.
+            flush_every(int): buffered rows before an automatic flush.
+
+        Raises:
+            ValueError: if `columns` does not match the stored schema.
+        """
+        self.directory = directory
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+
+        schema_path = os.path.join(directory, self.SCHEMA_FILE)
+        requested = [list(column) for column in (columns or default_columns())]
+        with self._locked():
+            if os.path.exists(schema_path):
+                with open(schema_path, encoding="utf-8") as file:
+                    stored = json.load(file)
+                if columns is not None and stored != requested:
+                    raise ValueError(f"Columns do not match the schema in {directory}")
+                requested = stored
+            else:
+                with open(schema_path, "w", encoding="utf-8") as file:
+                    json.dump(requested, file)
+
+        self.columns = [tuple(column) for column in requested]
+        self._types = dict(self.columns)
+        self._pending = [array(code) for _, code in self.columns]
+        self._pending_rows = 0
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count()
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"ResultsStore(directory='{self.directory}', rows={self.count()})"
+
+    def _path(self, name):
+        """Path of one column file."""
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _locked(self):
+        """Context manager holding the store's exclusive write lock."""
+        return _FileLock(os.path.join(self.directory, self.LOCK_FILE))
+
+    # Writing
+
+    def append(self, summary):
+        """
+        Buffer one finished game.
+
+        Args:
+            summary(dict): Game.summary(), or a row list in column order.
+        """
+        row = summary if isinstance(summary, (list, tuple)) else summary_to_row(summary, self.columns)
+        for values, value in zip(self._pending, row):
+            values.append(value)
+        self._pending_rows += 1
+        if self._pending_rows >= self.flush_every:
+            self.flush()
+
+    def extend(self, summaries):
+        """Buffer many finished games."""
+        for summary in summaries:
+            self.append(summary)
+
+    def flush(self):
+        """
+        Write buffered rows to the column files under the store lock.
+
+        Side Effects:
+            Appends to every <column>.bin file.
+        """
+        if not self._pending_rows:
+            return
+        with self._locked():
+            rows = self._count_unlocked()
+            for (name, code), values in zip(self.columns, self._pending):
+                with open(self._path(name), "r+b" if os.path.exists(self._path(name)) else "wb") as file:
+                    # Drop any half-written tail left behind by a crashed writer
+                    file.truncate(rows * values.itemsize)
+                    file.seek(0, os.SEEK_END)
+                    values.tofile(file)
+        self._pending = [array(code) for _, code in self.columns]
+        self._pending_rows = 0
+
+    def close(self):
+        """Flush pending rows and release memory maps."""
+        self.flush()
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a caller still holds a view; the map closes with it
+        self._maps = []
+
+    # Reading
+
+    def _count_unlocked(self):
+        """Complete rows on disk (the shortest column wins)."""
+        counts = []
+        for name, code in self.columns:
+            path = self._path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // struct.calcsize(code))
+        return min(counts) if counts else 0
+
+    def count(self):
+        """
+        Number of games stored on disk.
+
+        Returns:
+            int: rows present in every column.
+        """
+        return self._count_unlocked()
+
+    def column(self, name):
+        """
+        Memory-map one column.
+
+        Args:
+            name(str): column name.
+
+        Returns:
+            numpy.memmap if NumPy is installed, otherwise a read-only
+            memoryview of the typed values. Either way no data is copied.
+
+        Raises:
+            KeyError: for an unknown column.
+        """
+        if name not in self._types:
+            raise KeyError(f"Unknown column: {name}")
+        code = self._types[name]
+        rows = self.count()
+
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        if numpy is not None:
+            if rows == 0:
+                return numpy.zeros(0, dtype=NUMPY_TYPES[code])
+            return numpy.memmap(self._path(name), dtype=NUMPY_TYPES[code], mode="r", shape=(rows,))
+
+        if rows == 0:
+            return memoryview(array(code)).toreadonly()
+        with open(self._path(name), "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(code)[:rows]
+
+    def rows(self, where=None, columns=None):
+        """
+        Iterate over stored games as dicts.
+
+        Args:
+            where: optional function taking a row dict and returning bool.
+            columns(list): names to include (defaults to every column).
+
+        Yields:
+            dict: column name -> value for each matching game.
+        """
+        names = columns or [name for name, _ in self.columns]
+        views = [self.column(name) for name in names]
+        for values in zip(*views):
+            row = dict(zip(names, values))
+            if where is None or where(row):
+                yield row
+
+    def aggregate(self, column, how="mean", group_by=None, where=None):
+        """
+        Aggregate one column, optionally per value of another column.
+
+        Args:
+            column(str): column to aggregate.
+            how(str): "mean", "sum", "min", "max" or "count".
+            group_by(str): optional column to group on (e.g. "winner").
+            where: optional row filter, as in rows().
+
+        Returns:
+            number, or dict of group value -> number when group_by is set.
+        """
+        reducers = {
+            "mean": lambda values: sum(values) / len(values) if values else 0.0,
+            "sum": sum,
+            "min": lambda values: min(values) if values else None,
+            "max": lambda values: max(values) if values else None,
+            "count": len,
+        }
+        if how not in reducers:
+            raise ValueError(f"Unknown aggregate: {how}")
+
+        wanted = [column] + ([group_by] if group_by else [])
+        if where is None:
+            views = [self.column(name) for name in wanted]
+            pairs = zip(*views)
+        else:
+            pairs = ((row[column], row.get(group_by)) for row in self.rows(where))
+
+        if group_by is None:
+            values = [pair[0] for pair in pairs]
+            return reducers[how](values)
+
+        groups = {}
+        for value, key in pairs:
+            groups.setdefault(int(key), []).append(value)
+        return {key: reducers[how](values) for key, values in sorted(groups.items())}
+
+    def win_rate(self, seat=0):
+        """
+        Share of stored games won by a seat.
+
+        Returns:
+            float: wins / games, or 0.0 for an empty store.
+        """
+        winners = self.column("winner")
+        games = len(winners)
+        return sum(1 for winner in winners if winner == seat) / games if games else 0.0
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file (no-op where fcntl is missing)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
@@ -0,0 +1,282 @@
+"""
+Analytic return-on-investment report for the campus properties.
+
+The opponent's walk around the board is a Markov chain. Its states are
+the board positions plus one extra "jailed" state for the turn a player
+sits out after being sent to jail. One step is one opponent turn:
+
+    - a single d6 roll moves the token,
+    - an Event tile draws a card: cash cards leave the token there, move
+      cards move it again (and that tile is handled, without chaining
+      another event), and the jail card sends it to jail,
+    - from the jailed state the token stays on the jail tile.
+
+The stationary distribution comes from one small linear solve. Together
+with the transition probabilities it gives the exact chance per opponent
+turn of landing on each property. That chance, times the rent table
+(with Game.RENT_MULTIPLIER), gives expected rent per opponent turn and
+payback time for every improvement level and monopoly state. No games
+are simulated.
+"""
+from kernel import EVENT, HOTEL_LEVEL, KernelRules, default_rules
+
+
+def _transitions(rules):
+    """
+    One opponent turn as sparse transitions.
+
+    Returns:
+        list: per state, a list of (next state, probability, landed property
+            index or None) triples. State board_size is the jailed state.
+    """
+    size = rules.board_size
+    jailed = size
+    card_odds = [card.weight for card in rules.deck.cards]
+    total = float(sum(card_odds))
+    card_odds = [weight / total for weight in card_odds]
+
+    def land(position, probability, moved):
+        """Outcomes of ending a move on `position`."""
+        kind = rules.tile_kind[position]
+        if kind >= 0:
+            return [(position, probability, kind)]
+        if kind == EVENT and not moved:
+            outcomes = []
+            for (effect, amount), odds in zip(rules.card_effects, card_odds):
+                if effect == "move":
+                    outcomes += land((position + amount) % size, probability * odds, True)
+                elif effect == "jail":
+                    outcomes.append((jailed, probability * odds, None))
+                else:
+                    outcomes.append((position, probability * odds, None))
+            return outcomes
+        return [(position, probability, None)]
+
+    transitions = []
+    for position in range(size):
+        outcomes = []
+        for die in range(1, 7):
+            outcomes += land((position + die) % size, 1 / 6, False)
+        transitions.append(outcomes)
+    transitions.append([(rules.jail_position, 1.0, None)])
+    return transitions
+
+
+def stationary_distribution(transitions):
+    """
+    Long-run share of opponent turns started in each state.
+
+    Solves pi = pi P with sum(pi) = 1 by Gaussian elimination with partial
+    pivoting (the chain has board_size + 1 states, so this is cheap).
+
+    Args:
+        transitions(list): from _transitions().
+
+    Returns:
+        list: probability per state.
+    """
+    count = len(transitions)
+    # Rows are the equations (P^T - I) pi = 0; the last is replaced by sum(pi) = 1
+    matrix = [[0.0] * count + [0.0] for _ in range(count)]
+    for state, outcomes in enumerate(transitions):
+        matrix[state][state] -= 1.0
+        for target, probability, _ in outcomes:
+            matrix[target][state] += probability
+    matrix[-1] = [1.0] * count + [1.0]
+
+    for column in range(count):
+        pivot = max(range(column, count), key=lambda row: abs(matrix[row][column]))
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        pivot_row = matrix[column]
+        scale = pivot_row[column]
+        for row in range(count):
+            if row != column:
+                factor = matrix[row][column] / scale
+                if factor:
+                    current = matrix[row]
+                    for k in range(column, count + 1):
+                        current[k] -= factor * pivot_row[k]
+    return [max(matrix[state][count] / matrix[state][state], 0.0) for state in range(count)]
+
+
+def landing_probabilities(rules=None):
+    """
+    Chance per opponent turn of landing on each property.
+
+    Args:
+        rules(KernelRules): board and deck (defaults to kernel.default_rules()).
+
+    Returns:
+        list: probability per property, in rules.codes order.
+    """
+    rules = rules or default_rules()
+    transitions = _transitions(rules)
+    distribution = stationary_distribution(transitions)
+    landing = [0.0] * len(rules.codes)
+    for state, outcomes in enumerate(transitions):
+        for _, probability, landed in outcomes:
+            if landed is not None:
+                landing[landed] += distribution[state] * probability
+    return landing
+
+
+def property_roi(rules=None, board=None):
+    """
+    Expected rent, payback and ROI for every property.
+
+    Investment is the purchase price plus one house cost per building (the
+    hotel is the fifth building). Payback is investment divided by
+    expected rent per opponent turn; each building's own payback is its
+    cost over the rent it adds.
+
+    Args:
+        rules(KernelRules): defaults to kernel.default_rules(), or rules
+            for `board` when a board is given.
+        board(dict): compiled board, used for house costs and names.
+
+    Returns:
+        list: one dict per property with code, name, group, landing chance,
+            whether its group's monopoly can be completed, and per state
+            ("single" unimproved without the monopoly, then "monopoly"
+            levels 0-5) the rent per turn, investment, payback turns and
+            marginal payback of the last building.
+    """
+    from board_spec import get_board
+
+    board = board or get_board()
+    rules = rules or (default_rules() if board is get_board() else KernelRules(board))
+    landing = landing_probabilities(rules)
+
+    groups = {code: (group_name, group_info) for group_name, group_info in board["groups"].items()
+              for code in group_info["properties"]}
+    # A monopoly needs every property of the group, so none on the board means none at all
+    reachable = {}
+    for index, code in enumerate(rules.codes):
+        group_name = groups[code][0]
+        reachable[group_name] = reachable.get(group_name, True) and landing[index] > 0
+
+    rows = []
+    for index, code in enumerate(rules.codes):
+        group_name, group_info = groups[code]
+        house_cost = group_info.get("house_cost", 100)
+        chance = landing[index]
+        rent = rules.rent[index]
+
+        def expected(level, monopoly):
+            return chance * rent[level * 4 + monopoly] * rules.rent_multiplier
+
+        states = [("single", 0, expected(0, 0), rules.cost[index], None)]
+        previous = None
+        for level in range(HOTEL_LEVEL + 1):
+            per_turn = expected(level, 1)
+            marginal = None
+            if previous is not None:
+                added = per_turn - previous
+                marginal = house_cost / added if added > 0 else None
+            states.append(("monopoly", level, per_turn, rules.cost[index] + level * house_cost, marginal))
+            previous = per_turn
+
+        rows.append({
+            "code": code,
+            "name": group_info["properties"][code],
+            "group": group_name,
+            "landing": chance,
+            "monopoly_possible": reachable[group_name],
+            "states": [{"monopoly": kind == "monopoly", "level": level, "rent_per_turn": per_turn,
+                        "investment": investment,
+                        "payback_turns": investment / per_turn if per_turn > 0 else None,
+                        "building_payback_turns": marginal}
+                       for kind, level, per_turn, investment, marginal in states],
+        })
+    return rows
+
+
+def rank(rows, monopoly=False, level=0):
+    """
+    Properties by ROI (expected rent per turn over investment), best first.
+
+    Args:
+        rows(list): from property_roi().
+        monopoly(bool): rank the monopoly states instead of a lone property.
+        level(int): improvement level (monopoly only), or None for each
+            property's best level.
+
+    Returns:
+        list: (ROI per opponent turn, row, state) tuples. Monopoly rankings
+            leave out groups with a property that is not on the board.
+    """
+    ranked = []
+    for row in rows:
+        if monopoly and not row["monopoly_possible"]:
+            continue
+        candidates = [state for state in row["states"] if state["monopoly"] == monopoly
+                      and (level is None or state["level"] == level)]
+        best = max(candidates, key=lambda state: state["rent_per_turn"] / state["investment"])
+        ranked.append((best["rent_per_turn"] / best["investment"], row, best))
+    return sorted(ranked, key=lambda item: -item[0])
+
+
+def _turns(value):
+    return f"{value:8.1f}" if value is not None else f"{'never':>8}"
+
+
+def report(rows=None):
+    """
+    Printable ROI report.
+
+    Returns:
+        str: landing chances and payback by state, then the rankings.
+    """
+    rows = rows if rows is not None else property_roi()
+    level_names = ["single", "mono", "1 house", "2 houses", "3 houses", "4 houses", "hotel"]
+    lines = ["Payback in opponent turns (expected rent per opponent turn in brackets)",
+             f"{'code':5} {'name':28} {'land':>6}  " + " ".join(f"{name:>17}" for name in level_names)]
+    for row in sorted(rows, key=lambda row: -row["landing"]):
+        cells = [f"{_turns(state['payback_turns'])} ({state['rent_per_turn']:6.1f})"
+                 for state in row["states"]]
+        lines.append(f"{row['code']:5} {row['name'][:28]:28} {row['landing']:6.2%}  " + " ".join(cells))
+
+    for title, monopoly, level in (("Best buys on their own", False, 0),
+                                   ("Best monopoly investments (best level)", True, None)):
+        lines.append(f"\n{title}")
+        for place, (roi, row, state) in enumerate(rank(rows, monopoly, level), 1):
+            if roi <= 0:
+                break
+            where = level_names[state["level"] + 1] if state["monopoly"] else "single"
+            lines.append(f"{place:3}. {row['name'][:28]:28} {where:9} {roi:7.2%} per turn, "
+                         f"pays back in {_turns(state['payback_turns']).strip()} turns")
+    unreachable = [row["code"] for row in rows if row["landing"] == 0]
+    if unreachable:
+        lines.append(f"\nNot on the board (never pay rent, and their groups never form a "
+                     f"monopoly): {', '.join(unreachable)}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rules = default_rules()
+    start = time.perf_counter()
+    rows = property_roi(rules)
+    elapsed = time.perf_counter() - start
+    print(report(rows))
+    print(f"\ncomputed in {elapsed * 1000:.1f} ms")
+
+    # Cross-check the exact landing chances against a long random walk
+    transitions = _transitions(rules)
+    visits = [0] * len(rules.codes)
+    state, steps = 0, 500_000
+    rng = random.Random(1)
+    for _ in range(steps):
+        outcomes = transitions[state]
+        pick = rng.random()
+        for target, probability, landed in outcomes:
+            pick -= probability
+            if pick < 0:
+                break
+        state = target
+        if landed is not None:
+            visits[landed] += 1
+    worst = max(abs(visits[i] / steps - row["landing"]) for i, row in enumerate(rows))
+    print(f"largest difference from a {steps:,}-turn random walk: {worst:.4%}")
@@ -1,25 +1,99 @@
+import glob
 import json
+import os
 from datetime import datetime
 
-def save_game(game_state, filename=None):
+# directory -> {state_hash: [(identity, filename), ...]} of saves written
+# (or found) by this process
+_saved_hashes = {}
+
+def _identity(game_state):
+    """What two saves must share to be the same game: the packed kernel
+    state (which holds the turn), the turn count and the player names.
+    Saves without a packed state must match in full.
+    """
+    if "state" not in game_state:
+        return json.dumps(game_state, sort_keys=True)
+    names = tuple(player.get("name") for player in game_state.get("players") or ())
+    return game_state["state"], game_state.get("turns_played"), names
+
+def _known_hashes(directory):
+    """State hashes of the saves in a directory, read once per directory."""
+    directory = os.path.abspath(directory)
+    known = _saved_hashes.get(directory)
+    if known is None:
+        known = _saved_hashes[directory] = {}
+        for path in glob.glob(os.path.join(glob.escape(directory), "umd_monopoly_*.json")):
+            try:
+                with open(path, encoding='utf-8') as file:
+                    saved = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if saved.get("state_hash"):
+                known.setdefault(saved["state_hash"], []).append((_identity(saved), path))
+    return known
+
+def write_atomic(filename, text):
+    """Write text to a temporary file next to `filename`, then rename it
+    into place, so readers only ever see the old or the new file.
+
+    Args:
+        filename (str): Target file.
+        text (str): Contents to write.
+    """
+    import tempfile  # imported on first save to keep startup imports small
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, filename)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+def save_game(game_state, filename=None, dedupe=False, verbose=True):
     """The save game function will save current game to a JSON file.
 
     Args:
         game_state (dict): The dict holds the entire game state data
         filename (str, optional): Customized filename to save file.
+        dedupe (bool, optional): Skip the write when the target directory
+            already holds a save of the same game and return that file
+            instead. The "state_hash" finds candidates; they must also
+            match exactly (see _identity), since the hash buckets cash and
+            leaves out names.
+        verbose (bool, optional): Print the outcome.
 
     Returns:
         str: The filename where the game will be saved, otherwise None if save failed
     """
+    state_hash = game_state.get("state_hash")
+    directory = os.path.dirname(filename) if filename else ""
+    identity = _identity(game_state) if state_hash else None
+    if dedupe and state_hash:
+        for saved_identity, path in _known_hashes(directory or ".").get(state_hash, ()):
+            if saved_identity == identity:
+                if verbose:
+                    print(f"Identical game already saved in {path}")
+                return path
+
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d, %H:%M:%S")
         filename = f"umd_monopoly_{timestamp}.json"
         
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
-            json.dump(game_state, file, indent=2)
+        write_atomic(filename, json.dumps(game_state, indent=2))
             
-        print(f"Game saved successfully to {filename}")
+        known = _saved_hashes.get(os.path.abspath(directory or "."))
+        if state_hash and known is not None:
+            known.setdefault(state_hash, []).append((identity, filename))
+        if verbose:
+            print(f"Game saved successfully to {filename}")
         return filename
     
     except Exception as e:
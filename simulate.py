@@ -0,0 +1,81 @@
+"""
+Headless CPU vs CPU simulations.
+
+Games run without printing or saving and report Game.summary(). Batches
+can be spread over worker processes that all append to one ResultsStore.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from game import Game
+from results_store import ResultsStore, default_columns
+
+
+def play_game(seed, **game_options):
+    """
+    Play one seeded headless game.
+
+    Args:
+        seed(int): seed for the game's GameRNG.
+        **game_options: extra keyword arguments for Game.
+
+    Returns:
+        dict: Game.summary() of the finished game.
+    """
+    game = Game("cpu_vs_cpu", "CPU 1", "CPU 2", seed=seed, verbose=False, **game_options)
+    return game.play()
+
+
+def _run_chunk(seeds, store_directory, game_options):
+    """Worker entry point: play `seeds` and append them to the store."""
+    columns = default_columns(game_options.get("board"))
+    with ResultsStore(store_directory, columns) as store:
+        for seed in seeds:
+            store.append(play_game(seed, **game_options))
+    return len(seeds)
+
+
+def run_games(seeds, store_directory=None, workers=1, chunk_size=256, **game_options):
+    """
+    Play a batch of seeded games.
+
+    Args:
+        seeds: iterable of seeds, one game each.
+        store_directory(str): ResultsStore folder to append to. When None the
+            summaries are returned instead (single process only).
+        workers(int): worker processes to use when writing to a store.
+        chunk_size(int): seeds handed to a worker at a time.
+        **game_options: extra keyword arguments for Game.
+
+    Returns:
+        list of summaries when store_directory is None, otherwise the number
+        of games appended.
+    """
+    seeds = list(seeds)
+    if store_directory is None:
+        return [play_game(seed, **game_options) for seed in seeds]
+
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    if workers <= 1:
+        return sum(_run_chunk(chunk, store_directory, game_options) for chunk in chunks)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, store_directory, game_options)
+                   for chunk in chunks]
+        return sum(future.result() for future in futures)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        games = run_games(range(2000), directory, workers=4)
+        elapsed = time.perf_counter() - start
+
+        store = ResultsStore(directory)
+        print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.0f} games/s)")
+        print(f"rows stored: {store.count()}")
+        print(f"seat 0 win rate: {store.win_rate(0):.3f}")
+        print(f"mean turns by winner: {store.aggregate('turns', group_by='winner')}")
+        store.close()
@@ -0,0 +1,299 @@
+"""
+Live spectator feed through a memory-mapped file.
+
+The feed file has a small header and a fixed number of slots. Each slot
+holds the compact state of one running game: seed, turn, mover, status,
+both positions and cash, and the owner of every tile. A
+SpectatorPublisher is a Game observer that rewrites its game's slot once
+per turn. SpectatorFeed reads slots from any process.
+
+Slots use a seqlock. The writer bumps the slot's sequence number to an
+odd value, writes the record, then bumps it to the next even value. A
+reader reads the sequence, then the record, then the sequence again. It
+retries if the sequence was odd or changed. The writer never waits for
+readers, and readers never lock anything.
+"""
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"UMDS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")        # magic, version, board size, slots, slot size
+SEQUENCE = struct.Struct("<Q")
+RECORD = struct.Struct("<qIbbhhqq")      # seed, turn, mover, status, position 0/1, cash 0/1
+
+EMPTY, RUNNING, FINISHED = 0, 1, 2
+UNOWNED = 0  # tile owner codes: 0 nobody, 1 seat 0, 2 seat 1, 255 not a property
+NOT_PROPERTY = 255
+
+
+def _slot_size(board_size):
+    """Bytes per slot, rounded up to 8 so sequence numbers stay aligned."""
+    size = SEQUENCE.size + RECORD.size + board_size
+    return (size + 7) // 8 * 8
+
+
+def create_feed(path, slots, board_size=40):
+    """
+    Create (or truncate) a feed file.
+
+    Args:
+        path(str): file to create.
+        slots(int): number of game slots.
+        board_size(int): tiles per board.
+    """
+    slot_size = _slot_size(board_size)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, board_size, slots, slot_size))
+        file.truncate(HEADER.size + slots * slot_size)
+
+
+class _FeedFile:
+    """Shared mapping and layout for publishers and readers."""
+
+    def __init__(self, path, writable):
+        self.path = path
+        with open(path, "r+b" if writable else "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0,
+                                 access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, self.board_size, self.slots, self.slot_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} spectator feed")
+        self.view = memoryview(self.map)
+
+    def offset(self, slot):
+        """Byte offset of a slot."""
+        if not 0 <= slot < self.slots:
+            raise IndexError(f"slot {slot} out of range 0-{self.slots - 1}")
+        return HEADER.size + slot * self.slot_size
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+
+class SpectatorPublisher(_FeedFile):
+    """
+    Game observer that publishes games into a range of feed slots.
+
+    A game takes the first free slot in the range when it starts and marks
+    it finished when it ends (Game fires on_game_end from the turn() that
+    ends it, however the game is driven). The slot is reused by the next
+    game.
+    Publishers in different processes should be given separate slot ranges.
+    Games on a board of another size than the feed's run unpublished and
+    are counted in `skipped`.
+    """
+
+    def __init__(self, path, first_slot=0, slot_count=None):
+        """
+        Args:
+            path(str): feed file made by create_feed().
+            first_slot(int): first slot this publisher may use.
+            slot_count(int): slots it may use (defaults to the rest).
+        """
+        super().__init__(path, writable=True)
+        last = self.slots if slot_count is None else first_slot + slot_count
+        self.free = list(range(last - 1, first_slot - 1, -1))
+        # game -> (slot, tile -> property list). Keyed on the game itself, not
+        # id(game), so a later game can never pick up a stale assignment
+        self.assigned = {}
+        self.skipped = 0     # games on a board of another size than the feed's
+
+    def __repr__(self):
+        """Detailed representation."""
+        return (f"SpectatorPublisher(path='{self.path}', running={len(self.assigned)}, "
+                f"free={len(self.free)}, skipped={self.skipped})")
+
+    def _publish(self, game, slot, tile_properties, status):
+        """Write one record under the slot's seqlock."""
+        base = self.offset(slot)
+        view = self.view
+        sequence = SEQUENCE.unpack_from(view, base)[0] | 1
+        SEQUENCE.pack_into(view, base, sequence)      # odd: write in progress
+
+        player, cpu = game.player, game.cpu
+        RECORD.pack_into(view, base + SEQUENCE.size, game.rng.seed if game.rng.seed is not None else -1,
+                         game.turn_count, 0 if game.current_player == "player" else 1, status,
+                         player.position, cpu.position, player.cash, cpu.cash)
+        owners = {player: 1, cpu: 2}
+        start = base + SEQUENCE.size + RECORD.size
+        view[start:start + self.board_size] = bytes([
+            NOT_PROPERTY if prop is None else owners.get(prop.owner, UNOWNED)
+            for prop in tile_properties])
+
+        SEQUENCE.pack_into(view, base, sequence + 1)  # even: record complete
+
+    # Game observer hooks
+
+    def on_game_start(self, game):
+        if len(game.board.tiles) != self.board_size:
+            # Slots hold exactly board_size tile owners; the game runs unpublished
+            self.skipped += 1
+            return
+        if not self.free:
+            return  # no slot left; the game runs unpublished
+        slot = self.free.pop()
+        tile_properties = [game.get_property_from_symbol(symbol) for symbol in game.board.tiles]
+        tile_properties = [None if prop is None or prop.group not in prop.groups else prop
+                           for prop in tile_properties]
+        self.assigned[game] = (slot, tile_properties)
+        self._publish(game, slot, tile_properties, RUNNING)
+
+    def on_turn(self, game):
+        entry = self.assigned.get(game)
+        if entry is not None:
+            self._publish(game, entry[0], entry[1], RUNNING)
+
+    def on_game_end(self, game):
+        entry = self.assigned.pop(game, None)
+        if entry is not None:
+            self._publish(game, entry[0], entry[1], FINISHED)
+            self.free.append(entry[0])
+
+
+class SpectatorFeed(_FeedFile):
+    """
+    Lock-free reader for a feed file, usable from any process.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, writable=False)
+        self.retries = 0
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"SpectatorFeed(path='{self.path}', slots={self.slots})"
+
+    def version(self, slot):
+        """The slot's sequence number (even when stable)."""
+        return SEQUENCE.unpack_from(self.view, self.offset(slot))[0]
+
+    def read(self, slot, tiles=True, max_retries=1000):
+        """
+        Consistent copy of one slot.
+
+        Args:
+            slot(int): slot to read.
+            tiles(bool): include the per-tile owners.
+            max_retries(int): give up after this many torn reads. The
+                reader yields its time slice after each one, so a writer
+                preempted mid-record can finish.
+
+        Returns:
+            dict or None: seed, turn, mover, status, positions, cash, and
+                tile owners as bytes; None for a slot never written.
+
+        Raises:
+            RuntimeError: if the writer kept the slot busy for every retry.
+        """
+        base = self.offset(slot)
+        view = self.view
+        for _ in range(max_retries):
+            before = SEQUENCE.unpack_from(view, base)[0]
+            if before & 1:
+                self.retries += 1
+                time.sleep(0)
+                continue
+            seed, turn, mover, status, pos_0, pos_1, cash_0, cash_1 = RECORD.unpack_from(
+                view, base + SEQUENCE.size)
+            owners = None
+            if tiles:
+                start = base + SEQUENCE.size + RECORD.size
+                owners = bytes(view[start:start + self.board_size])
+            if SEQUENCE.unpack_from(view, base)[0] == before:
+                if status == EMPTY:
+                    return None
+                return {"seed": seed, "turn": turn, "mover": mover, "status": status,
+                        "positions": (pos_0, pos_1), "cash": (cash_0, cash_1), "owners": owners}
+            self.retries += 1
+            time.sleep(0)
+        raise RuntimeError(f"slot {slot} stayed busy for {max_retries} reads")
+
+    def tile_owners(self, slot):
+        """
+        Zero-copy view of a slot's tile owners. Check version() before and
+        after use when a consistent read matters.
+        """
+        start = self.offset(slot) + SEQUENCE.size + RECORD.size
+        return self.view[start:start + self.board_size]
+
+    def poll(self, since=None, tiles=False):
+        """
+        Read every slot that changed since the last poll. A slot the writer
+        is busy with is skipped and picked up by the next poll.
+
+        Args:
+            since(dict): slot -> version from the previous poll (updated in place).
+            tiles(bool): include tile owners.
+
+        Returns:
+            dict: slot -> record for changed, non-empty slots.
+        """
+        since = {} if since is None else since
+        changed = {}
+        for slot in range(self.slots):
+            version = self.version(slot)
+            if version and since.get(slot) != version:
+                try:
+                    record = self.read(slot, tiles, max_retries=4)
+                except RuntimeError:
+                    continue
+                since[slot] = version
+                if record is not None:
+                    changed[slot] = record
+        return changed
+
+
+def _publish_games(path, first_slot, slot_count, seeds):
+    """Writer process for the demo: play games with a publisher attached."""
+    from game import Game
+
+    publisher = SpectatorPublisher(path, first_slot, slot_count)
+    games = [Game("cpu_vs_cpu", seed=seed, verbose=False, observers=(publisher,)) for seed in seeds]
+    live = list(games)
+    while live:
+        live = [game for game in live if game.turn()]
+    publisher.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from multiprocessing import Process
+    from game import Game
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "feed.bin")
+        create_feed(path, 2000)
+
+        # Writer overhead inside the turn loop
+        publisher = SpectatorPublisher(path, 1000, 1000)
+        for observers, label in (((), "plain"), ((publisher,), "publishing")):
+            start = time.perf_counter()
+            turns = 0
+            for seed in range(300):
+                game = Game("cpu_vs_cpu", seed=seed, verbose=False, observers=observers)
+                game.play()
+                turns += game.turn_count
+            print(f"{label:10}: {(time.perf_counter() - start) / turns * 1e6:.1f} us per turn")
+        publisher.close()
+
+        # 1000 interleaved games in another process while this one polls
+        writer = Process(target=_publish_games, args=(path, 0, 1000, range(1000)))
+        writer.start()
+        feed = SpectatorFeed(path)
+        versions = {}
+        polls = reads = 0
+        start = time.perf_counter()
+        while writer.is_alive():
+            reads += len(feed.poll(versions, tiles=True))
+            polls += 1
+        elapsed = time.perf_counter() - start
+        writer.join()
+        print(f"reader: {polls} polls of {feed.slots} slots in {elapsed:.1f}s "
+              f"({polls * feed.slots / elapsed:,.0f} slot checks/s), {reads} changed records read, "
+              f"{feed.retries} torn reads retried")
+        print(f"slot 0 at the end: {feed.read(0)}")
+        feed.close()
@@ -0,0 +1,72 @@
+"""
+Benchmark for game setup.
+
+Game() copies its properties from a per-process template
+(UMDProperty.new_board) instead of rebuilding them and their rent tables,
+shares one set of kernel rule tables (kernel.rules_for) between games on
+the same board, and makes histories and the board's ASCII layout only
+when first used. This measures how many games can be created per second in a warm
+process, and how long a fresh interpreter takes to import the game and
+create its first one.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+from game import Game
+from UMD_property import UMDProperty
+
+FIRST_GAME = "from game import Game; Game('cpu_vs_cpu', seed=0, verbose=False)"
+
+
+def games_per_second(count=5000, board=None):
+    """
+    Create headless games back to back.
+
+    Returns:
+        tuple: (games per second copying the template, games per second
+            when every Game() builds its properties from scratch as before).
+    """
+    def rate():
+        Game("cpu_vs_cpu", seed=0, verbose=False, board=board)
+        start = time.perf_counter()
+        for seed in range(count):
+            Game("cpu_vs_cpu", seed=seed, verbose=False, board=board)
+        return count / (time.perf_counter() - start)
+
+    templated = rate()
+    # Rebuilding every property is what each Game() used to do
+    copying = UMDProperty.__dict__["new_board"]
+    UMDProperty.new_board = UMDProperty.__dict__["create_UMD_board"]
+    try:
+        from_scratch = rate()
+    finally:
+        UMDProperty.new_board = copying
+    return templated, from_scratch
+
+
+def cold_start(code=FIRST_GAME, runs=15):
+    """
+    Median wall time of a fresh interpreter running `code`.
+
+    Returns:
+        tuple: (milliseconds for `code`, milliseconds for an empty interpreter).
+    """
+    def median(source):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", source], check=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    return median(code), median("pass")
+
+
+if __name__ == "__main__":
+    templated, from_scratch = games_per_second()
+    print(f"games created: {templated:,.0f}/s from the template, "
+          f"{from_scratch:,.0f}/s rebuilding the properties")
+    first, bare = cold_start()
+    print(f"cold start to the first game: {first:.0f} ms ({bare:.0f} ms of it is the bare interpreter)")
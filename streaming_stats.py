@@ -0,0 +1,325 @@
+"""
+Streaming distribution statistics over many simulated games.
+
+GameStats is a Game observer that folds every game into fixed-bin
+histograms:
+
+- each seat's cash at the end of every turn, one histogram per turn
+- the turn on which the first monopoly appeared
+- rent collected per property group per game, for the groups of the
+  board each game is played on (a group first seen on a grown or custom
+  board gets its histogram then)
+
+The histograms hold integer counts over fixed bin edges, so memory does
+not grow with the number of games. Two collectors with the same settings
+merge exactly, so workers in a process pool can each keep their own and
+the parent adds them up.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from UMD_property import UMDProperty
+
+
+class FixedHistogram:
+    """
+    Counts over `bins` equal-width bins between `low` and `high`, with
+    values outside the range counted in the first or last bin.
+
+    Quantiles are interpolated inside a bin, so they are accurate to one
+    bin width; the exact minimum and maximum are kept as well.
+    """
+
+    def __init__(self, low, high, bins):
+        """
+        Args:
+            low(float): lower edge of the first bin.
+            high(float): upper edge of the last bin.
+            bins(int): number of bins.
+        """
+        if high <= low or bins < 1:
+            raise ValueError(f"Bad histogram range: {low}..{high} in {bins} bins")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.width = (high - low) / bins
+        self.counts = array("q", bytes(8 * bins))
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"FixedHistogram(low={self.low}, high={self.high}, bins={self.bins}, count={self.count})"
+
+    def __eq__(self, other):
+        return (isinstance(other, FixedHistogram) and self.layout() == other.layout()
+                and self.counts == other.counts and self.total == other.total
+                and self.minimum == other.minimum and self.maximum == other.maximum)
+
+    def layout(self):
+        """(low, high, bins): histograms merge only with the same layout."""
+        return self.low, self.high, self.bins
+
+    def add(self, value):
+        """Count one value."""
+        index = int((value - self.low) // self.width)
+        if index < 0:
+            index = 0
+        elif index >= self.bins:
+            index = self.bins - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """
+        Add another histogram's counts to this one.
+
+        Raises:
+            ValueError: if the layouts differ.
+        """
+        if other.layout() != self.layout():
+            raise ValueError(f"Cannot merge {other!r} into {self!r}")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        return self
+
+    def mean(self):
+        """Exact mean of the values added, or None when empty."""
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile (0 <= q <= 1), or None when empty.
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.minimum
+        if q >= 1:
+            return self.maximum
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= target and count:
+                value = self.low + self.width * (index + (target - seen) / count)
+                return min(max(value, self.minimum), self.maximum)
+            seen += count
+        return self.maximum
+
+
+class GameStats:
+    """
+    Game observer that keeps per-turn cash, first-monopoly and rent-per-group
+    distributions for every game it sees.
+    """
+
+    def __init__(self, max_turns=150, cash_range=(-1000, 10000), cash_bins=220,
+                 rent_range=(0, 20000), rent_bins=200):
+        """
+        Args:
+            max_turns(int): turns tracked (Game.max_turns).
+            cash_range(tuple): (low, high) for the cash histograms.
+            cash_bins(int): bins per cash histogram.
+            rent_range(tuple): (low, high) for rent collected per group per game.
+            rent_bins(int): bins per rent histogram.
+        """
+        self.max_turns = max_turns
+        self.games = 0
+        self.no_monopoly = 0
+        self.cash_by_turn = [FixedHistogram(*cash_range, cash_bins) for _ in range(max_turns)]
+        self.first_monopoly = FixedHistogram(0, max_turns, max_turns)
+        self.rent_range = rent_range
+        self.rent_bins = rent_bins
+        self.rent_by_group = {group: FixedHistogram(*rent_range, rent_bins)
+                              for group in UMDProperty.PROPERTY_GROUPS}
+        self._game_rent = {}
+        self._monopoly_turn = None
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"GameStats(games={self.games}, max_turns={self.max_turns})"
+
+    # Game observer hooks
+
+    def _rent_histogram(self, group):
+        """The group's rent histogram, made on first use."""
+        histogram = self.rent_by_group.get(group)
+        if histogram is None:
+            histogram = self.rent_by_group[group] = FixedHistogram(*self.rent_range, self.rent_bins)
+        return histogram
+
+    def on_game_start(self, game):
+        # Every group of this game's board, so unrented groups count as 0
+        self._game_rent = dict.fromkeys(game.rules.group_names, 0)
+        self._monopoly_turn = None
+
+    def on_turn(self, game):
+        turn = game.turn_count - 1
+        if turn < self.max_turns:
+            histogram = self.cash_by_turn[turn]
+            histogram.add(game.player.cash)
+            histogram.add(game.cpu.cash)
+        if self._monopoly_turn is None and (game.player.monopolies or game.cpu.monopolies):
+            self._monopoly_turn = game.turn_count
+
+    def on_rent(self, game, owner, prop, amount):
+        if prop.group in self._game_rent:
+            self._game_rent[prop.group] += amount
+
+    def on_game_end(self, game):
+        self.games += 1
+        if self._monopoly_turn is None:
+            self.no_monopoly += 1
+        else:
+            self.first_monopoly.add(self._monopoly_turn)
+        for group, rent in self._game_rent.items():
+            self._rent_histogram(group).add(rent)
+
+    # Combining and reporting
+
+    def merge(self, other):
+        """
+        Add another collector's games to this one (exact). Groups only the
+        other collector has seen are added.
+
+        Returns:
+            GameStats: self.
+
+        Raises:
+            ValueError: if the turn limits or histogram layouts differ.
+        """
+        if (other.max_turns != self.max_turns
+                or (other.rent_range, other.rent_bins) != (self.rent_range, self.rent_bins)):
+            raise ValueError(f"Cannot merge {other!r} into {self!r}")
+        self.games += other.games
+        self.no_monopoly += other.no_monopoly
+        for mine, theirs in zip(self.cash_by_turn, other.cash_by_turn):
+            mine.merge(theirs)
+        self.first_monopoly.merge(other.first_monopoly)
+        for group, histogram in other.rent_by_group.items():
+            self._rent_histogram(group).merge(histogram)
+        return self
+
+    def cash_percentiles(self, quantiles=(0.1, 0.5, 0.9)):
+        """
+        Cash quantiles at the end of each turn that some game reached.
+
+        Returns:
+            list: (turn, games still running, [quantile values]) tuples.
+        """
+        rows = []
+        for turn, histogram in enumerate(self.cash_by_turn, start=1):
+            if histogram.count:
+                rows.append((turn, histogram.count // 2,
+                             [histogram.quantile(q) for q in quantiles]))
+        return rows
+
+    def report(self, quantiles=(0.1, 0.5, 0.9)):
+        """
+        Summary of every distribution.
+
+        Returns:
+            dict: games, cash percentiles by turn, first monopoly turn
+                quantiles and the share of games without one, and per group
+                mean and quantiles of rent collected per game.
+        """
+        return {
+            "games": self.games,
+            "cash_by_turn": self.cash_percentiles(quantiles),
+            "first_monopoly": {
+                "quantiles": [self.first_monopoly.quantile(q) for q in quantiles],
+                "never": self.no_monopoly / self.games if self.games else 0.0,
+            },
+            "rent_by_group": {
+                group: {"mean": histogram.mean(),
+                        "quantiles": [histogram.quantile(q) for q in quantiles]}
+                for group, histogram in self.rent_by_group.items()
+            },
+        }
+
+
+def collect(seeds, stats_options=None, **game_options):
+    """
+    Play seeded headless games into one GameStats.
+
+    Args:
+        seeds: iterable of seeds.
+        stats_options(dict): keyword arguments for GameStats.
+        **game_options: extra keyword arguments for Game.
+
+    Returns:
+        GameStats
+    """
+    from game import Game
+
+    stats = GameStats(**(stats_options or {}))
+    for seed in seeds:
+        Game("cpu_vs_cpu", "CPU 1", "CPU 2", seed=seed, verbose=False,
+             observers=(stats,), **game_options).play()
+    return stats
+
+
+def _collect_chunk(seeds, stats_options, game_options):
+    """Worker entry point."""
+    return collect(seeds, stats_options, **game_options)
+
+
+def collect_parallel(seeds, workers=4, chunk_size=500, stats_options=None, **game_options):
+    """
+    collect() spread over worker processes, merging their collectors.
+
+    Returns:
+        GameStats
+    """
+    seeds = list(seeds)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    stats = GameStats(**(stats_options or {}))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_collect_chunk, chunks, [stats_options] * len(chunks),
+                                [game_options] * len(chunks)):
+            stats.merge(partial)
+    return stats
+
+
+if __name__ == "__main__":
+    import pickle
+    import time
+
+    start = time.perf_counter()
+    serial = collect(range(2000))
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    parallel = collect_parallel(range(2000), workers=4)
+    parallel_time = time.perf_counter() - start
+
+    exact = (serial.games == parallel.games
+             and serial.cash_by_turn == parallel.cash_by_turn
+             and serial.first_monopoly == parallel.first_monopoly
+             and serial.rent_by_group == parallel.rent_by_group)
+    print(f"{serial.games} games: serial {serial_time:.2f}s, 4 workers {parallel_time:.2f}s, "
+          f"merged result identical: {exact}")
+    print(f"collector size: {len(pickle.dumps(serial)) / 1024:.0f} KiB (fixed, whatever the game count)")
+
+    report = serial.report()
+    print("\nturn  games   cash p10   p50    p90")
+    for turn, games, (p10, p50, p90) in report["cash_by_turn"][::10]:
+        print(f"{turn:4} {games:6} {p10:9.0f} {p50:6.0f} {p90:6.0f}")
+    low, median, high = report["first_monopoly"]["quantiles"]
+    print(f"\nfirst monopoly turn p10/p50/p90: {low:.0f}/{median:.0f}/{high:.0f} "
+          f"(none in {report['first_monopoly']['never']:.1%} of games)")
+    for group, rent in report["rent_by_group"].items():
+        print(f"{group:15} rent per game mean {rent['mean']:7.0f}, "
+              f"p50 {rent['quantiles'][1]:6.0f}, p90 {rent['quantiles'][2]:6.0f}")
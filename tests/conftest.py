@@ -0,0 +1,41 @@
+"""
+Shared pytest setup. The game modules live flat in the repository root,
+so the root is put on the import path.
+"""
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", help="also run tests marked slow")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running check, run with --runslow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip = pytest.mark.skip(reason="slow; run with --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def restore_groups():
+    """Undo update_group_config() changes: the groups and the config version."""
+    from UMD_property import UMDProperty
+
+    saved = copy.deepcopy(UMDProperty.PROPERTY_GROUPS)
+    version = UMDProperty.rent_config_version
+    yield
+    UMDProperty.PROPERTY_GROUPS.clear()
+    UMDProperty.PROPERTY_GROUPS.update(saved)
+    UMDProperty.rent_config_version = version
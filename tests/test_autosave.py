@@ -0,0 +1,88 @@
+import pytest
+
+import autosave
+from autosave import AutoSaver, resume
+from decision_engine import CPUPolicy
+from game import Game
+
+POLICIES = (CPUPolicy("cautious", build_reserve=600), CPUPolicy("risky", buy_risky=True, build_reserve=0))
+
+
+def test_resumed_game_plays_on_like_the_saved_one(tmp_path):
+    saver = AutoSaver(every_turns=10, directory=str(tmp_path))
+    game = Game("cpu_vs_cpu", p1="Ann", p2="Bo", seed=4, verbose=False, policies=POLICIES,
+                observers=(saver,))
+    for _ in range(20):
+        game.turn()
+    saver.flush()
+
+    restored = resume(str(tmp_path), mode="cpu_vs_cpu", verbose=False)
+    assert restored.to_state() == game.to_state()
+    assert (restored.player.name, restored.cpu.name) == ("Ann", "Bo")
+    assert [p.policy.params() for p in restored.seats] == [p.params() for p in POLICIES]
+    game.play()
+    restored.play()
+    saver.close()
+    assert restored.to_state() == game.to_state()
+    assert restored.summary() == game.summary()
+
+
+def test_writer_recovers_from_unexpected_errors(tmp_path, monkeypatch):
+    saver = AutoSaver(directory=str(tmp_path))
+
+    def broken(path, text):
+        raise TypeError("not a disk error")
+    monkeypatch.setattr(autosave, "write_atomic", broken)
+    saver.submit({"turns_played": 1})
+    with pytest.raises(TypeError):
+        saver.flush()
+    assert not saver._running
+
+    monkeypatch.undo()
+    saver.submit({"turns_played": 2})
+    saver.close()
+    assert saver.saves == 1
+
+
+def test_resume_refuses_a_save_from_another_board(tmp_path):
+    import board_spec
+    from board_spec import compile_spec
+
+    saver = AutoSaver(directory=str(tmp_path))
+    game = Game("cpu_vs_cpu", seed=1, verbose=False, board=compile_spec(board_spec.make_campus_spec(21)),
+                observers=(saver,))
+    game.turn()
+    saver.submit(game.snapshot())
+    saver.close()
+    with pytest.raises(ValueError):
+        resume(str(tmp_path), mode="cpu_vs_cpu", verbose=False)
+
+
+def test_resume_restores_the_summary(tmp_path):
+    from adjudicator import Adjudicator
+
+    resumed = 0
+    for seed in range(12):
+        directory = tmp_path / str(seed)
+        saver = AutoSaver(directory=str(directory))
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False, policies=POLICIES, observers=(saver,),
+                    adjudicator=Adjudicator(ratio=1.5, hold_turns=3, min_turn=6))
+        summary = game.play()
+        saver.close()
+        restored = resume(str(directory), mode="cpu_vs_cpu", verbose=False)
+        assert restored.summary() == summary
+        resumed += summary["adjudicated"]
+    assert resumed  # adjudicated games were among them
+
+
+def test_resume_keeps_the_endurance_log_bounded(tmp_path):
+    saver = AutoSaver(every_turns=5, directory=str(tmp_path))
+    game = Game("cpu_vs_cpu", seed=3, verbose=False, endurance=True, max_turns=400, observers=(saver,))
+    for _ in range(20):
+        game.turn()
+    saver.flush()
+    restored = resume(str(tmp_path), mode="cpu_vs_cpu", verbose=False)
+    saver.close()
+    assert restored.endurance and restored.max_turns == 400
+    assert restored.event_log.maxlen == Game.EVENT_LOG_LIMIT
+    assert list(restored.event_log) == list(game.event_log)
@@ -0,0 +1,113 @@
+import copy
+import os
+
+import pytest
+
+import board_spec
+from board_spec import compile_spec, load_board, load_spec
+from game import Game
+from kernel import KernelRules
+from UMD_player import Player
+from UMD_property import UMDProperty
+
+
+@pytest.fixture
+def quad_board():
+    """The campus with North Campus renamed to a two-property "Quad" group."""
+    spec = copy.deepcopy(load_spec())
+    group = spec["groups"].pop("North Campus")
+    group.update(base_rent=33, house_cost=70, full_set_count=2,
+                 house_rents=[90, 180, 270, 360, 450])
+    spec["groups"]["Quad"] = group
+    return compile_spec(spec)
+
+
+def test_custom_groups_reach_properties(quad_board):
+    game = Game("cpu_vs_cpu", seed=0, verbose=False, board=quad_board)
+    cambridge = game.board.prop_mapping["C"][0]
+    assert cambridge.group == "Quad"
+    assert cambridge.base_rent == 33
+    assert cambridge.calculate_value() == quad_board["costs"]["C"]
+    assert cambridge._get_house_cost() == 70
+    assert cambridge.rent_table[UMDProperty.rent_index(0, 0, False, False)] == 33
+    assert cambridge.rent_table[UMDProperty.rent_index(2, 0, True, False)] == 180
+    assert "Quad" not in UMDProperty.PROPERTY_GROUPS
+
+
+def test_custom_groups_reach_players(quad_board):
+    game = Game("cpu_vs_cpu", seed=0, verbose=False, board=quad_board)
+    player = game.player
+    player.receive_property(game.board.prop_mapping["C"][0])
+    assert not player.has_monopoly("Quad")
+    player.receive_property(game.board.prop_mapping["C2"][0])
+    assert player.has_monopoly("Quad")
+    assert "Quad" in game.buildings.group_properties
+
+
+def test_kernel_rules_use_board_groups(quad_board):
+    rules = KernelRules(quad_board)
+    index = rules.index["C"]
+    assert rules.rent[index][0] == 33
+    assert rules.group_size[index] == 2
+
+
+def test_default_board_follows_runtime_groups():
+    board = board_spec.get_board()
+    assert UMDProperty.board_groups(board) is UMDProperty.PROPERTY_GROUPS
+
+
+def test_cache_round_trip(tmp_path):
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_bytes(open(board_spec.DEFAULT_SPEC_PATH, "rb").read())
+    compiled = load_board(str(spec_path))
+    assert (tmp_path / "spec.bin").exists()
+    assert load_board(str(spec_path)) == compiled
+
+
+def test_failed_cache_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    def fail(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    board_spec._write_cache(str(tmp_path / "board.bin"), b"\0" * 32, {"tiles": ()})
+    assert os.listdir(tmp_path) == []
+
+
+def test_campus_laps_get_their_own_groups():
+    spec = board_spec.make_campus_spec(21)
+    board = compile_spec(spec)
+    assert board["board_size"] == 80
+    base = load_spec()["tiles"]
+    assert board["tiles"][:40] == tuple(base)
+    assert board["tiles"][40 + base.index("C")] == "Cb"
+    assert "Cb" in board["groups"]["North Campus 2"]["properties"]
+    assert "North Campus 3" not in board["groups"]
+
+    rules = KernelRules(board)
+    assert rules.group_of[rules.index["Cb"]] != rules.group_of[rules.index["C"]]
+    game = Game("cpu_vs_cpu", seed=2, verbose=False, board=board)
+    game.play()
+    assert game.board.prop_mapping["Cb"][0].group == "North Campus 2"
+
+
+def test_player_move_defaults_to_the_shared_board():
+    board = board_spec.get_board()
+    player = Player("Solo", verbose=False)
+    player.move(board["board_size"] - 1)
+    assert (player.position, player.cash) == (board["board_size"] - 1, 1500)
+    player.move(3)
+    assert (player.position, player.cash) == (2, 1500 + board["go_salary"])
+    player.move(80, board_size=80, go_salary=0)
+    assert player.position == 2
+
+
+def test_property_templates_are_bounded():
+    spec = load_spec()
+    boards = [compile_spec(spec) for _ in range(UMDProperty.TEMPLATE_CACHE_SIZE + 5)]
+    for board in boards:
+        UMDProperty.new_board(board)
+    assert len(UMDProperty._templates) <= UMDProperty.TEMPLATE_CACHE_SIZE
+    assert id(boards[-1]) in UMDProperty._templates
+    # A dropped template is simply built again
+    assert ([prop.code for prop in UMDProperty.new_board(boards[0])]
+            == [prop.code for prop in UMDProperty.create_UMD_board(boards[0])])
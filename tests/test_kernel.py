@@ -0,0 +1,358 @@
+import pytest
+
+import kernel
+from decision_engine import CPUPolicy
+from game import Game
+from UMD_player import Player
+from kernel import (BUY, CASH_0, HOTEL_LEVEL, JAIL_0, MOVER, NONE, PENDING, POSITION_0, PROPERTIES,
+                    RUNNING, SKIP, STATUS, default_rules, next_state, pack, unpack)
+
+CAUTIOUS = CPUPolicy("cautious", build_reserve=600)
+RISKY = CPUPolicy("risky", buy_risky=True, build_reserve=0)
+
+
+def with_properties(state, props):
+    return state[:PROPERTIES] + (bytes(props),)
+
+
+def with_cash(state, cash_0, cash_1):
+    return state[:CASH_0] + (cash_0, cash_1) + state[JAIL_0:]
+
+
+def assert_views_match(game):
+    """Every Player and UMDProperty attribute agrees with the game's state."""
+    state = game.to_state()
+    assert (game.player.position, game.cpu.position) == state[POSITION_0:CASH_0]
+    assert (game.player.cash, game.cpu.cash) == state[CASH_0:JAIL_0]
+    for prop, byte in zip(game.kernel_properties, state[PROPERTIES]):
+        assert prop.owner is (None, game.player, game.cpu)[byte & 3]
+        assert prop.improvement_level() == byte >> 3
+        assert prop.mortgaged == bool(byte & 4)
+    for player in game.seats:
+        assert sorted(p.code for p in player.properties) == sorted(
+            code for code, byte in zip(game.rules.codes, state[PROPERTIES])
+            if byte & 3 == game.seats.index(player) + 1)
+        assert (player.asset_value, player.mortgageable_value) == player.recompute_totals()
+
+
+@pytest.mark.parametrize("policies", [None, (CAUTIOUS, RISKY), (RISKY, RISKY)])
+def test_game_and_kernel_end_in_the_same_state(policies):
+    for seed in range(40):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False, policies=policies)
+        game.play()
+        final, _ = kernel.play(seed, policies)
+        assert game.to_state() == final, seed
+        assert game.to_state()[STATUS] != RUNNING
+        assert_views_match(game)
+
+
+def test_games_use_trades_buildings_and_mortgages():
+    seen = set()
+    for seed in range(60):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False, policies=(RISKY, RISKY))
+        reported = game._report
+        game._report = lambda event: (seen.add(event[0]), reported(event))
+        game.play()
+    assert {"trade", "build", "rent", "buy"} <= seen
+
+
+def test_running_totals_follow_every_change(monkeypatch):
+    # Every total update is checked against a full recount
+    monkeypatch.setattr(Player, "debug_totals", True)
+    for seed in range(10):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False, policies=(RISKY, RISKY))
+        game.play()
+        assert_views_match(game)
+
+
+def test_load_state_syncs_views():
+    final, _ = kernel.play(3)
+    game = Game("cpu_vs_cpu", seed=99, verbose=False)
+    game.load_state(final)
+    assert_views_match(game)
+    game.load_state(default_rules().initial_state())
+    assert_views_match(game)
+
+
+def test_pack_round_trip():
+    final, _ = kernel.play(5)
+    assert unpack(pack(final)) == final
+
+
+def test_rent_raises_cash_before_bankruptcy():
+    rules = default_rules()
+    landed = next(p for p in range(len(rules.codes)) if p in rules.tile_kind)
+    tile = rules.tile_kind.index(landed)
+    mine = next(p for p in range(len(rules.codes)) if rules.group_of[p] != rules.group_of[landed])
+    props = bytearray(len(rules.codes))
+    props[landed] = 2
+    props[mine] = 1
+    rent = rules.rent[landed][0] * rules.rent_multiplier
+    cash = rent - rules.cost[mine] // 2 + 1  # short of the rent until `mine` is mortgaged
+    state = rules.initial_state()
+    state = state[:POSITION_0] + ((tile - 1) % rules.board_size, 0) + state[CASH_0:]
+    state = with_properties(with_cash(state, cash, 1500), props)
+
+    trace = []
+    after = next_state(state, (1, 0, 1), SKIP, rules, trace)
+    go = rules.go_salary if tile == 0 else 0
+    if cash + go >= rent:
+        pytest.skip("the default board pays GO on this move")
+    assert [event[0] for event in trace] == ["move", "mortgage", "rent"]
+    assert after[STATUS] == RUNNING
+    assert after[PROPERTIES][mine] == 1 | 4
+    assert after[CASH_0] == cash + rules.cost[mine] // 2 - rent
+
+
+def test_raise_cash_sells_evenly_then_mortgages_cheapest():
+    rules = default_rules()
+    g = next(g for g, members in enumerate(rules.members) if len(members) >= 3)
+    members = rules.members[g]
+    props = bytearray(len(rules.codes))
+    for p in members:
+        props[p] = 1 | (2 << 3)
+    others = [p for p in range(len(rules.codes)) if rules.group_of[p] != g][:2]
+    for p in others:
+        props[p] = 1
+    state = with_properties(with_cash(rules.initial_state(), 0, 1500), props)
+
+    trace = []
+    after = kernel.raise_cash(state, 0, 10 ** 9, rules, trace)
+    kinds = [event[0] for event in trace]
+    assert kinds == ["sell"] * (2 * len(members)) + ["mortgage"] * (len(members) + len(others))
+    # Never more than one level apart inside the group while selling
+    levels = {p: 2 for p in members}
+    for _, _, p in trace[:2 * len(members)]:
+        levels[p] -= 1
+        assert max(levels.values()) - min(levels.values()) <= 1
+    mortgaged = [p for _, _, p in trace[2 * len(members):]]
+    assert [rules.cost[p] for p in mortgaged] == sorted(rules.cost[p] for p in mortgaged)
+    assert all(after[PROPERTIES][p] == 1 | 4 for p in members + tuple(others))
+
+
+def test_build_rules():
+    rules = default_rules()
+    g = next(g for g, members in enumerate(rules.members) if len(members) == rules.full_set[g])
+    first, second = rules.members[g][:2]
+    props = bytearray(len(rules.codes))
+    for p in rules.members[g]:
+        props[p] = 1
+    state = with_properties(rules.initial_state(), props)
+
+    state = kernel.build(state, 0, first, rules)
+    assert state[PROPERTIES][first] >> 3 == 1
+    assert not kernel.can_build(state, 0, first, rules)  # even building
+    assert kernel.can_build(state, 0, second, rules)
+    assert not kernel.can_build(state, 1, second, rules)
+    assert kernel.build(state, 0, first, rules) is state
+    assert not kernel.can_mortgage(state, 0, second, rules)  # the group has a building
+
+    # A hotel after four houses everywhere
+    for p in rules.members[g]:
+        props[p] = 1 | (4 << 3)
+    state = with_properties(rules.initial_state(), props)
+    state = kernel.build(state, 0, first, rules)
+    assert state[PROPERTIES][first] >> 3 == HOTEL_LEVEL
+    assert kernel.buildings_in_use(state[PROPERTIES])[1] == 1
+
+
+def full_group(rules):
+    """A group whose members make a full set, and props with seat 0 holding it."""
+    g = next(g for g, members in enumerate(rules.members) if len(members) == rules.full_set[g])
+    props = bytearray(len(rules.codes))
+    for p in rules.members[g]:
+        props[p] = 1
+    return g, props
+
+
+def test_building_stays_even():
+    rules = default_rules()
+    g, props = full_group(rules)
+    members = rules.members[g]
+    state = with_properties(with_cash(rules.initial_state(), 10 ** 6, 1500), props)
+    for _ in range(len(members) * 2):
+        options = kernel.buildable(state, 0, rules)
+        levels = [state[PROPERTIES][p] >> 3 for p in members]
+        assert sorted(options) == sorted(p for p in members if state[PROPERTIES][p] >> 3 == min(levels))
+        state = kernel.build(state, 0, options[0], rules)
+        levels = [state[PROPERTIES][p] >> 3 for p in members]
+        assert max(levels) - min(levels) <= 1
+    # Selling comes off the highest level first
+    assert all(kernel.can_sell(state, 0, p, rules) == (state[PROPERTIES][p] >> 3 == max(levels))
+               for p in members)
+
+
+def test_bank_shortage_blocks_building():
+    rules = default_rules()
+    g, props = full_group(rules)
+    first = rules.members[g][0]
+    others = [p for p in range(len(rules.codes)) if rules.group_of[p] != g]
+    # Seat 1 holds every house the bank has
+    left = rules.bank_houses
+    for p in others:
+        level = min(4, left)
+        props[p] = 2 | (level << 3)
+        left -= level
+    assert kernel.buildings_in_use(props) == (rules.bank_houses, 0)
+    state = with_properties(with_cash(rules.initial_state(), 10 ** 6, 1500), props)
+    assert not kernel.can_build(state, 0, first, rules)
+    assert kernel.buildable(state, 0, rules) == []
+    assert kernel.cpu_phase(state[:kernel.TURN] + (2,) + state[kernel.TURN + 1:], 0, 0, rules) \
+        [PROPERTIES] == state[PROPERTIES]
+
+    # With four houses everywhere, the hotel needs a hotel in the bank
+    for p in rules.members[g]:
+        props[p] = 1 | (4 << 3)
+    for p in others:
+        props[p] = 2
+    hotels = others[:rules.bank_hotels]
+    assert len(hotels) == rules.bank_hotels
+    for p in hotels:
+        props[p] = 2 | (HOTEL_LEVEL << 3)
+    state = with_properties(with_cash(rules.initial_state(), 10 ** 6, 1500), props)
+    assert not kernel.can_build(state, 0, first, rules)
+    props[hotels[0]] = 2
+    state = with_properties(state, props)
+    assert kernel.can_build(state, 0, first, rules)
+
+
+def test_hotels_trade_houses_with_the_bank():
+    rules = default_rules()
+    g, props = full_group(rules)
+    members = rules.members[g]
+    for p in members:
+        props[p] = 1 | (4 << 3)
+    state = with_properties(with_cash(rules.initial_state(), 10 ** 6, 1500), props)
+    houses = 4 * len(members)
+    assert kernel.buildings_in_use(state[PROPERTIES]) == (houses, 0)
+    state = kernel.build(state, 0, members[0], rules)
+    # The hotel sends its four houses back
+    assert kernel.buildings_in_use(state[PROPERTIES]) == (houses - 4, 1)
+    state = kernel.sell(state, 0, members[0], rules)
+    assert kernel.buildings_in_use(state[PROPERTIES]) == (houses, 0)
+
+    # Breaking a hotel needs four houses in the bank
+    props = bytearray(state[PROPERTIES])
+    props[members[0]] = 1 | (HOTEL_LEVEL << 3)
+    others = [p for p in range(len(rules.codes)) if rules.group_of[p] != g]
+    spare = rules.bank_houses - 4 * (len(members) - 1)
+    for p in others:
+        level = min(4, spare - 3)
+        if level <= 0:
+            break
+        props[p] = 2 | (level << 3)
+        spare -= level
+    state = with_properties(state, props)
+    assert rules.bank_houses - kernel.buildings_in_use(props)[0] == HOTEL_LEVEL - 2
+    assert not kernel.can_sell(state, 0, members[0], rules)
+
+
+def test_counts_follow_the_actions():
+    rules = default_rules()
+    for seed in range(30):
+        final, _ = kernel.play(seed, (RISKY, RISKY))
+        props = bytearray(final[PROPERTIES])
+        cash = [10 ** 6, 10 ** 6]
+        counts = kernel._Counts(props, rules)
+        for seat in (0, 1):
+            kernel._cpu_unmortgage(props, cash, seat, 0, rules, None, counts)
+            kernel._cpu_build(props, cash, seat, 0, rules, None, counts)
+            for p in range(len(rules.codes)):
+                kernel._sell(props, cash, seat, p, rules, None, counts)
+                kernel._mortgage(props, cash, seat, p, rules, None, counts)
+            fresh = kernel._Counts(props, rules)
+            assert [getattr(counts, name) for name in kernel._Counts.__slots__] == \
+                [getattr(fresh, name) for name in kernel._Counts.__slots__]
+
+
+def test_best_offer_finishes_a_group():
+    rules = default_rules()
+    offers = 0
+    for members in rules.members:
+        props = bytearray(len(rules.codes))
+        props[members[0]] = 1
+        for p in members[1:]:
+            props[p] = 2
+        state = with_properties(with_cash(rules.initial_state(), 5000, 1500), props)
+
+        offer, evaluated = kernel.best_offer(state, 0, rules)
+        assert evaluated > 0
+        if offer is None:
+            continue  # no price is good for both sides
+        offers += 1
+        assert offer[2] == members[1:]
+        proposer_gain, receiver_gain = kernel.evaluate_offer(state, offer, rules)
+        assert proposer_gain > 0 and receiver_gain >= 0
+
+        after = kernel.trade(state, offer, rules)
+        assert all(after[PROPERTIES][p] & 3 == 1 for p in members)
+        assert after[CASH_0] == state[CASH_0] - offer[3]
+        # Nothing left to finish, and the same offer is no longer legal
+        assert kernel.best_offer(after, 0, rules)[0] is None
+        assert kernel.trade(after, offer, rules) is after
+    assert offers
+
+
+def test_purchase_decision_step():
+    rules = default_rules()
+    landed = next(p for p in range(len(rules.codes)) if p in rules.tile_kind)
+    tile = rules.tile_kind.index(landed)
+    state = rules.initial_state()
+    state = state[:POSITION_0] + ((tile - 1) % rules.board_size, 0) + state[CASH_0:]
+    pending = next_state(state, (1, 0, 1), SKIP, rules)
+    assert pending[PENDING] == landed and pending[MOVER] == 0
+    bought = next_state(pending, None, BUY, rules)
+    assert bought[PENDING] == NONE and bought[MOVER] == 1
+    assert bought[PROPERTIES][landed] == 1
+
+
+@pytest.mark.parametrize("kind", ["scooter", "card"])
+def test_bank_payments_raise_cash_first(kind):
+    rules = default_rules()
+    if kind == "scooter":
+        tile = rules.tile_kind.index(kernel.SCOOTER, 1)
+        card, fare = 0, 6 * 20
+        roll = (1, card, 6)
+    else:
+        tile = rules.tile_kind.index(kernel.EVENT, 1)
+        card = next(i for i, (effect, amount) in enumerate(rules.card_effects)
+                    if effect == "cash" and amount < 0)
+        fare = -rules.card_effects[card][1]
+        roll = (1, card, 1)
+    mine = 0
+    props = bytearray(len(rules.codes))
+    props[mine] = 1
+    cash = fare - rules.cost[mine] // 2 + 1  # short until `mine` is mortgaged
+    state = rules.initial_state()
+    state = state[:POSITION_0] + ((tile - 1) % rules.board_size, 0) + state[CASH_0:]
+    state = with_properties(with_cash(state, cash, 1500), props)
+
+    trace = []
+    after = next_state(state, roll, SKIP, rules, trace)
+    assert [event[0] for event in trace][1:3] == (["mortgage", "scooter"] if kind == "scooter"
+                                                 else ["card", "mortgage"])
+    assert after[STATUS] == RUNNING
+    assert after[PROPERTIES][mine] == 1 | 4
+    assert after[CASH_0] == cash + rules.cost[mine] // 2 - fare
+
+
+def test_cpu_proposes_trades_on_every_few_turns():
+    rules = default_rules()
+    for members in rules.members:
+        props = bytearray(len(rules.codes))
+        props[members[0]] = 1
+        for p in members[1:]:
+            props[p] = 2
+        state = with_properties(with_cash(rules.initial_state(), 5000, 1500), props)
+        if kernel.best_offer(state, 0, rules)[0] is not None:
+            break
+    else:
+        pytest.fail("no group has a trade to propose")
+
+    proposed = []
+    for turn in range(1, 2 * kernel.TRADE_EVERY + 1, 2):  # seat 0's own turns
+        trace = []
+        kernel.cpu_phase(state[:kernel.TURN] + (turn,) + state[kernel.TURN + 1:], 0, 10 ** 6,
+                         rules, trace=trace)
+        proposed.append(any(event[0] == "trade" for event in trace))
+    assert proposed == [True] + [False] * (kernel.TRADE_EVERY - 1)
@@ -0,0 +1,46 @@
+import tracemalloc
+
+import pytest
+
+from game import Game
+from memprof import soak
+
+
+def test_short_soak_keeps_memory_flat():
+    result = soak(games=60, window=20, max_growth=256)
+    assert len(result["traced"]) == 3
+    assert result["growth_per_game"] <= 256
+
+
+@pytest.mark.slow
+def test_full_soak_keeps_memory_flat():
+    # soak()'s own defaults: 10,000 games in windows of 1,000
+    result = soak()
+    assert len(result["traced"]) == 10
+    assert result["growth_per_game"] <= 64
+
+
+def test_soak_needs_two_windows():
+    with pytest.raises(ValueError):
+        soak(games=5, window=10)
+
+
+def test_soak_reports_growth(monkeypatch):
+    kept = []
+    real_play = Game.play
+
+    def leaky_play(self):
+        kept.append(bytearray(10_000))
+        return real_play(self)
+
+    monkeypatch.setattr(Game, "play", leaky_play)
+    with pytest.raises(RuntimeError):
+        soak(games=4, window=2, max_growth=1000)
+
+
+def test_profiler_stops_the_tracing_it_started():
+    assert not tracemalloc.is_tracing()
+    game = Game("cpu_vs_cpu", seed=1, verbose=False, profile_memory=True)
+    game.play()
+    assert not tracemalloc.is_tracing()
+    assert "game end:" in game.memory_profiler.report()
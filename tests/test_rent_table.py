@@ -0,0 +1,70 @@
+"""
+The precomputed rent tables must agree with calculate_rent, the reference
+implementation, in every state and after group config changes.
+"""
+import random
+
+import pytest
+
+from UMD_property import UMDProperty
+
+
+def compare_every_state(properties, rng):
+    owner = type("Owner", (), {"name": "checker"})()
+    compared = 0
+    for prop in properties:
+        prop.owner = owner
+        for houses in range(5):
+            for hotels in (0, 1):
+                for monopoly in (False, True):
+                    for mortgaged in (False, True):
+                        prop.houses = houses
+                        prop.hotels = hotels
+                        prop.mortgaged = mortgaged
+                        dice_roll = rng.randint(1, 6)
+                        expected = prop.calculate_rent(dice_roll, monopoly)
+                        assert prop.lookup_rent(monopoly, dice_roll) == expected, (
+                            f"{prop.code} houses={houses} hotels={hotels} "
+                            f"monopoly={monopoly} mortgaged={mortgaged}")
+                        compared += 1
+    return compared
+
+
+def test_shipped_config_matches_calculate_rent():
+    assert compare_every_state(UMDProperty.create_UMD_board(), random.Random(0))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_configs_match_calculate_rent(seed, restore_groups):
+    rng = random.Random(seed)
+    properties = UMDProperty.create_UMD_board()
+    for group_name in UMDProperty.PROPERTY_GROUPS:
+        UMDProperty.update_group_config(
+            group_name,
+            base_rent=rng.randint(1, 100),
+            house_rents=sorted(rng.randint(1, 2000) for _ in range(rng.randint(0, 5))))
+    compare_every_state(properties, rng)
+
+
+def test_group_config_reaches_live_properties(restore_groups):
+    properties = UMDProperty.create_UMD_board() + UMDProperty.new_board()
+    prop = next(p for p in properties if p.group in UMDProperty.PROPERTY_GROUPS)
+    owner = type("Owner", (), {"name": "checker"})()
+    prop.owner = owner
+    UMDProperty.update_group_config(prop.group, base_rent=prop.base_rent + 7)
+    expected = UMDProperty.PROPERTY_GROUPS[prop.group]["base_rent"]
+    assert prop.lookup_rent() == expected
+    assert prop.base_rent == expected
+    fresh = next(p for p in UMDProperty.new_board() if p.code == prop.code)
+    assert fresh.base_rent == expected
+    # Rent lookups record nothing; the payer keeps the totals
+    assert prop.calculate_rent() == expected and prop.rent_collected == 0
+
+
+def test_rent_index_matches_table_layout():
+    prop = UMDProperty.create_UMD_board()[0]
+    indexes = {UMDProperty.rent_index(houses, hotels, monopoly, mortgaged)
+               for houses in range(5) for hotels in (0, 1)
+               for monopoly in (False, True) for mortgaged in (False, True)}
+    assert indexes == set(range(40))
+    assert prop.rent_table is None or len(prop.rent_table) == 40
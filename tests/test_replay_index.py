@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+
+import pytest
+
+import board_spec
+from board_spec import compile_spec
+from game import Game
+from replay_index import SAVE_PATTERN, ReplayIndex
+
+
+def write_save(directory, name, game):
+    with open(os.path.join(directory, f"{SAVE_PATTERN}{name}.json"), "w", encoding="utf-8") as file:
+        json.dump(game.snapshot(final=True), file)
+
+
+def holdings(index):
+    return sorted(index.connection.execute("SELECT seat, code, level, mortgaged FROM holdings"))
+
+
+@pytest.fixture
+def campus_board():
+    return compile_spec(board_spec.make_campus_spec(21))
+
+
+def test_saves_decode_with_their_own_board(tmp_path, campus_board):
+    game = Game("cpu_vs_cpu", seed=2, verbose=False, board=campus_board)
+    game.play()
+    write_save(str(tmp_path), "campus", game)
+
+    # Not given the board: read from the players list, never the default codes
+    with ReplayIndex(str(tmp_path / "plain.sqlite")) as index:
+        assert index.scan(str(tmp_path))["indexed"] == 1
+        from_players = holdings(index)
+    with ReplayIndex(str(tmp_path / "boards.sqlite")) as index:
+        assert index.scan(str(tmp_path), boards=(campus_board,))["indexed"] == 1
+        from_state = holdings(index)
+    assert from_players == from_state
+    assert from_state == sorted(
+        (seat, prop.code, prop.improvement_level(), int(prop.mortgaged))
+        for seat, player in enumerate(game.seats) for prop in player.properties)
+
+
+def test_games_filters_by_column_and_operator(tmp_path):
+    for seed in range(6):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False)
+        game.play()
+        write_save(str(tmp_path), seed, game)
+    with ReplayIndex(str(tmp_path / "index.sqlite")) as index:
+        index.scan(str(tmp_path))
+        everything = index.games()
+        assert len(everything) == 6
+        short = index.games(("turns", "<", 60), ("winner_seat", "is not", None))
+        assert short == [row for row in everything
+                         if row["turns"] < 60 and row["winner_seat"] is not None]
+        with pytest.raises(ValueError):
+            index.games(("turns; DROP TABLE games; --", "=", 1))
+        with pytest.raises(ValueError):
+            index.games(("turns", "= 1 OR 1 =", 1))
+        assert index.count() == 6
+
+
+def test_scanners_sharing_an_index_get_their_own_ids(tmp_path):
+    folders = [tmp_path / "a", tmp_path / "b"]
+    for offset, folder in enumerate(folders):
+        folder.mkdir()
+        for seed in range(offset * 20, offset * 20 + 20):
+            game = Game("cpu_vs_cpu", seed=seed, verbose=False)
+            game.play()
+            write_save(str(folder), seed, game)
+    path = str(tmp_path / "index.sqlite")
+    ReplayIndex(path).close()
+    failures = []
+
+    def scan(folder):
+        try:
+            with ReplayIndex(path) as index:
+                index.scan(str(folder), batch_size=1)
+        except Exception as error:
+            failures.append(error)
+
+    threads = [threading.Thread(target=scan, args=(folder,)) for folder in folders]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures
+    with ReplayIndex(path) as index:
+        assert index.count() == 40
+        # Every game's holdings are filed under its own id
+        mismatched = index.connection.execute(
+            "SELECT COUNT(*) FROM games WHERE properties_0 + properties_1 != "
+            "(SELECT COUNT(*) FROM holdings WHERE game = games.id)").fetchone()[0]
+        assert mismatched == 0
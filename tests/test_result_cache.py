@@ -0,0 +1,32 @@
+import result_cache
+from result_cache import ResultCache, config_key, rule_files
+from UMD_property import UMDProperty
+
+
+def test_group_config_changes_the_key(restore_groups):
+    before = config_key()
+    group = next(iter(UMDProperty.PROPERTY_GROUPS))
+    UMDProperty.update_group_config(group, base_rent=UMDProperty.PROPERTY_GROUPS[group]["base_rent"] + 5)
+    assert config_key() != before
+
+
+def test_turn_limit_is_part_of_the_key():
+    assert config_key({"max_turns": 150}) == config_key()
+    assert config_key({"max_turns": 60}) != config_key()
+
+
+def test_rule_files_follow_imports():
+    files = rule_files()
+    for name in ("simulate.py", "game.py", "kernel.py", "buildings.py", "trading.py",
+                 "adjudicator.py", "board_spec.json"):
+        assert name in files
+    # Demo-only imports in __main__ blocks are not rules
+    assert "result_cache.py" not in files and "vec_env.py" not in files
+
+
+def test_cached_seeds_are_not_replayed(tmp_path, monkeypatch):
+    with ResultCache(str(tmp_path / "cache.sqlite")) as cache:
+        first = cache.run_games(range(4))
+        monkeypatch.setattr(result_cache, "play_game", None)  # a replay would fail
+        assert cache.run_games(range(4)) == first
+        assert (cache.hits, cache.misses) == (4, 4)
@@ -0,0 +1,34 @@
+import pytest
+
+import board_spec
+from board_spec import compile_spec
+from results_store import ResultsStore, default_columns, summary_to_row
+from simulate import run_games
+
+
+@pytest.fixture
+def campus_board():
+    return compile_spec(board_spec.make_campus_spec(21))
+
+
+def test_columns_follow_the_simulated_board(tmp_path, campus_board):
+    directory = str(tmp_path / "campus")
+    seeds = range(8)
+    assert run_games(seeds, directory, board=campus_board) == len(seeds)
+    summaries = run_games(seeds, board=campus_board)
+    with ResultsStore(directory) as store:
+        assert ("north_campus_2_0", "b") in store.columns
+        rows = list(store.rows())
+    for summary, row in zip(summaries, rows):
+        for seat in (0, 1):
+            for group, count in summary["properties"][seat].items():
+                assert row[f"{group.lower().replace(' ', '_')}_{seat}"] == count
+
+
+def test_groups_without_a_column_are_not_dropped(campus_board):
+    summaries = run_games(range(40), board=campus_board)
+    lap_groups = [s for s in summaries
+                  if any(group.endswith(" 2") for seat in s["properties"] for group in seat)]
+    assert lap_groups
+    with pytest.raises(ValueError):
+        summary_to_row(lap_groups[0], default_columns())
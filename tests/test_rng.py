@@ -0,0 +1,49 @@
+from rng import GameRNG
+
+
+def dice(rng, count=50):
+    return [rng.roll() for _ in range(count)]
+
+
+def test_same_seed_same_draws():
+    assert dice(GameRNG(7)) == dice(GameRNG(7))
+
+
+def test_block_size_does_not_change_values():
+    assert dice(GameRNG(7, block_size=1), 200) == dice(GameRNG(7, block_size=64), 200)
+
+
+def test_uniform_draws_do_not_shift_dice():
+    plain = GameRNG(3)
+    mixed = GameRNG(3)
+    expected = dice(plain)
+    rolls = []
+    for _ in range(50):
+        mixed.random()
+        rolls.append(mixed.roll())
+    assert rolls == expected
+
+
+def test_other_randint_ranges_do_not_shift_dice():
+    plain = GameRNG(3, block_size=8)
+    mixed = GameRNG(3, block_size=8)
+    expected = dice(plain)
+    rolls = []
+    for _ in range(50):
+        assert 1 <= mixed.randint(1, 100) <= 100
+        rolls.append(mixed.randint(1, 6))
+    assert rolls == expected
+
+
+def test_state_round_trips_through_json_across_block_sizes():
+    import json
+
+    saved = GameRNG(5, block_size=8)
+    for _ in range(13):
+        saved.roll()
+    saved.random()
+    saved.randint(1, 100)
+    restored = GameRNG(0, block_size=64)
+    restored.setstate(json.loads(json.dumps(saved.getstate())))
+    assert dice(restored, 100) == dice(saved, 100)
+    assert (restored.random(), restored.randint(1, 100)) == (saved.random(), saved.randint(1, 100))
@@ -0,0 +1,72 @@
+from board_spec import compile_spec, make_campus_spec
+from game import Game
+from spectator import FINISHED, NOT_PROPERTY, SpectatorFeed, SpectatorPublisher, create_feed
+
+
+def test_finished_game_is_readable(tmp_path):
+    path = str(tmp_path / "feed.bin")
+    create_feed(path, 2)
+    publisher = SpectatorPublisher(path)
+    game = Game("cpu_vs_cpu", seed=3, verbose=False, observers=(publisher,))
+    game.play()
+    feed = SpectatorFeed(path)
+    record = feed.read(0)
+    assert record["status"] == FINISHED and record["seed"] == 3
+    assert record["cash"] == (game.player.cash, game.cpu.cash)
+    assert feed.read(1) is None
+    feed.close()
+    publisher.close()
+
+
+def test_other_board_sizes_are_skipped(tmp_path):
+    path = str(tmp_path / "feed.bin")
+    create_feed(path, 2)
+    publisher = SpectatorPublisher(path)
+    game = Game("cpu_vs_cpu", seed=3, verbose=False, observers=(publisher,),
+                board=compile_spec(make_campus_spec(12)))
+    game.play()
+    assert publisher.skipped == 1 and len(publisher.free) == 2
+    publisher.close()
+
+
+def test_grown_board_properties_are_published(tmp_path):
+    board = compile_spec(make_campus_spec(21))
+    path = str(tmp_path / "feed.bin")
+    create_feed(path, 1, board["board_size"])
+    publisher = SpectatorPublisher(path)
+    Game("cpu_vs_cpu", seed=3, verbose=False, observers=(publisher,), board=board)
+    feed = SpectatorFeed(path)
+    owners = feed.read(0)["owners"]
+    lap_two = board["tiles"].index("Cb")
+    assert owners[lap_two] != NOT_PROPERTY
+    feed.close()
+    publisher.close()
+
+
+def test_games_driven_by_turn_free_their_slot(tmp_path):
+    path = str(tmp_path / "feed.bin")
+    create_feed(path, 1)
+    publisher = SpectatorPublisher(path)
+    feed = SpectatorFeed(path)
+    for seed in range(3):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False, observers=(publisher,))
+        while game.turn():
+            pass
+        assert not publisher.assigned and publisher.free == [0]
+        assert feed.read(0)["status"] == FINISHED
+    feed.close()
+    publisher.close()
+
+
+def test_game_end_is_notified_once():
+    class Counter:
+        ends = 0
+
+        def on_game_end(self, game):
+            self.ends += 1
+
+    counter = Counter()
+    game = Game("cpu_vs_cpu", seed=3, verbose=False, observers=(counter,))
+    game.play()
+    assert not game.turn()
+    assert counter.ends == 1
@@ -0,0 +1,37 @@
+import board_spec
+from board_spec import compile_spec
+from game import Game
+from streaming_stats import GameStats, collect
+
+
+class RentLog:
+    """Observer totalling rent per group, to check GameStats against."""
+
+    def __init__(self):
+        self.rent = {}
+
+    def on_rent(self, game, owner, prop, amount):
+        self.rent[prop.group] = self.rent.get(prop.group, 0) + amount
+
+
+def test_rent_from_grown_board_groups_is_kept():
+    board = compile_spec(board_spec.make_campus_spec(21))
+    stats, log = GameStats(), RentLog()
+    for seed in range(20):
+        Game("cpu_vs_cpu", seed=seed, verbose=False, board=board, observers=(stats, log)).play()
+    lap_groups = [group for group in log.rent if group.endswith(" 2")]
+    assert lap_groups
+    for group, rent in log.rent.items():
+        assert stats.rent_by_group[group].total == rent
+        assert stats.rent_by_group[group].count == 20
+
+
+def test_merge_adds_groups_seen_only_by_the_other_collector():
+    board = compile_spec(board_spec.make_campus_spec(21))
+    plain = collect(range(5))
+    grown = collect(range(5), board=board)
+    merged = collect(range(5)).merge(grown)
+    assert merged.games == 10
+    for group, histogram in grown.rent_by_group.items():
+        expected = histogram.count + (plain.rent_by_group[group].count if group in plain.rent_by_group else 0)
+        assert merged.rent_by_group[group].count == expected
@@ -0,0 +1,64 @@
+import kernel
+from decision_engine import DEFAULT_POLICY
+from kernel import BUY, SKIP
+from rng import GameRNG
+from vec_env import VecEnv
+
+
+def policy_actions(env, obs):
+    """The buy/skip choice DEFAULT_POLICY makes for each pending purchase."""
+    rules = env.rules
+    actions = []
+    for row in obs.tolist():
+        pending = row[4]
+        decision = DEFAULT_POLICY.decide(row[2], rules.cost[pending], rules.codes[pending], "mid")
+        actions.append(BUY if decision["decision"] == "buy" else SKIP)
+    return actions
+
+
+def test_policy_driven_games_match_the_kernel():
+    env = VecEnv(8)
+    obs = env.reset(range(8))
+    finished = {}
+    while len(finished) < 40:
+        obs, rewards, dones, infos = env.step(policy_actions(env, obs))
+        for _, seed, reward, turns in infos:
+            finished[seed] = (reward, turns)
+    for seed, (reward, turns) in finished.items():
+        final, _ = kernel.play(seed)
+        status = final[kernel.STATUS]
+        assert reward == (0.0 if status == kernel.TIE else 1.0 if status == 0 else -1.0), seed
+        assert turns == final[kernel.TURN], seed
+
+
+def test_reset_and_step_shapes():
+    env = VecEnv(4)
+    obs = env.reset([10, 11, 12, 13])
+    assert tuple(obs.shape) == (4, env.obs_size)
+    assert env.next_seed >= 14
+    for row in obs.tolist():
+        assert env.rules.cost[row[4]] == row[5]
+        assert row[2] >= row[5]  # the agent can afford what it is offered
+    episodes = 0
+    for _ in range(100):
+        obs, rewards, dones, infos = env.step([BUY] * 4)
+        assert len(rewards) == len(dones) == 4
+        assert sum(dones) == len(infos)
+        episodes += len(infos)
+        # Finished slots are live again with a pending decision
+        assert all(state[kernel.PENDING] != kernel.NONE for state in env.states)
+    assert episodes == env.episodes > 0
+
+
+def test_every_seed_is_played_once(monkeypatch):
+    import vec_env
+
+    used = []
+    monkeypatch.setattr(vec_env, "GameRNG", lambda seed, block: (used.append(seed), GameRNG(seed, block))[1])
+    # Short games often end before the agent's first decision and are replaced
+    env = VecEnv(4, max_turns=3)
+    obs = env.reset(range(4))
+    for _ in range(30):
+        obs, _, _, _ = env.step([BUY] * 4)
+    assert len(used) > env.episodes + 4  # some games were replaced
+    assert sorted(used) == list(range(env.next_seed))
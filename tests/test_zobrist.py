@@ -0,0 +1,71 @@
+import save
+from game import Game
+from kernel import CASH_0, pack, unpack
+from zobrist import check_incremental, collision_rate
+
+
+def test_incremental_hash_matches_a_recount():
+    assert check_incremental(range(15)) > 0
+
+
+def test_hash_without_tracking_matches():
+    tracked = Game("cpu_vs_cpu", seed=4, verbose=False, zobrist=True)
+    plain = Game("cpu_vs_cpu", seed=4, verbose=False)
+    for _ in range(30):
+        tracked.turn()
+        plain.turn()
+        assert tracked.state_hash() == plain.state_hash()
+
+
+def test_collision_rate_stays_near_the_birthday_bound():
+    full = collision_rate(4000)
+    assert full["states"] > 3900 and full["collisions"] == 0
+    # At 16 bits collisions are expected; a good hash stays close to the bound
+    narrow = collision_rate(4000, bits=16)
+    assert narrow["collisions"] <= 1.5 * narrow["expected"]
+
+
+def test_dedupe_needs_an_exact_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(save, "_saved_hashes", {})
+    game = Game("cpu_vs_cpu", seed=4, verbose=False)
+    for _ in range(10):
+        game.turn()
+    snapshot = game.snapshot()
+    original = str(tmp_path / "umd_monopoly_a.json")
+    assert save.save_game(snapshot, original, dedupe=True, verbose=False) == original
+    assert save.save_game(dict(snapshot), str(tmp_path / "umd_monopoly_b.json"), dedupe=True,
+                          verbose=False) == original
+
+    # Same Zobrist hash (cash in the same bucket, other names), different game
+    renamed = dict(snapshot, players=[dict(player, name=f"{player['name']}!")
+                                      for player in snapshot["players"]])
+    other = str(tmp_path / "umd_monopoly_c.json")
+    assert save.save_game(renamed, other, dedupe=True, verbose=False) == other
+    state = unpack(bytes.fromhex(snapshot["state"]))
+    richer = dict(snapshot, state=pack(state[:CASH_0] + (state[CASH_0] + 1,) + state[CASH_0 + 1:]).hex())
+    assert save.save_game(richer, str(tmp_path / "umd_monopoly_e.json"), dedupe=True,
+                          verbose=False) != original
+    monkeypatch.setattr(save, "_saved_hashes", {})
+    assert save.save_game(renamed, str(tmp_path / "umd_monopoly_d.json"), dedupe=True,
+                          verbose=False) == other
+
+
+def test_dedupe_only_matches_saves_in_the_same_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(save, "_saved_hashes", {})
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    state = {"state_hash": "00000000deadbeef"}
+    original = str(first / "umd_monopoly_a.json")
+    assert save.save_game(state, original, dedupe=True, verbose=False) == original
+
+    elsewhere = str(second / "umd_monopoly_b.json")
+    assert save.save_game(state, elsewhere, dedupe=True, verbose=False) == elsewhere
+    assert save.save_game(state, str(first / "umd_monopoly_c.json"), dedupe=True,
+                          verbose=False) == original
+    assert not (first / "umd_monopoly_c.json").exists()
+
+    # A fresh process finds the existing save on disk
+    monkeypatch.setattr(save, "_saved_hashes", {})
+    assert save.save_game(state, str(first / "umd_monopoly_d.json"), dedupe=True,
+                          verbose=False) == original
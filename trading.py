@@ -0,0 +1,122 @@
+"""
+Player-to-player property trades.
+
+Offers are scored by what they do to each side's expected rent: finishing
+a monopoly doubles base rent and unlocks building, so the score mostly
+comes from monopoly completion. Candidate offers are only generated for
+groups the proposer can finish. The search and scoring live in kernel.py
+(best_offer, evaluate_offer, trade) and work on the compact game state;
+TradeEngine translates between them and TradeOffer objects for a Game.
+"""
+import kernel
+
+
+class TradeOffer:
+    """
+    A proposed trade.
+
+    Args:
+        proposer: Player making the offer.
+        receiver: Player who accepts or declines.
+        give(tuple): properties the proposer hands over.
+        take(tuple): properties the proposer asks for.
+        cash(int): cash the proposer pays (negative if the receiver pays).
+    """
+
+    def __init__(self, proposer, receiver, give=(), take=(), cash=0):
+        self.proposer = proposer
+        self.receiver = receiver
+        self.give = tuple(give)
+        self.take = tuple(take)
+        self.cash = cash
+
+    def __str__(self):
+        """Readable description for prompts."""
+        give = ", ".join(prop.name for prop in self.give) or "nothing"
+        take = ", ".join(prop.name for prop in self.take) or "nothing"
+        money = (f" plus ${self.cash}" if self.cash > 0
+                 else f" and asks for ${-self.cash}" if self.cash < 0 else "")
+        return f"{self.proposer.name} offers {give}{money} for {take}"
+
+    def __repr__(self):
+        """Detailed representation."""
+        return (f"TradeOffer(give={[p.code for p in self.give]}, "
+                f"take={[p.code for p in self.take]}, cash={self.cash})")
+
+
+class TradeEngine:
+    """
+    Offer search, scoring and execution for one game.
+    """
+
+    def __init__(self, game):
+        """
+        Args:
+            game(Game): the game whose state offers are made on.
+        """
+        self.game = game
+
+    def to_kernel(self, offer):
+        """A TradeOffer as a kernel offer tuple."""
+        index = self.game.rules.index
+        return (0 if offer.proposer is self.game.player else 1,
+                tuple(index[prop.code] for prop in offer.give),
+                tuple(index[prop.code] for prop in offer.take), offer.cash)
+
+    def from_kernel(self, offer):
+        """A kernel offer tuple as a TradeOffer."""
+        seat, give, take, cash = offer
+        seats, properties = (self.game.player, self.game.cpu), self.game.kernel_properties
+        return TradeOffer(seats[seat], seats[1 - seat], [properties[p] for p in give],
+                          [properties[p] for p in take], cash)
+
+    def evaluate(self, offer):
+        """
+        Score an offer for both sides.
+
+        Returns:
+            tuple: (proposer gain, receiver gain) in dollars, counting the
+                cash and the property values that change hands, and part of
+                the other side's rent gain as a loss.
+        """
+        return kernel.evaluate_offer(self.game.state, self.to_kernel(offer), self.game.rules)
+
+    def best_offer(self, proposer, receiver, min_receiver_gain=0.0):
+        """
+        Best legal offer for the proposer that the receiver should accept.
+
+        Returns:
+            tuple: (TradeOffer or None, offers evaluated).
+        """
+        seat = 0 if proposer is self.game.player else 1
+        offer, evaluated = kernel.best_offer(self.game.state, seat, self.game.rules, min_receiver_gain)
+        return (None if offer is None else self.from_kernel(offer)), evaluated
+
+    def execute(self, offer):
+        """
+        Carry out a trade if ownership, cash and unbuilt groups allow it.
+
+        Returns:
+            bool: True if the trade went through.
+        """
+        return self.game.act(kernel.trade, self.to_kernel(offer))
+
+
+if __name__ == "__main__":
+    import time
+    from game import Game
+
+    evaluated = 0
+    elapsed = 0.0
+    for seed in range(200):
+        game = Game("cpu_vs_cpu", seed=seed, verbose=False)
+        # Deal the board out at random so there are trades to find
+        state = game.to_state()
+        props = bytes(1 if (i * 7 + seed) % 3 else 2 for i in range(len(game.rules.codes)))
+        game.load_state(state[:kernel.PROPERTIES] + (props,))
+        start = time.perf_counter()
+        for proposer, receiver in ((game.player, game.cpu), (game.cpu, game.player)):
+            evaluated += game.trader.best_offer(proposer, receiver)[1]
+        elapsed += time.perf_counter() - start
+    print(f"{evaluated} offers evaluated in {elapsed * 1000:.1f} ms "
+          f"({elapsed / max(evaluated, 1) * 1e6:.1f} us per offer)")
@@ -0,0 +1,256 @@
+"""
+Vectorized environment for training buy/skip policies.
+
+VecEnv runs M games in lockstep. Seat 0 in every game is the agent being
+trained. Seat 1 is played by a CPUPolicy. An environment step resolves one
+agent decision: whether to buy the unowned property the agent just landed
+on. Each game then plays on until the agent faces its next decision or the
+game ends. A finished game is reset at once with the next unused seed, so
+every step returns a full batch.
+
+Games are stepped with the kernel (kernel.next_state and cpu_phase), so
+they follow every rule Game does: rent with houses and monopolies,
+raising cash by selling and mortgaging, bankruptcy, trades and building.
+Between its decisions the agent seat builds, trades and lifts mortgages
+like a CPU with the agent policy's build reserve; only the buy/skip choice
+is left to the caller. Driving VecEnv with the agent policy's own choices
+gives the same games as kernel.play().
+
+Observations are one row of obs_size integers per game:
+
+    0 agent position        1 opponent position
+    2 agent cash            3 opponent cash
+    4 pending property      5 pending property cost
+    6.. owner of each property (1 agent, -1 opponent, 0 nobody)
+    then one entry per group (1 agent monopoly, -1 opponent monopoly, 0 neither)
+"""
+from array import array
+from functools import lru_cache
+
+import kernel
+from decision_engine import DEFAULT_POLICY
+from kernel import (BUY, CASH_0, JAIL_0, MOVER, NONE, PENDING, POSITION_0, PROPERTIES, RUNNING,
+                    SKIP, STATUS, TIE, cpu_phase, draw_roll, next_state)
+from rng import GameRNG
+
+
+class VecEnv:
+    """
+    M headless games stepped together, one agent decision per step.
+    """
+
+    # Games use a few dozen dice, so small blocks keep resets cheap
+    RNG_BLOCK = 64
+
+    def __init__(self, num_envs, opponent=None, board=None, event_deck=None, max_turns=150,
+                 agent=None):
+        """
+        Args:
+            num_envs(int): games run in lockstep (M).
+            opponent(CPUPolicy): policy for seat 1 (defaults to DEFAULT_POLICY).
+            board(dict): compiled board (defaults to board_spec.json).
+            event_deck(EventDeck): deck for Event tiles.
+            max_turns(int): turn limit per game, as in Game.
+            agent(CPUPolicy): sets the agent seat's build reserve between
+                decisions (defaults to DEFAULT_POLICY).
+        """
+        self.num_envs = num_envs
+        self.rules = rules = kernel.rules_for(board, event_deck, max_turns)
+        self.max_turns = max_turns
+        self.property_count = len(rules.codes)
+        self.group_count = len(rules.members)
+        self.obs_size = 6 + self.property_count + self.group_count
+        self._owner_base = 6
+        self._group_base = 6 + self.property_count
+
+        self.opponent = opponent or DEFAULT_POLICY
+        self.agent = agent or DEFAULT_POLICY
+        self._reserves = (self.agent.build_reserve, self.opponent.build_reserve)
+        policy = self.opponent
+
+        @lru_cache(maxsize=1 << 16)
+        def opponent_buys(cash, prop):
+            return policy.decide(cash, rules.cost[prop], rules.codes[prop], "mid")["decision"] == "buy"
+        self._opponent_buys = opponent_buys
+
+        M = num_envs
+        self.obs = array("q", bytes(8 * M * self.obs_size))
+        self.rewards = array("d", bytes(8 * M))
+        self.dones = array("b", bytes(M))
+        self.seeds = [0] * M
+        self.rngs = [None] * M
+        self.states = [None] * M
+        self.next_seed = 0
+        self.steps = 0
+        self.episodes = 0
+
+    def __repr__(self):
+        """Detailed representation."""
+        return f"VecEnv(num_envs={self.num_envs}, obs_size={self.obs_size}, steps={self.steps})"
+
+    # Batch views
+
+    def _batch(self, buffer, width=None):
+        """Zero-copy NumPy view of a buffer when NumPy is installed, else a memoryview."""
+        try:
+            import numpy
+        except ImportError:
+            view = memoryview(buffer)
+            return view.cast("B").cast(buffer.typecode, (self.num_envs, width)) if width else view
+        values = numpy.frombuffer(buffer, dtype={"q": numpy.int64, "d": numpy.float64,
+                                                  "b": numpy.int8}[buffer.typecode])
+        return values.reshape(self.num_envs, width) if width else values
+
+    # Gym-style interface
+
+    def reset(self, seeds):
+        """
+        Start a new game in every slot.
+
+        Args:
+            seeds: one seed per game. Auto-resets continue from max(seeds) + 1.
+
+        Returns:
+            Observations, shape (num_envs, obs_size).
+        """
+        seeds = list(seeds)
+        if len(seeds) != self.num_envs:
+            raise ValueError(f"Need {self.num_envs} seeds, got {len(seeds)}")
+        self.next_seed = max(seeds) + 1
+        for env, seed in enumerate(seeds):
+            self._reset_env(env, seed)
+        return self._batch(self.obs, self.obs_size)
+
+    def step(self, actions):
+        """
+        Apply one buy (1) or skip (0) decision per game and play on to the
+        agent's next decision.
+
+        Args:
+            actions: one action per game.
+
+        Returns:
+            tuple: (observations, rewards, dones, infos). Rewards are +1 for
+                an agent win, -1 for a loss and 0 otherwise. Finished games
+                are already reset, so their observation is the first one of
+                the next game; infos lists (env, seed, reward, turns) for
+                the games that finished.
+        """
+        rules = self.rules
+        rewards, dones = self.rewards, self.dones
+        infos = []
+        for env in range(self.num_envs):
+            # The agent's pending purchase ends its turn, then its CPU phase
+            state = next_state(self.states[env], None, BUY if actions[env] else SKIP, rules)
+            if state[STATUS] == RUNNING:
+                state = cpu_phase(state, 0, self._reserves[0], rules)
+            self.states[env] = state
+            result = self._advance(env)
+            if result is None:
+                rewards[env] = 0.0
+                dones[env] = 0
+            else:
+                rewards[env] = result
+                dones[env] = 1
+                infos.append((env, self.seeds[env], result, self.states[env][kernel.TURN]))
+                self.episodes += 1
+                self._reset_env(env)
+        self.steps += self.num_envs
+        return (self._batch(self.obs, self.obs_size), self._batch(rewards),
+                self._batch(dones), infos)
+
+    # Stepping
+
+    def _reset_env(self, env, seed=None):
+        """
+        Set up a fresh game in one slot and play to the first decision.
+
+        Args:
+            env(int): slot to reset.
+            seed(int): seed for the game; by default, and for every game
+                that ends before the agent's first decision (replaced so
+                every slot starts live), the next unused seed is taken.
+        """
+        while True:
+            if seed is None:
+                seed = self.next_seed
+                self.next_seed += 1
+            self.seeds[env] = seed
+            self.rngs[env] = GameRNG(seed, self.RNG_BLOCK)
+            self.states[env] = self.rules.initial_state()
+            if self._advance(env) is None:
+                return
+            seed = None
+
+    def _advance(self, env):
+        """
+        Play turns, as kernel.play_turn does, until the agent has a
+        purchase pending or the game ends.
+
+        Returns:
+            float or None: the agent's reward when the game ended, else None.
+        """
+        rules = self.rules
+        rng = self.rngs[env]
+        state = self.states[env]
+        while state[STATUS] == RUNNING:
+            seat = state[MOVER]
+            jailed = state[JAIL_0 + seat]
+            if state[kernel.TURN] >= rules.max_turns:
+                state = next_state(state, None, SKIP, rules)
+                break
+            state = next_state(state, None if jailed else draw_roll(rng, rules.deck), SKIP, rules)
+            pending = state[PENDING]
+            if pending != NONE:
+                if seat == 0:
+                    self.states[env] = state
+                    self._write_obs(env, state)
+                    return None
+                buy = self._opponent_buys(state[CASH_0 + 1], pending)
+                state = next_state(state, None, BUY if buy else SKIP, rules)
+            if state[STATUS] == RUNNING and not jailed:
+                state = cpu_phase(state, seat, self._reserves[seat], rules)
+        self.states[env] = state
+        status = state[STATUS]
+        return 0.0 if status == TIE else 1.0 if status == 0 else -1.0
+
+    def _write_obs(self, env, state):
+        """Write one game's observation row for a pending agent decision."""
+        rules = self.rules
+        base = env * self.obs_size
+        obs = self.obs
+        pending = state[PENDING]
+        obs[base:base + 6] = array("q", state[POSITION_0:JAIL_0] + (pending, rules.cost[pending]))
+        props = state[PROPERTIES]
+        owners = base + self._owner_base
+        for p, byte in enumerate(props):
+            obs[owners + p] = (0, 1, -1)[byte & 3]
+        groups = base + self._group_base
+        for g, members in enumerate(rules.members):
+            held = [0, 0, 0]
+            for p in members:
+                held[props[p] & 3] += 1
+            full_set = rules.full_set[g]
+            obs[groups + g] = 1 if held[1] >= full_set else -1 if held[2] >= full_set else 0
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    env = VecEnv(256)
+    env.reset(range(256))
+    chooser = random.Random(0)
+    steps = 200
+    start = time.perf_counter()
+    wins = losses = 0
+    for _ in range(steps):
+        actions = [chooser.random() < 0.8 for _ in range(env.num_envs)]
+        obs, rewards, dones, infos = env.step(actions)
+        for _, _, reward, _ in infos:
+            wins += reward > 0
+            losses += reward < 0
+    elapsed = time.perf_counter() - start
+    print(f"{env.steps} steps in {elapsed:.2f}s: {env.steps / elapsed:,.0f} steps/s on one core, "
+          f"{env.episodes} games finished ({wins} won, {losses} lost by the agent)")
+    print(f"observation batch: {type(obs).__name__} of shape {tuple(obs.shape)}")